@@ -1,149 +1,497 @@
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
-from tools.web_search import WebSearchTool
-from tools.data_analyzer import DataAnalyzerTool
-from tools.report_generator import ReportGeneratorTool
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Any, Optional, Set
+from dataclasses import dataclass, field
+import asyncio
+import threading
+from tools.base_tool import Tool, ToolExecutionError
+from tools.registry import DEFAULT_LIMITS, ToolRegistry, ToolSet, default_registry
+from tools.decomposer import Decomposer, RuleBasedDecomposer
 from utils.logger import log
-from utils.error_handler import retry
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.error_handler import RetryBudget, RetryPolicy
+from utils.scheduler import TaskScheduler
+from utils.cache import TieredCache
+from utils.findings_store import FindingsStore
+from utils.journal import RunJournal
+from utils.tracing import Tracer
 
-@dataclass
+if TYPE_CHECKING:
+    from tools.dedup import DedupIndex
+
+@dataclass(slots=True)
 class Task:
     description: str
-    status: str = "pending"  # pending, in_progress, completed, failed
+    status: str = "pending"  # pending, in_progress, completed, failed, timed_out
     result: Optional[Dict[str, Any]] = None
     required_tools: List[str] = None  # type: ignore # This is the line causing the first error
+    depends_on: List[int] = None  # type: ignore # indices of tasks that must complete first
+    tool_results: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # completed stages, by tool name
 
     def __post_init__(self):
         # Initialize required_tools if not provided
         if self.required_tools is None:
             self.required_tools = []
+        if self.depends_on is None:
+            self.depends_on = []
 
 class ResearchAgent:
-    def __init__(self, query: str):
+    def __init__(self, query: str, max_workers: int = 4, search_cache: Optional[TieredCache] = None,
+                 journal_path: Optional[str] = None, tracer: Optional[Tracer] = None,
+                 seed: Optional[int] = None, dedup: bool = True, registry: Optional[ToolRegistry] = None,
+                 decomposer: Optional[Decomposer] = None, spill_dir: Optional[str] = None,
+                 rate_limits: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+                 search_index: Optional[str] = None):
         self.query = query
-        self.tools = {
-            'web_search': WebSearchTool(),
-            'data_analyzer': DataAnalyzerTool(),
-            'report_generator': ReportGeneratorTool()
-        }
+        # Tools are imported and built on first use, and shared with other agents using the same options.
+        # Calls are admitted by per-tool rate limiters (e.g. rate_limits={'web_search': {'qps': 5}}).
+        # With search_index, web searches go to a local BM25 index (tools.search_index) instead
+        self.tools = ToolSet(registry or default_registry, {
+            'web_search': {'cache': search_cache, 'seed': seed, 'index': search_index}
+        }, {**DEFAULT_LIMITS, **(rate_limits or {})})
+        # Rule-based unless given e.g. an LLMDecomposer (share one across agents so queries batch)
+        self.decomposer = decomposer if decomposer is not None else RuleBasedDecomposer()
         self.task_history: List[Task] = []
-        self.findings: List[Dict[str, Any]] = []
+        # Findings and each task's search results move here as tasks finish; past a memory
+        # budget they are spilled to disk, so the Task objects stop holding tool output
+        self.findings = FindingsStore(spill_dir=spill_dir)
+        self._search_results = FindingsStore(spill_dir=spill_dir)
+        self._finding_positions: Dict[int, int] = {}
+        self._search_positions: Dict[int, int] = {}
         self.max_retries = 3
+        self.retry_budget_size = 10  # retries allowed across all tool calls in one run
+        self.retry_policy = RetryPolicy(max_attempts=self.max_retries, delay=1)
+        self.retry_budget = RetryBudget(self.retry_budget_size)
+        # Replaced per run; tools, retries and rate limiters all give up once it passes
+        self.deadline = Deadline(None)
         self.completed = False
+        self.scheduler = TaskScheduler(max_workers=max_workers)
+        # Crash-safe progress log; run() resumes from it when it already holds a plan
+        self.journal = RunJournal(journal_path) if journal_path else None
+        self._restored: Set[int] = set()
+        # Latency histograms are on by default; pass Tracer(keep_spans=True) to export a trace
+        self.tracer = tracer if tracer is not None else Tracer()
+        # Shared by all tasks so a page found by one task is not analyzed again for another;
+        # built when the first search result arrives
+        self.dedup = dedup
+        self.dedup_index: Optional["DedupIndex"] = None
+        self._dedup_lock = threading.Lock()
+
+    @classmethod
+    def resume(cls, journal_path: str, **kwargs) -> "ResearchAgent":
+        """
+        Create an agent that continues the run recorded in a journal
+        
+        Completed tasks are restored from the journal and skipped; pending,
+        interrupted and failed tasks run again.
+        
+        Args:
+            journal_path: Path of an existing run journal
+            **kwargs: Other ResearchAgent constructor arguments
+            
+        Returns:
+            Agent ready for run() or arun()
+        """
+        state = RunJournal(journal_path).replay()
+        if state.query is None:
+            raise ValueError(f"No run recorded in journal: {journal_path}")
+        return cls(state.query, journal_path=journal_path, **kwargs)
 
     def decompose_query(self) -> List[Task]:
         """Break down the main query into sub-tasks with tool requirements"""
         log(f"Decomposing query: {self.query}")
-        
-        # This is a simplified version - in production you might use LLM for decomposition
-        if "environmental impact" in self.query.lower():
-            return [
-                Task(
-                    description="Find current statistics on environmental impact",
-                    required_tools=["web_search", "data_analyzer"]
-                ),
-                Task(
-                    description="Identify key contributing factors",
-                    required_tools=["web_search", "data_analyzer"]
-                ),
-                Task(
-                    description="Research sustainable alternatives",
-                    required_tools=["web_search"]
-                )
-            ]
-        else:  # Default decomposition pattern
-            return [
-                Task(
-                    description=f"Background research on {self.query}",
-                    required_tools=["web_search"]
-                ),
-                Task(
-                    description=f"Analyze current trends in {self.query}",
-                    required_tools=["web_search", "data_analyzer"]
-                ),
-                Task(
-                    description=f"Recommendations regarding {self.query}",
-                    required_tools=["web_search", "data_analyzer"]
-                )
-            ]
-
-    @retry(max_attempts=3, delay=1)
+        # A slow planner falls back to its rule-based plan rather than outlive the run's deadline
+        return [Task(**spec) for spec in self.decomposer.decompose(self.query, self.deadline)]
+
+    def _tool_arguments(self, tool_name: str, task: Task, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the keyword arguments for one tool call from the task context"""
+        if tool_name == "web_search":
+            # Keep results array-backed inside the agent; they become dicts only when serialized
+            return {'query': task.description, 'context': context, 'compact': True, 'deadline': self.deadline}
+        if tool_name == "data_analyzer":
+            return {'data': context.get('search_results', {})}
+        return dict(context)
+
+    @staticmethod
+    def _store_result(tool_name: str, result: Dict[str, Any], context: Dict[str, Any]) -> None:
+        """Make a tool's output available to the tools that follow it"""
+        if tool_name == "web_search":
+            context['search_results'] = result
+        elif tool_name == "data_analyzer":
+            context['analysis'] = result
+
+    @staticmethod
+    def _check_result(tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a tool's failed-status response into an exception so it can be retried"""
+        if isinstance(result, dict) and result.get('status') == 'failed':
+            raise ToolExecutionError(f"{tool_name}: {result.get('error', 'unknown error')}")
+        return result
+
+    def _get_dedup_index(self) -> "DedupIndex":
+        if self.dedup_index is None:
+            with self._dedup_lock:
+                if self.dedup_index is None:
+                    from tools.dedup import DedupIndex
+                    self.dedup_index = DedupIndex()
+        return self.dedup_index
+
+    def _deduplicate(self, tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop search results another task (or this page) already returned"""
+        if tool_name != "web_search" or not self.dedup or result.get('results') is None:
+            return result
+        kept, collapsed = self._get_dedup_index().filter(result['results'])
+        if not collapsed:
+            return result
+        log(f"Collapsed {collapsed} duplicate results for: {result.get('query', '')}")
+        self.tracer.count("dedup.collapsed", collapsed)
+        return {**result, 'results': kept, 'count': len(kept), 'duplicates_removed': collapsed}
+
+    def _invoke_tool(self, tool: Tool, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        limiter = self.tools.limiter(tool_name)
+        if tool.rate_limited:
+            # The tool holds this agent's limiter around its backend requests only
+            arguments = {**arguments, 'limiter': limiter}
+        if limiter is None or tool.rate_limited:
+            with self.tracer.span(f"tool.{tool_name}", "tool"):
+                return self._check_result(tool_name, tool.execute(**arguments))
+        # Every attempt (retries included) waits for the limiter; failures shrink its concurrency
+        with limiter.slot(self.deadline), self.tracer.span(f"tool.{tool_name}", "tool"):
+            return self._check_result(tool_name, tool.execute(**arguments))
+
+    async def _ainvoke_tool(self, tool: Tool, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        limiter = self.tools.limiter(tool_name)
+        if tool.rate_limited:
+            arguments = {**arguments, 'limiter': limiter}
+        if limiter is None or tool.rate_limited:
+            with self.tracer.span(f"tool.{tool_name}", "tool"):
+                return self._check_result(tool_name, await tool.aexecute(**arguments))
+        async with limiter.slot(self.deadline):
+            with self.tracer.span(f"tool.{tool_name}", "tool"):
+                return self._check_result(tool_name, await tool.aexecute(**arguments))
+
+    def _count_retry(self, tool_name: str) -> Callable[[int, Exception], None]:
+        return lambda attempt, error: self.tracer.count(f"retries.{tool_name}")
+
     def execute_task(self, task: Task) -> Dict[str, Any]:
-        """Execute a task using the required tools"""
+        """
+        Execute a task using the required tools
+        
+        Each tool call is retried on its own, behind that tool's circuit
+        breaker. Stages that already succeeded are kept in ``task.tool_results``
+        and are never re-run. No stage starts (and no retry waits) past the
+        run's deadline; DeadlineExceededError is raised instead.
+        """
+        with self.tracer.span("task", "task", description=task.description):
+            return self._execute_task(task)
+
+    async def aexecute_task(self, task: Task) -> Dict[str, Any]:
+        """Execute a task using the required tools without blocking the event loop"""
+        with self.tracer.span("task", "task", description=task.description):
+            return await self._aexecute_task(task)
+
+    def _start_task(self, task: Task) -> Dict[str, Any]:
+        """Mark a task as running; returns the empty context its tools pass results through"""
         task.status = "in_progress"
+        self._journal_status(task, "in_progress")
         log(f"Executing task: {task.description}")
-        
-        result: Dict[str, Any] = {}
-        context: Dict[str, Any] = {}
-        
-        # Execute tools in sequence based on task requirements
+        return {}
+
+    def _pending_tools(self, task: Task, context: Dict[str, Any]) -> Iterator[str]:
+        """
+        Tools of a task still to run, in order
+
+        Stages that already succeeded (e.g. restored from the journal) are put
+        back into ``context`` instead of being yielded. No stage starts past the
+        run's deadline.
+        """
         for tool_name in task.required_tools:
+            if tool_name in task.tool_results:
+                self._store_result(tool_name, task.tool_results[tool_name], context)
+                continue
+            self.deadline.check(f"{tool_name} for {task.description!r}")
+            yield tool_name
+
+    def _call_options(self, tool_name: str) -> Dict[str, Any]:
+        """Retry policy keyword arguments for one tool call"""
+        return {
+            'budget': self.retry_budget,
+            'breaker': self.tools.breaker(tool_name),
+            'on_retry': self._count_retry(tool_name),
+            'deadline': self.deadline
+        }
+
+    def _complete_stage(self, task: Task, tool_name: str, result: Dict[str, Any],
+                        context: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep a successful tool result on the task, pass it on and journal it"""
+        # A run that has already given up on this task must not see its late results
+        self.deadline.check(f"storing {tool_name} results")
+        result = self._deduplicate(tool_name, result)
+        task.tool_results[tool_name] = result
+        self._store_result(tool_name, result, context)
+        if self.journal:
+            self.journal.stage_completed(self._index_of(task), tool_name, result)
+        log(f"Tool {tool_name} executed successfully")
+        return result
+
+    @staticmethod
+    def _finish_task(task: Task) -> Dict[str, Any]:
+        result = task.tool_results[task.required_tools[-1]] if task.required_tools else {}
+        task.result = result
+        if task.status == "in_progress":
+            task.status = "completed"
+        return result
+
+    def _execute_task(self, task: Task) -> Dict[str, Any]:
+        context = self._start_task(task)
+        # Execute tools in sequence based on task requirements
+        for tool_name in self._pending_tools(task, context):
             try:
-                tool = self.tools[tool_name]
-                if tool_name == "web_search":
-                    result = tool.execute(query=task.description, context=context)
-                    context['search_results'] = result
-                elif tool_name == "data_analyzer":
-                    result = tool.execute(data=context.get('search_results', {}))
-                    context['analysis'] = result
-                else:
-                    result = tool.execute(**context)
-                
-                log(f"Tool {tool_name} executed successfully")
+                result = self.retry_policy.call(self._invoke_tool, self.tools[tool_name], tool_name,
+                                                self._tool_arguments(tool_name, task, context),
+                                                **self._call_options(tool_name))
+                self._complete_stage(task, tool_name, result, context)
             except Exception as e:
                 log(f"Tool {tool_name} failed: {str(e)}")
                 raise
-        
-        task.result = result
-        task.status = "completed"
-        return result
+        return self._finish_task(task)
 
-    def run(self) -> Dict[str, Any]:
-        """Main method to execute the research workflow"""
-        try:
-            # Step 1: Break down the query
-            tasks = self.decompose_query()
+    async def _aexecute_task(self, task: Task) -> Dict[str, Any]:
+        context = self._start_task(task)
+        for tool_name in self._pending_tools(task, context):
+            try:
+                result = await self.retry_policy.acall(self._ainvoke_tool, self.tools[tool_name], tool_name,
+                                                       self._tool_arguments(tool_name, task, context),
+                                                       **self._call_options(tool_name))
+                self._complete_stage(task, tool_name, result, context)
+            except Exception as e:
+                log(f"Tool {tool_name} failed: {str(e)}")
+                raise
+        return self._finish_task(task)
+
+    def _index_of(self, task: Task) -> int:
+        return next(i for i, t in enumerate(self.task_history) if t is task)
+
+    def _journal_status(self, task: Task, status: str, result: Optional[Dict[str, Any]] = None,
+                        error: Optional[str] = None) -> None:
+        if self.journal:
+            self.journal.task_status(self._index_of(task), status, result=result, error=error)
+
+    def _plan_tasks(self) -> List[Task]:
+        """Decompose the query, or restore the plan and progress of a journaled run"""
+        state = self.journal.replay() if self.journal else None
+        if state is None or not state.has_plan:
+            with self.tracer.span("decompose_query"):
+                tasks = self.decompose_query()
             self.task_history = tasks
-            
-            # Step 2: Execute each task
-            for task in tasks:
-                try:
-                    task_result = self.execute_task(task)
-                    self.findings.append({
-                        'task': task.description,
-                        'result': task_result
-                    })
-                except Exception as e:
-                    log(f"Task failed after retries: {task.description}. Error: {str(e)}")
-                    task.status = "failed"
-                    self.findings.append({
-                        'task': task.description,
-                        'error': str(e)
-                    })
-            
-            # Step 3: Generate final report
+            if self.journal:
+                self.journal.run_started(self.query)
+                self.journal.plan(tasks)
+            return tasks
+
+        if state.query != self.query:
+            raise ValueError(f"Journal {self.journal.path} belongs to a different query: {state.query!r}")
+        log(f"Resuming run from journal: {self.journal.path}")
+        tasks = [Task(**spec) for spec in state.plan]
+        for index, task in enumerate(tasks):
+            task.tool_results = dict(state.tool_results.get(index, {}))
+            if self.dedup and 'web_search' in task.tool_results:
+                self._get_dedup_index().add(task.tool_results['web_search'].get('results') or [])
+            if state.statuses.get(index) == "completed":
+                task.status = "completed"
+                task.result = state.results.get(index)
+                self._restored.add(index)
+        self.task_history = tasks
+        log(f"Restored {len(self._restored)}/{len(tasks)} completed tasks")
+        return tasks
+
+    def _finish_run(self) -> Dict[str, Any]:
+        self._order_findings()
+        report = self._generate_report()
+        timed_out = sum(1 for task in self.task_history if task.status == "timed_out")
+        if timed_out:
+            # Best-effort report; resuming the journal runs the unfinished tasks
+            report['timed_out_tasks'] = timed_out
+        if self.journal:
+            if not timed_out:
+                self.journal.run_completed()
+            self.journal.close()
+        return report
+
+    def _order_findings(self) -> None:
+        """Findings follow decomposition order regardless of completion order"""
+        self.findings.reorder([self._finding_positions[i] for i in sorted(self._finding_positions)])
+        self._finding_positions = {i: p for p, i in enumerate(sorted(self._finding_positions))}
+
+    def _record_outcome(self, task: Task, task_result: Optional[Dict[str, Any]], error: Optional[BaseException]) -> None:
+        """Move a finished (or failed) task's output into the findings store"""
+        index = self._index_of(task)
+        if error is None:
+            if index not in self._restored:
+                self._journal_status(task, "completed", result=task_result)
+            finding = {
+                'task': task.description,
+                'result': task_result
+            }
+        elif isinstance(error, DeadlineExceededError):
+            log(f"Task timed out: {task.description}", "warning")
+            task.status = "timed_out"
+            self._journal_status(task, "timed_out", error=str(error))
+            finding = {
+                'task': task.description,
+                'error': str(error),
+                'timed_out': True
+            }
+        else:
+            log(f"Task failed after retries: {task.description}. Error: {str(error)}")
+            task.status = "failed"
+            self._journal_status(task, "failed", error=str(error))
+            finding = {
+                'task': task.description,
+                'error': str(error)
+            }
+        self._finding_positions[index] = self.findings.append(finding)
+        if 'web_search' in task.tool_results:
+            self._search_positions[index] = self._search_results.append(task.tool_results['web_search'])
+        # The stores own the output now; keeping it on the task too would defeat spilling
+        task.result = None
+        task.tool_results = {}
+
+    def _cross_task_analysis(self) -> Optional[Dict[str, Any]]:
+        """Analyze the search results of every task together, if there are any"""
+        if not self._search_positions:
+            return None
+        # Tasks without search results (e.g. failed ones) are skipped, so pass each result's real task index
+        searched = sorted(self._search_positions)
+        searches = (self._search_results[self._search_positions[i]] for i in searched)
+        with self.tracer.span("tool.data_analyzer.batch", "tool"):
+            return self.tools['data_analyzer'].analyze_batch(searches, task_ids=searched)
+
+    def _generate_report(self) -> Dict[str, Any]:
+        overall = self._cross_task_analysis()
+        with self.tracer.span("tool.report_generator", "tool"):
             report = self.tools['report_generator'].execute(
                 query=self.query,
                 findings=self.findings,
-                task_history=self.task_history
+                task_history=self.task_history,
+                overall_analysis=overall,
+                dedup_stats=self.dedup_index.get_stats() if self.dedup_index else None,
+                deadline=self.deadline.seconds
             )
+        self.completed = True
+        return report if report else {}
+
+    def _failure_report(self, error: Exception) -> Dict[str, Any]:
+        log(f"Research failed: {str(error)}")
+        if self.journal:
+            self.journal.close()
+        self._order_findings()
+        return {
+            'status': 'failed',
+            'error': str(error),
+            # Lazy sequence; spilled findings are only read back when iterated or serialized
+            'partial_findings': self.findings
+        }
+
+    def run(self, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Main method to execute the research workflow
+
+        Args:
+            deadline: Time budget in seconds. When it runs out, outstanding tool
+                calls are abandoned and the report covers the tasks finished so
+                far; the others are marked ``timed_out``.
+        """
+        self.retry_budget = RetryBudget(self.retry_budget_size)
+        self.deadline = Deadline(deadline)
+        with self.tracer.span("run", query=self.query):
+            return self._run()
+
+    def _run(self) -> Dict[str, Any]:
+        try:
+            # Step 1: Break down the query (or pick up where a journaled run left off)
+            tasks = self._plan_tasks()
+            
+            # Step 2: Execute tasks, running independent ones concurrently
+            def on_done(index: int, task_result: Optional[Dict[str, Any]], error: Optional[BaseException]) -> None:
+                self._record_outcome(tasks[index], task_result, error)
+
+            def worker(index: int) -> Dict[str, Any]:
+                if index in self._restored:
+                    return tasks[index].result
+                return self.execute_task(tasks[index])
+
+            self.scheduler.run([task.depends_on for task in tasks], worker, on_done, self.deadline)
             
-            self.completed = True
-            return report if report else {}
+            # Step 3: Generate final report
+            return self._finish_run()
             
         except Exception as e:
-            log(f"Research failed: {str(e)}")
-            return {
-                'status': 'failed',
-                'error': str(e),
-                'partial_findings': self.findings
-            }
+            return self._failure_report(e)
+
+    async def arun(self, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Asyncio-native variant of run, suitable for many concurrent agents per process
+
+        Unfinished tool calls are cancelled when ``deadline`` (seconds) runs out.
+        """
+        self.retry_budget = RetryBudget(self.retry_budget_size)
+        self.deadline = Deadline(deadline)
+        with self.tracer.span("run", query=self.query):
+            return await self._arun()
+
+    async def _arun(self) -> Dict[str, Any]:
+        try:
+            if self.decomposer.blocking:
+                # Planning may wait on a remote model; keep the event loop free meanwhile
+                tasks = await asyncio.to_thread(self._plan_tasks)
+            else:
+                tasks = self._plan_tasks()
+            
+            def on_done(index: int, task_result: Optional[Dict[str, Any]], error: Optional[BaseException]) -> None:
+                self._record_outcome(tasks[index], task_result, error)
+
+            async def worker(index: int) -> Dict[str, Any]:
+                if index in self._restored:
+                    return tasks[index].result
+                return await self.aexecute_task(tasks[index])
+
+            await self.scheduler.arun([task.depends_on for task in tasks], worker, on_done, self.deadline)
+            
+            return self._finish_run()
+            
+        except Exception as e:
+            return self._failure_report(e)
 
     def get_status(self) -> Dict[str, Any]:
         """Return current agent status"""
         return {
             'completed': self.completed,
             'tasks_total': len(self.task_history),
+            'tasks_pending': sum(1 for t in self.task_history if t.status == "pending"),
+            'tasks_in_progress': sum(1 for t in self.task_history if t.status == "in_progress"),
             'tasks_completed': sum(1 for t in self.task_history if t.status == "completed"),
-            'tasks_failed': sum(1 for t in self.task_history if t.status == "failed")
-        }
\ No newline at end of file
+            'tasks_failed': sum(1 for t in self.task_history if t.status == "failed"),
+            'tasks_timed_out': sum(1 for t in self.task_history if t.status == "timed_out"),
+            'retries_used': self.retry_budget.spent,
+            'retry_budget_remaining': self.retry_budget.remaining,
+            'circuit_breakers': {name: breaker.get_status() for name, breaker in self.tools.loaded_breakers().items()},
+            'rate_limits': {name: limiter.get_status() for name, limiter in self.tools.loaded_limiters().items()},
+            'dedup': self.dedup_index.get_stats() if self.dedup_index else None,
+            'single_flight': {name: tool.flight.get_stats() for name, tool in self.tools.loaded().items()
+                              if getattr(tool, 'flight', None) is not None},
+            'findings': self.findings.get_stats(),
+            'metrics': self.tracer.get_metrics()
+        }
+    def close(self) -> None:
+        """
+        Delete the findings spill files
+
+        Lazy ``partial_findings`` in a failure report read from these files, so
+        copy them (e.g. with ``list``) before closing.
+        """
+        self.findings.close()
+        self._search_results.close()
+
+    def __enter__(self) -> "ResearchAgent":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,235 @@
+"""
+Batch research runner
+
+Reads queries as JSONL (one ``{"query": ..., "id": ...}`` object, or a bare JSON
+string, per line) from a file or stdin, runs each through a ResearchAgent on a
+process or thread pool, and streams one JSONL record per query as soon as it
+finishes. At most ``--max-in-flight`` queries are held in memory at a time, so
+the input can be arbitrarily large.
+
+Usage:
+    python batch.py queries.jsonl -o reports.jsonl --workers 8
+    cat queries.jsonl | python batch.py - --executor thread > reports.jsonl
+    python batch.py queries.jsonl --deadline 5   # best-effort reports within 5s each
+    python batch.py queries.jsonl --index corpus.idx   # search a local BM25 index offline
+
+A record may carry its own ``"deadline"`` (seconds), overriding ``--deadline``.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from tools.records import json_default
+
+_worker_cache = None
+_worker_decomposer = None
+_worker_deadline = None
+_worker_index = None
+
+
+def _init_worker(cache_path: Optional[str], verbose: bool, llm_url: Optional[str] = None,
+                 llm_model: Optional[str] = None, deadline: Optional[float] = None,
+                 index: Optional[str] = None, shared: bool = False) -> None:
+    """
+    Per-worker setup: silence agent logging, open the shared search cache and set up LLM planning
+
+    ``shared`` is set when one setup serves every worker (the thread executor).
+    """
+    global _worker_cache, _worker_decomposer, _worker_deadline, _worker_index
+    _worker_deadline = deadline
+    _worker_index = index
+    from utils.logger import configure_logging
+    # Workers share stderr/stdout with the output stream, so keep agent chatter off unless asked
+    configure_logging(level='info' if verbose else 'off', stream=sys.stderr)
+    if cache_path:
+        from utils.cache import TieredCache, LRUCache, SQLiteCache
+        _worker_cache = TieredCache(LRUCache(), SQLiteCache(cache_path))
+    if llm_url:
+        from tools.decomposer import LLMDecomposer
+        # Batching needs concurrent queries on one decomposer, which only the thread executor has.
+        # A process worker runs one query at a time, so waiting for others to join would only add latency
+        _worker_decomposer = LLMDecomposer(llm_url, llm_model, cache=_worker_cache,
+                                           **({} if shared else {'max_wait': 0.0}))
+
+
+def run_query(index: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one query and build its output record
+
+    Args:
+        index: Zero-based line number of the query in the input
+        record: Parsed input record
+
+    Returns:
+        JSON-serializable output record with status and timings
+    """
+    from agent import ResearchAgent
+
+    started = time.time()
+    start = time.perf_counter()
+    output: Dict[str, Any] = {'index': index, 'id': record.get('id', index), 'query': record.get('query')}
+    try:
+        if not isinstance(record.get('query'), str) or not record['query'].strip():
+            raise ValueError("Record has no 'query' string")
+        with ResearchAgent(record['query'], search_cache=_worker_cache, decomposer=_worker_decomposer,
+                           search_index=_worker_index) as agent:
+            report = agent.run(deadline=record.get('deadline', _worker_deadline))
+            if 'partial_findings' in report:
+                # Read back from the spill file before the agent deletes it
+                report['partial_findings'] = list(report['partial_findings'])
+            output['status'] = report.get('status', 'failed')
+            output['report'] = report
+            output['agent_status'] = agent.get_status()
+    except Exception as e:
+        output['status'] = 'failed'
+        output['error'] = f"{type(e).__name__}: {e}"
+    output['timings'] = {
+        'started_at': started,
+        'duration_s': round(time.perf_counter() - start, 6)
+    }
+    return output
+
+
+def read_queries(stream: IO[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(index, record)`` pairs; malformed lines become records with an ``error``"""
+    for index, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield index, {'error': f"Invalid JSON: {e}"}
+            continue
+        if isinstance(record, str):
+            record = {'query': record}
+        elif not isinstance(record, dict):
+            record = {'error': "Record must be a JSON object or string"}
+        yield index, record
+
+
+def run_batch(
+    source: IO[str],
+    sink: IO[str],
+    executor: Executor,
+    max_in_flight: int,
+    progress: Optional[tqdm] = None,
+) -> Dict[str, int]:
+    """
+    Fan queries out over an executor and stream results as they complete
+
+    Args:
+        source: JSONL input
+        sink: Where output records are written, one per line
+        executor: Pool that runs ``run_query``
+        max_in_flight: Upper bound on submitted-but-unwritten queries
+        progress: Optional progress bar advanced once per finished query
+
+    Returns:
+        Counts of succeeded and failed queries
+    """
+    counts = {'succeeded': 0, 'failed': 0}
+    pending: Dict[Future, Tuple[int, Dict[str, Any]]] = {}
+
+    def drain() -> None:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, record = pending.pop(future)
+            try:
+                output = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. a killed process); report the query as failed
+                output = {'index': index, 'id': record.get('id', index), 'query': record.get('query'),
+                          'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+            write(output)
+
+    def write(output: Dict[str, Any]) -> None:
+        sink.write(json.dumps(output, default=json_default) + "\n")
+        sink.flush()
+        counts['succeeded' if output.get('status') == 'success' else 'failed'] += 1
+        if progress is not None:
+            progress.update(1)
+            progress.set_postfix(failed=counts['failed'], refresh=False)
+
+    for index, record in read_queries(source):
+        if 'error' in record:
+            write({'index': index, 'id': index, 'query': None, 'status': 'failed', 'error': record['error']})
+            continue
+        while len(pending) >= max_in_flight:
+            drain()
+        pending[executor.submit(run_query, index, record)] = (index, record)
+
+    while pending:
+        drain()
+    return counts
+
+
+def _count_lines(path: str) -> Optional[int]:
+    try:
+        with open(path, 'rb') as f:
+            return sum(1 for line in f if line.strip())
+    except OSError:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run research queries from JSONL in parallel")
+    parser.add_argument('input', help="JSONL file of queries, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="Output JSONL file (default: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=4, help="Number of parallel workers")
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help="Run queries in worker processes or threads")
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help="Maximum queued or running queries (default: 2 x workers)")
+    parser.add_argument('--cache', default=None, help="SQLite file for a search cache shared by all workers")
+    parser.add_argument('--llm-url', default=None,
+                        help="OpenAI-compatible API root for query decomposition (default: rule-based plans)")
+    parser.add_argument('--llm-model', default='gpt-4o-mini', help="Model used with --llm-url")
+    parser.add_argument('--deadline', type=float, default=None,
+                        help="Time budget per query in seconds; unfinished tasks are reported as timed out")
+    parser.add_argument('--index', default=None,
+                        help="Directory of a BM25 index (tools/search_index.py) to search instead of the web")
+    parser.add_argument('--no-progress', action='store_true', help="Disable the progress bar")
+    parser.add_argument('--verbose', action='store_true', help="Keep per-agent log output")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    max_in_flight = args.workers * 2 if args.max_in_flight is None else args.max_in_flight
+    if max_in_flight < 1:
+        parser.error("--max-in-flight must be at least 1")
+
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    total = None if args.input == '-' else _count_lines(args.input)
+
+    initargs = (args.cache, args.verbose, args.llm_url, args.llm_model, args.deadline, args.index)
+    if args.executor == 'thread':
+        # Threads share the module globals, so initialize once up front
+        _init_worker(*initargs, shared=True)
+        executor: Executor = ThreadPoolExecutor(max_workers=args.workers)
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=initargs)
+
+    progress = tqdm(total=total, unit='query', file=sys.stderr, disable=args.no_progress)
+    try:
+        with executor:
+            counts = run_batch(source, sink, executor, max_in_flight, progress)
+    finally:
+        progress.close()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(f"Finished: {counts['succeeded']} succeeded, {counts['failed']} failed", file=sys.stderr)
+    return 0 if counts['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Benchmark runner
+
+Usage:
+    python -m benchmarks run [-k PATTERN] [--quick] [--save results.json]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.1]
+    python -m benchmarks list
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from benchmarks import harness
+from benchmarks import (  # noqa: F401  (registers benchmarks)
+    bench_analysis, bench_memory, bench_pipeline, bench_search_index, bench_startup
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Deterministic agent benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Run benchmarks")
+    run.add_argument('-k', '--pattern', default="", help="Only run benchmarks whose name contains PATTERN")
+    run.add_argument('--quick', action='store_true', help="One iteration each, no warmup")
+    run.add_argument('--save', default=None, help="Write results JSON here (e.g. a new baseline)")
+
+    compare = commands.add_parser('compare', help="Flag regressions between two result files")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help="Relative slowdown tolerated before flagging (default: 0.10)")
+
+    commands.add_parser('list', help="List benchmark names")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        print("\n".join(harness.registered()))
+        return 0
+
+    if args.command == 'run':
+        document = harness.run_benchmarks(args.pattern, quick=args.quick)
+        if args.save:
+            harness.save_results(document, args.save)
+            print(f"Saved {len(document['results'])} results to {args.save}", file=sys.stderr)
+        return 0
+
+    rows = harness.compare_results(harness.load_results(args.baseline), harness.load_results(args.current),
+                                   args.threshold)
+    for row in rows:
+        print(f"{row['name']:<45} {row['baseline_s'] * 1000:10.3f} ms -> {row['current_s'] * 1000:10.3f} ms "
+              f"({row['ratio']:.2f}x) {row['status'].upper() if row['status'] != 'ok' else ''}")
+    regressions = [row for row in rows if row['status'] == 'regression']
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%} threshold", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Columnar analysis engine at increasing table sizes
+
+Tables are built on first use (during warmup), not at import.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+from tools.analysis_engine import ResultTable, analyze_table, per_task_relevance
+from tools.web_search import WebSearchTool
+
+SEED = 1234
+
+
+def _table(rows: int, tasks: int) -> ResultTable:
+    rng = np.random.default_rng(SEED)
+    sources = np.array(WebSearchTool().sources, dtype=object)
+    return ResultTable.from_columns(
+        rng.uniform(0.5, 1.0, rows),
+        sources[rng.integers(0, len(sources), rows)],
+        np.datetime64('2023-01-01') + rng.integers(0, 365, rows).astype('timedelta64[D]'),
+        rng.integers(0, tasks, rows)
+    )
+
+
+_tables: Dict[int, ResultTable] = {}
+
+
+def _register(rows: int, repeat: int) -> None:
+    @benchmark(f"analysis.analyze_{rows}_rows", repeat=repeat, unit="row")
+    def bench_analyze() -> Dict[str, Any]:
+        if rows not in _tables:
+            _tables[rows] = _table(rows, tasks=max(1, rows // 10))
+        table = _tables[rows]
+        analyze_table(table)
+        per_task_relevance(table)
+        return {'items': rows}
+
+
+for _rows, _repeat in ((10, 50), (10_000, 20), (1_000_000, 3)):
+    _register(_rows, _repeat)
+
+
+_results: Optional[List[Dict[str, Any]]] = None
+
+
+@benchmark("analysis.from_results_dicts", repeat=5, unit="row")
+def bench_from_results() -> Dict[str, Any]:
+    global _results
+    if _results is None:
+        _results = WebSearchTool(seed=SEED).execute(query="benchmark")['results'] * 1000
+    ResultTable.from_results(_results)
+    return {'items': len(_results)}
@@ -0,0 +1,83 @@
+"""
+Memory held per search result and per task, dicts vs compact records
+
+The timed part is only incidental here; the numbers that matter are the
+``bytes_per_result`` / ``bytes_per_task`` metrics, measured with tracemalloc
+so they include every object a representation keeps alive.
+"""
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from agent import Task
+from benchmarks.harness import benchmark
+from tools.records import ResultSet, SearchHit
+from tools.web_search import WebSearchTool
+
+SEED = 1234
+PAGES = 1000
+
+
+@dataclass
+class _PlainTask:
+    """Task as it was before it gained __slots__"""
+    description: str
+    status: str = "pending"
+    result: Optional[Any] = None
+    required_tools: List[str] = None
+    depends_on: List[int] = field(default_factory=list)
+    tool_results: Dict[str, Any] = field(default_factory=dict)
+
+
+def _pages() -> List[List[Dict[str, Any]]]:
+    search = WebSearchTool(seed=SEED, max_results=10)
+    return [search.execute(query=f"memory benchmark {i}")['results'] for i in range(PAGES)]
+
+
+def _retained(build: Callable[[], Any]) -> int:
+    """Bytes still allocated after ``build`` returns (its result is kept alive)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def _copy_dicts(pages: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+    # Fresh strings too, as if decoded from a response, so nothing is shared with the source pages
+    return [[{key: (value + ' ')[:-1] if isinstance(value, str) else value for key, value in r.items()}
+             for r in page] for page in pages]
+
+
+_source_pages = _pages()
+_result_count = sum(len(page) for page in _source_pages)
+
+
+def _register(name: str, build: Callable[[], Any]) -> None:
+    @benchmark(f"memory.results_{name}", repeat=3, unit="result")
+    def bench_results() -> Dict[str, Any]:
+        retained = _retained(build)
+        return {'items': _result_count, 'bytes_per_result': round(retained / _result_count, 1)}
+
+
+_register("dicts", lambda: _copy_dicts(_source_pages))
+_register("hits", lambda: [[SearchHit.from_dict(r) for r in page] for page in _copy_dicts(_source_pages)])
+_register("result_set", lambda: [ResultSet.from_dicts(page) for page in _copy_dicts(_source_pages)])
+
+
+def _register_tasks(name: str, task_type: type) -> None:
+    @benchmark(f"memory.tasks_{name}", repeat=3, unit="task")
+    def bench_tasks() -> Dict[str, Any]:
+        count = 10_000
+        retained = _retained(lambda: [
+            task_type(description=f"Task {i}", required_tools=["web_search"]) for i in range(count)
+        ])
+        return {'items': count, 'bytes_per_task': round(retained / count, 1)}
+
+
+_register_tasks("plain", _PlainTask)
+_register_tasks("slots", Task)
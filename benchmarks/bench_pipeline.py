@@ -0,0 +1,127 @@
+"""
+End-to-end, per-tool, report-scale and concurrency benchmarks
+
+Everything runs against the mock tools in seeded mode, so two runs on the
+same machine do the same work and their timings are comparable. Inputs are
+built on first use (during warmup), not at import, so listing or filtering
+benchmarks stays fast.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent import ResearchAgent, Task
+from benchmarks.harness import benchmark
+from tools.data_analyzer import DataAnalyzerTool
+from tools.report_generator import ReportGeneratorTool
+from tools.web_search import WebSearchTool
+
+SEED = 1234
+QUERY = "Environmental impact of cryptocurrency mining"
+# Simulated backend round trip used by the concurrency benchmarks
+SEARCH_LATENCY_S = 0.005
+
+
+class _LatentSearch(WebSearchTool):
+    """Seeded mock search that waits like a real backend would"""
+
+    def execute(self, query: str, **kwargs) -> Dict[str, Any]:
+        time.sleep(SEARCH_LATENCY_S)
+        return super().execute(query, **kwargs)
+
+    async def aexecute(self, query: str, **kwargs) -> Dict[str, Any]:
+        await asyncio.sleep(SEARCH_LATENCY_S)
+        return super().execute(query, **kwargs)
+
+
+def _latent_agent(index: int) -> ResearchAgent:
+    agent = ResearchAgent(f"{QUERY} #{index}", seed=SEED)
+    agent.tools['web_search'] = _LatentSearch(seed=SEED)
+    return agent
+
+
+def _findings(count: int) -> List[Dict[str, Any]]:
+    search = WebSearchTool(seed=SEED)
+    analyzer = DataAnalyzerTool()
+    findings = []
+    for i in range(count):
+        result = analyzer.execute(data=search.execute(query=f"{QUERY} aspect {i}"))
+        findings.append({'task': f"Aspect {i}", 'result': result})
+    return findings
+
+
+def _tasks(count: int) -> List[Task]:
+    return [Task(description=f"Aspect {i}", status="completed") for i in range(count)]
+
+
+_report_inputs: Dict[int, Tuple[List[Dict[str, Any]], List[Task]]] = {}
+
+
+def _report_input(count: int) -> Tuple[List[Dict[str, Any]], List[Task]]:
+    if count not in _report_inputs:
+        _report_inputs[count] = (_findings(count), _tasks(count))
+    return _report_inputs[count]
+
+
+@benchmark("pipeline.run", repeat=20)
+def bench_run() -> Dict[str, Any]:
+    ResearchAgent(QUERY, seed=SEED).run()
+    return {}
+
+
+@benchmark("pipeline.arun", repeat=20)
+def bench_arun() -> Dict[str, Any]:
+    asyncio.run(ResearchAgent(QUERY, seed=SEED).arun())
+    return {}
+
+
+_search = WebSearchTool(seed=SEED)
+_analyzer = DataAnalyzerTool()
+_search_payload: Optional[Dict[str, Any]] = None
+
+
+@benchmark("tool.web_search.execute", repeat=10, unit="call")
+def bench_web_search() -> Dict[str, Any]:
+    for i in range(200):
+        _search.execute(query=f"{QUERY} {i % 20}")
+    return {'items': 200}
+
+
+@benchmark("tool.data_analyzer.execute", repeat=10, unit="call")
+def bench_data_analyzer() -> Dict[str, Any]:
+    global _search_payload
+    if _search_payload is None:
+        _search_payload = _search.execute(query=QUERY)
+    for _ in range(200):
+        _analyzer.execute(data=_search_payload)
+    return {'items': 200}
+
+
+def _register_report_benchmark(count: int) -> None:
+    generator = ReportGeneratorTool()
+
+    @benchmark(f"tool.report_generator.findings_{count}", repeat=5, unit="finding")
+    def bench_report() -> Dict[str, Any]:
+        findings, tasks = _report_input(count)
+        report = generator.execute(query=QUERY, findings=findings, task_history=tasks)
+        return {'items': count, 'word_count': report['word_count']}
+
+
+for _count in (100, 1000, 5000):
+    _register_report_benchmark(_count)
+
+
+@benchmark("concurrency.threads_64_agents", repeat=3, unit="query")
+def bench_thread_throughput() -> Dict[str, Any]:
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda i: _latent_agent(i).run(), range(64)))
+    return {'items': 64}
+
+
+@benchmark("concurrency.asyncio_256_agents", repeat=3, unit="query")
+def bench_async_throughput() -> Dict[str, Any]:
+    async def main() -> None:
+        await asyncio.gather(*(_latent_agent(i).arun() for i in range(256)))
+    asyncio.run(main())
+    return {'items': 256}
@@ -0,0 +1,88 @@
+"""
+Offline BM25 index: build throughput and query latency at increasing corpus sizes
+
+The corpus is synthetic: words drawn from a Zipf distribution over a fixed
+vocabulary, so term frequencies are skewed like natural text. Corpora and
+indexes are built on first use (in a temporary directory removed at exit),
+not at import.
+"""
+import atexit
+import shutil
+import tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+from tools.search_index import SearchIndex
+
+SEED = 1234
+VOCABULARY = 50_000
+WORDS_PER_DOC = 120
+QUERIES = 200
+
+_workdir = None
+_corpora: Dict[int, List[Dict[str, Any]]] = {}
+_indexes: Dict[int, SearchIndex] = {}
+
+
+def _directory() -> str:
+    global _workdir
+    if _workdir is None:
+        _workdir = tempfile.mkdtemp(prefix="bench-index-")
+        atexit.register(shutil.rmtree, _workdir, True)
+    return tempfile.mkdtemp(dir=_workdir)
+
+
+def _words(rng: np.random.Generator, count: int) -> List[str]:
+    return [f"w{rank}" for rank in np.minimum(rng.zipf(1.1, count), VOCABULARY)]
+
+
+def _corpus(docs: int) -> List[Dict[str, Any]]:
+    if docs in _corpora:
+        return _corpora[docs]
+    rng = np.random.default_rng(SEED)
+    words = _words(rng, docs * WORDS_PER_DOC)
+    _corpora[docs] = [{
+        'id': f"doc-{i}",
+        'title': " ".join(words[i * WORDS_PER_DOC:i * WORDS_PER_DOC + 8]),
+        'text': " ".join(words[i * WORDS_PER_DOC + 8:(i + 1) * WORDS_PER_DOC])
+    } for i in range(docs)]
+    return _corpora[docs]
+
+
+def _queries() -> List[str]:
+    rng = np.random.default_rng(SEED + 1)
+    # Mid-frequency terms: common enough to match many documents, rare enough to discriminate
+    return [" ".join(f"w{rank}" for rank in rng.integers(5, 2000, 3)) for _ in range(QUERIES)]
+
+
+def _index(docs: int) -> SearchIndex:
+    if docs not in _indexes:
+        index = SearchIndex(_directory())
+        index.add(_corpus(docs))
+        _corpora.pop(docs, None)
+        _indexes[docs] = index
+    return _indexes[docs]
+
+
+@benchmark("search_index.build_20000_docs", repeat=3, unit="doc")
+def bench_build() -> Dict[str, Any]:
+    documents = _corpus(20_000)
+    index = SearchIndex(_directory())
+    index.add(documents)
+    size = index.get_stats()['size_bytes']
+    return {'items': len(documents), 'bytes_per_doc': round(size / len(documents), 1)}
+
+
+def _register_queries(docs: int, repeat: int) -> None:
+    @benchmark(f"search_index.query_{docs}_docs", repeat=repeat, unit="query")
+    def bench_query() -> Dict[str, Any]:
+        index = _index(docs)
+        for query in _queries():
+            index.search(query, 10)
+        return {'items': QUERIES, 'index_bytes': index.get_stats()['size_bytes']}
+
+
+for _docs, _repeat in ((10_000, 10), (100_000, 5)):
+    _register_queries(_docs, _repeat)
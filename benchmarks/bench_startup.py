@@ -0,0 +1,45 @@
+"""
+Import and construction cost, as paid by short-lived CLI runs and per-request agents
+
+The import benchmarks start a fresh interpreter each iteration; compare
+``startup.import_agent`` with ``startup.interpreter`` to see what importing
+the agent itself costs.
+"""
+import os
+import subprocess
+import sys
+from typing import Any, Dict
+
+from agent import ResearchAgent
+from benchmarks.harness import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(code: str) -> None:
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+@benchmark("startup.interpreter", repeat=10)
+def bench_interpreter() -> Dict[str, Any]:
+    _python("pass")
+    return {}
+
+
+@benchmark("startup.import_agent", repeat=10)
+def bench_import_agent() -> Dict[str, Any]:
+    _python("import agent")
+    return {}
+
+
+@benchmark("startup.import_batch", repeat=10)
+def bench_import_batch() -> Dict[str, Any]:
+    _python("import batch")
+    return {}
+
+
+@benchmark("startup.construct_agent", repeat=10, unit="agent")
+def bench_construct_agent() -> Dict[str, Any]:
+    for i in range(1000):
+        ResearchAgent(f"startup benchmark {i}")
+    return {'items': 1000}
@@ -0,0 +1,144 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import configure_logging
+
+# Log I/O would dominate the timings of the mock tools
+configure_logging(level="off")
+
+# name -> (function, repeat); functions run one iteration and may return extra metrics
+_REGISTRY: Dict[str, Dict[str, Any]] = {}
+
+
+def benchmark(name: str, repeat: int = 5, warmup: int = 1, unit: Optional[str] = None) -> Callable:
+    """
+    Register a benchmark
+
+    The decorated function runs one iteration and may return a dict of extra
+    metrics (the last iteration's are kept). If ``unit`` is given, the
+    function must return ``{'items': n}`` and throughput is reported as
+    ``<unit>/s``.
+
+    Args:
+        name: Unique, dotted benchmark name (used for filtering and comparison)
+        repeat: Timed iterations
+        warmup: Untimed iterations run first
+        unit: Name of the item counted for throughput
+    """
+    def decorator(func: Callable) -> Callable:
+        if name in _REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        _REGISTRY[name] = {'func': func, 'repeat': repeat, 'warmup': warmup, 'unit': unit}
+        return func
+    return decorator
+
+
+def registered() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+def run_benchmarks(pattern: str = "", quick: bool = False, out: Any = sys.stderr) -> Dict[str, Any]:
+    """
+    Run every registered benchmark whose name contains ``pattern``
+
+    Args:
+        pattern: Substring filter on benchmark names
+        quick: Single timed iteration, no warmup (smoke testing)
+        out: Stream for progress lines
+
+    Returns:
+        Results document suitable for ``save_results``
+    """
+    results: Dict[str, Any] = {}
+    for name in registered():
+        if pattern and pattern not in name:
+            continue
+        spec = _REGISTRY[name]
+        repeat = 1 if quick else spec['repeat']
+        for _ in range(0 if quick else spec['warmup']):
+            spec['func']()
+
+        timings = []
+        extra: Dict[str, Any] = {}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extra = spec['func']() or {}
+            timings.append(time.perf_counter() - start)
+
+        entry: Dict[str, Any] = {
+            'median_s': statistics.median(timings),
+            'min_s': min(timings),
+            'max_s': max(timings),
+            'repeat': repeat
+        }
+        if spec['unit']:
+            entry['throughput'] = extra.get('items', 0) / entry['median_s'] if entry['median_s'] else 0.0
+            entry['unit'] = f"{spec['unit']}/s"
+        entry.update({k: v for k, v in extra.items() if k != 'items'})
+        results[name] = entry
+        line = f"{name:<45} median {entry['median_s'] * 1000:10.3f} ms"
+        if 'throughput' in entry:
+            line += f"  {entry['throughput']:12.1f} {entry['unit']}"
+        for key, value in extra.items():
+            if key != 'items' and isinstance(value, (int, float)):
+                line += f"  {key}={value}"
+        print(line, file=out, flush=True)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'quick': quick
+        },
+        'results': results
+    }
+
+
+def save_results(document: Dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare median timings benchmark by benchmark
+
+    Args:
+        baseline: Earlier results document
+        current: New results document
+        threshold: Relative slowdown tolerated before flagging a regression
+
+    Returns:
+        One row per benchmark present in both documents, with the ratio
+        current/baseline and a ``status`` of regression, improvement or ok
+    """
+    rows = []
+    for name, base in sorted(baseline.get('results', {}).items()):
+        now = current.get('results', {}).get(name)
+        if now is None or not base.get('median_s'):
+            continue
+        ratio = now['median_s'] / base['median_s']
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({
+            'name': name,
+            'baseline_s': base['median_s'],
+            'current_s': now['median_s'],
+            'ratio': ratio,
+            'status': status
+        })
+    return rows
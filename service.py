@@ -0,0 +1,303 @@
+"""
+Research service
+
+A long-running local HTTP server that keeps tools and the search cache warm
+and runs research queries on a bounded worker pool. At most ``--workers``
+queries run at once and at most ``--max-queue`` more wait for a worker;
+anything beyond that is rejected immediately with HTTP 503 and a
+``Retry-After`` header instead of piling up and inflating tail latency.
+
+Endpoints:
+    POST /research   {"query": "...", "seed": 42, "deadline": 5}  -> report JSON
+                     (200), 400 on bad input, 503 when saturated. With a
+                     deadline (seconds, or --deadline by default) the report
+                     covers whatever finished in time.
+    GET  /status     queue depth, in-flight count and service counters
+    GET  /health     liveness check
+
+Usage:
+    python service.py --port 8080 --workers 4 --max-queue 16 --cache cache.db
+    python service.py --index corpus.idx   # answer from a local BM25 index
+    curl -s localhost:8080/research -d '{"query": "solar power"}'
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent import ResearchAgent
+from tools.decomposer import Decomposer, LLMDecomposer
+from tools.records import json_default
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+from utils.logger import configure_logging, log
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ServiceOverloadedError(Exception):
+    """Raised when a query arrives while every worker is busy and the queue is full"""
+
+
+class ResearchService:
+    """
+    Bounded pool of research workers sharing one warm search cache
+
+    Admission is decided up front: ``submit`` either accepts a query (it runs
+    now or waits in a queue of at most ``max_queue``) or raises
+    ServiceOverloadedError without doing any work.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 16, cache_path: Optional[str] = None,
+                 agent_workers: int = 4, decomposer: Optional[Decomposer] = None,
+                 deadline: Optional[float] = None, search_index: Optional[str] = None):
+        """
+        Args:
+            workers: Queries run concurrently
+            max_queue: Accepted queries allowed to wait for a worker
+            cache_path: SQLite file backing the search cache (memory only if omitted)
+            agent_workers: Task-level parallelism inside each query
+            decomposer: Planner shared by every query (default: rule-based)
+            deadline: Default time budget per query in seconds (None for no limit)
+            search_index: Directory of a local BM25 index searched instead of the web
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.agent_workers = agent_workers
+        self.decomposer = decomposer
+        self.deadline = deadline
+        self.search_index = search_index
+        self.cache = TieredCache(LRUCache(), SQLiteCache(cache_path) if cache_path else None)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="research")
+        self._lock = threading.Lock()
+        self._accepted = 0  # queued + running
+        self._running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.started_at = time.time()
+
+    def warm_up(self) -> None:
+        """Run a throwaway query so tool imports and construction happen before the first request"""
+        self.run_query("warm-up")
+
+    def _new_agent(self, query: str, seed: Optional[int] = None) -> ResearchAgent:
+        return ResearchAgent(query, max_workers=self.agent_workers, search_cache=self.cache, seed=seed,
+                             decomposer=self.decomposer, search_index=self.search_index)
+
+    def run_query(self, query: str, seed: Optional[int] = None, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Run one query on the calling thread"""
+        with self._new_agent(query, seed) as agent:
+            report = agent.run(deadline=deadline if deadline is not None else self.deadline)
+            if 'partial_findings' in report:
+                # Read back from the spill file before the agent deletes it
+                report['partial_findings'] = list(report['partial_findings'])
+            return {'report': report, 'agent_status': agent.get_status()}
+
+    def submit(self, query: str, seed: Optional[int] = None, deadline: Optional[float] = None) -> Future:
+        """
+        Queue a query for the worker pool
+
+        Returns:
+            Future resolving to ``{'report': ..., 'agent_status': ...}``
+
+        Raises:
+            ServiceOverloadedError: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            if self._accepted >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ServiceOverloadedError(
+                    f"Service saturated: {self.workers} queries running and {self.max_queue} queued"
+                )
+            self._accepted += 1
+        try:
+            return self._executor.submit(self._work, query, seed, deadline, time.monotonic())
+        except BaseException:
+            with self._lock:
+                self._accepted -= 1
+            raise
+
+    def _work(self, query: str, seed: Optional[int], deadline: Optional[float], queued_at: float) -> Dict[str, Any]:
+        with self._lock:
+            self._running += 1
+        succeeded = False
+        try:
+            budget = deadline if deadline is not None else self.deadline
+            if budget is not None:
+                # Time spent waiting for a worker counts against the query's budget
+                budget = max(0.0, budget - (time.monotonic() - queued_at))
+            result = self.run_query(query, seed, budget)
+            succeeded = result['report'].get('status') == 'success'
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._accepted -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        """Service load and counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._running,
+                'queue_depth': self._accepted - self._running,
+                'saturated': self._accepted >= self.workers + self.max_queue,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'uptime_s': round(time.time() - self.started_at, 3),
+                'cache': self.cache.get_stats(),
+                'decomposer': self.decomposer.get_stats() if isinstance(self.decomposer, LLMDecomposer) else None
+            }
+
+    def close(self) -> None:
+        """Finish accepted queries, then release the pool and the cache"""
+        self._executor.shutdown(wait=True)
+        if self.cache.disk is not None:
+            self.cache.disk.close()
+
+
+class ResearchRequestHandler(BaseHTTPRequestHandler):
+    """JSON-over-HTTP front end for the ResearchService attached to the server"""
+
+    server_version = "ResearchService/1.0"
+
+    @property
+    def service(self) -> ResearchService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        if self.path == '/status':
+            self._send(200, self.service.get_status())
+        elif self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        else:
+            self._send(404, {'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != '/research':
+            self._send(404, {'error': f"Unknown path: {self.path}"})
+            return
+        request, error = self._read_request()
+        if error:
+            self._send(400, {'error': error})
+            return
+        try:
+            future = self.service.submit(request['query'], request.get('seed'), request.get('deadline'))
+        except ServiceOverloadedError as e:
+            self._send(503, {'error': str(e), 'status': self.service.get_status()}, {'Retry-After': '1'})
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            self._send(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, result)
+
+    def _read_request(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Parsed and validated request body, or an error message"""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            return {}, "Invalid Content-Length"
+        if length > MAX_BODY_BYTES:
+            return {}, f"Request body larger than {MAX_BODY_BYTES} bytes"
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return {}, f"Invalid JSON: {e}"
+        if not isinstance(request, dict):
+            return {}, "Request must be a JSON object"
+        if not isinstance(request.get('query'), str) or not request['query'].strip():
+            return {}, "Request has no 'query' string"
+        if request.get('seed') is not None and not isinstance(request['seed'], int):
+            return {}, "'seed' must be an integer"
+        deadline = request.get('deadline')
+        if deadline is not None and (isinstance(deadline, bool) or not isinstance(deadline, (int, float))
+                                     or deadline <= 0):
+            return {}, "'deadline' must be a positive number of seconds"
+        return request, None
+
+    def _send(self, code: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, default=json_default).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log(f"{self.address_string()} {format % args}", "debug")
+
+
+def create_server(service: ResearchService, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Bind an HTTP server for a service (``port=0`` picks a free port)
+
+    Call ``serve_forever()`` on the result, e.g. in a background thread for tests.
+    """
+    server = ThreadingHTTPServer((host, port), ResearchRequestHandler)
+    server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve research queries over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('-w', '--workers', type=int, default=4, help="Queries run concurrently")
+    parser.add_argument('--max-queue', type=int, default=16, help="Queries allowed to wait for a worker")
+    parser.add_argument('--cache', default=None, help="SQLite file for a persistent search cache")
+    parser.add_argument('--llm-url', default=None,
+                        help="OpenAI-compatible API root for query decomposition (default: rule-based plans)")
+    parser.add_argument('--llm-model', default='gpt-4o-mini', help="Model used with --llm-url")
+    parser.add_argument('--deadline', type=float, default=None,
+                        help="Default time budget per query in seconds (requests may set their own)")
+    parser.add_argument('--index', default=None,
+                        help="Directory of a BM25 index (tools/search_index.py) to search instead of the web")
+    parser.add_argument('--log-level', default='warning', help="Agent log level (default: warning)")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_queue < 0:
+        parser.error("--max-queue must not be negative")
+
+    configure_logging(level=args.log_level, stream=sys.stderr)
+    service = ResearchService(args.workers, args.max_queue, args.cache, deadline=args.deadline,
+                              search_index=args.index)
+    if args.llm_url:
+        # Plans share the service's cache (and its SQLite file, when given)
+        service.decomposer = LLMDecomposer(args.llm_url, args.llm_model, cache=service.cache)
+    service.warm_up()
+    server = create_server(service, args.host, args.port)
+    print(f"Serving research queries on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Modules live at the repository root (``import agent``, ``import utils...``), not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import error_handler, rate_limit  # noqa: E402
+from utils.logger import configure_logging  # noqa: E402
+from tests.stubs import StubServer, search_payload  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _isolated_process_state():
+    """Keep process-wide breakers and rate limiters from leaking between tests, and agent logging quiet"""
+    configure_logging(level='off')
+    error_handler._breakers.clear()
+    rate_limit._limiters.clear()
+    yield
+    error_handler._breakers.clear()
+    rate_limit._limiters.clear()
+
+
+@pytest.fixture
+def stub_server():
+    """Factory for stub servers that are shut down after the test"""
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def search_backend(stub_server):
+    """Search backend that answers after ``server.delay`` seconds"""
+    def handle(method, path, body):
+        time.sleep(server.delay)
+        query = parse_qs(urlparse(path).query).get('q', [''])[0]
+        return 200, search_payload(query)
+
+    server = stub_server(handle)
+    server.delay = 0.0
+    return server
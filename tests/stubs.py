@@ -0,0 +1,65 @@
+"""Local HTTP stand-ins for the search and LLM backends used by the tests"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """
+    Local HTTP server answering every request through ``handler(method, path, body)``
+
+    The handler returns ``(status, payload)`` or ``(status, payload, headers)``;
+    every request is recorded in ``requests``.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+                with stub._lock:
+                    stub.requests.append((self.command, self.path, body))
+                status, payload, *headers = stub.handler(self.command, self.path, body)
+                data = json.dumps(payload).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    for name, value in (headers[0] if headers else {}).items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up waiting (e.g. a timeout under test)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def search_payload(query, count=3):
+    """A search backend response with ``count`` results that differ per query"""
+    return {'results': [{
+        'title': f"{query} result {i}",
+        'url': f"https://example.com/{abs(hash((query, i)))}",
+        'source': "Example",
+        'summary': f"Result {i} for {query}",
+        'relevance_score': 0.9 - i * 0.1,
+        'date': "2024-01-0{}".format(i + 1)
+    } for i in range(count)]}
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from agent import ResearchAgent
+from tests.stubs import search_payload
+from tools.data_analyzer import DataAnalyzerTool
+from tools.records import json_default
+from tools.web_search import WebSearchTool
+from utils.error_handler import RetryPolicy, get_breaker
+from utils.findings_store import FindingsStore
+from utils.journal import RunJournal
+
+
+def _agent(query, url, **kwargs):
+    agent = ResearchAgent(query, **kwargs)
+    agent.tools['web_search'] = WebSearchTool(endpoint=url, coalesce=False)
+    # No backoff sleeps under test
+    agent.retry_policy = RetryPolicy(max_attempts=agent.max_retries, delay=0.0, jitter=False)
+    return agent
+
+
+def _query_of(path):
+    return parse_qs(urlparse(path).query).get('q', [''])[0]
+
+
+@pytest.fixture
+def flaky_backend(stub_server):
+    """Search backend returning 500 for queries containing any of ``server.failing`` (a set of words)"""
+    def handle(method, path, body):
+        query = _query_of(path)
+        if any(word in query for word in server.failing):
+            return 500, {'error': "backend down"}
+        return 200, search_payload(query)
+
+    server = stub_server(handle)
+    server.failing = set()
+    return server
+
+
+@pytest.mark.parametrize("mode", ['run', 'arun'])
+def test_run_and_arun_search_the_backend(search_backend, mode):
+    agent = _agent("solar power", search_backend.url)
+    report = agent.run() if mode == 'run' else asyncio.run(agent.arun())
+    assert report['status'] == 'success'
+    assert sorted(_query_of(path) for _, path, _ in search_backend.requests) == [
+        "Analyze current trends in solar power",
+        "Background research on solar power",
+        "Recommendations regarding solar power"
+    ]
+    assert all(task.status == "completed" for task in agent.task_history)
+    assert "solar power result 0" in json.dumps(list(agent._search_results), default=json_default)
+
+
+
+def test_closing_the_agent_deletes_its_spill_files(search_backend, tmp_path):
+    with _agent("solar power", search_backend.url, spill_dir=str(tmp_path)) as agent:
+        agent.findings = FindingsStore(memory_budget=0, spill_dir=str(tmp_path))
+        agent._search_results = FindingsStore(memory_budget=0, spill_dir=str(tmp_path))
+        assert agent.run()['status'] == 'success'
+        assert len(list(tmp_path.iterdir())) == 2
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.parametrize("mode", ['run', 'arun'])
+def test_independent_tasks_run_concurrently_and_findings_keep_plan_order(search_backend, mode):
+    search_backend.delay = 0.3
+    agent = _agent("solar power", search_backend.url, max_workers=3)
+    started = time.monotonic()
+    report = agent.run() if mode == 'run' else asyncio.run(agent.arun())
+    # Three 0.3s searches one after another would take at least 0.9s
+    assert time.monotonic() - started < 0.8
+    assert report['status'] == 'success'
+    assert [finding['task'] for finding in agent.findings] == [task.description for task in agent.task_history]
+
+
+def test_transient_backend_errors_are_retried_per_tool(stub_server):
+    attempts = []
+
+    def handle(method, path, body):
+        attempts.append(_query_of(path))
+        if len(attempts) == 1:
+            return 500, {'error': "hiccup"}
+        return 200, search_payload(_query_of(path))
+
+    server = stub_server(handle)
+    agent = _agent("wind power", server.url, max_workers=1)
+    assert agent.run()['status'] == 'success'
+    assert len(attempts) == 4
+    assert agent.retry_budget.spent == 1
+    assert agent.get_status()['tasks_completed'] == 3
+
+
+class _FlakyAnalyzer(DataAnalyzerTool):
+    """Fails the first analysis of each task"""
+
+    def __init__(self):
+        self.seen = set()
+
+    def execute(self, data, **kwargs):
+        if data['query'] not in self.seen:
+            self.seen.add(data['query'])
+            raise ValueError("analyzer hiccup")
+        return super().execute(data, **kwargs)
+
+
+@pytest.mark.parametrize("mode", ['run', 'arun'])
+def test_completed_stages_are_not_rerun_when_a_later_one_is_retried(search_backend, mode):
+    agent = _agent("wave energy", search_backend.url)
+    agent.tools['data_analyzer'] = _FlakyAnalyzer()
+    report = agent.run() if mode == 'run' else asyncio.run(agent.arun())
+    assert report['status'] == 'success'
+    assert all(task.status == "completed" for task in agent.task_history)
+    # Two tasks analyze; each analysis failed once, but no search was repeated
+    assert len(search_backend.requests) == 3
+    assert agent.retry_budget.spent == 2
+    assert agent.tracer.get_metrics()['counters']['retries.data_analyzer'] == 2
+
+
+class _RecordingAnalyzer(DataAnalyzerTool):
+    def analyze_batch(self, datasets, task_ids=None):
+        self.overall = super().analyze_batch(datasets, task_ids)
+        return self.overall
+
+
+def test_per_task_analysis_uses_the_agents_task_indices(flaky_backend):
+    flaky_backend.failing = {"Background"}
+    agent = _agent("ocean power", flaky_backend.url)
+    agent.tools['data_analyzer'] = analyzer = _RecordingAnalyzer()
+    agent.run()
+    assert [task.status for task in agent.task_history] == ["failed", "completed", "completed"]
+    assert [entry['task'] for entry in analyzer.overall['per_task']] == [1, 2]
+
+
+@pytest.mark.parametrize("mode", ['run', 'arun'])
+def test_open_breaker_stops_calls_to_a_failing_backend(flaky_backend, mode):
+    flaky_backend.failing = {"research", "trends", "Recommendations"}
+    first = _agent("geothermal", flaky_backend.url, max_workers=1)
+    first.run() if mode == 'run' else asyncio.run(first.arun())
+    assert get_breaker('web_search', flaky_backend.url).state == "open"
+    assert all(task.status == "failed" for task in first.task_history)
+    requests_made = len(flaky_backend.requests)
+
+    second = _agent("geothermal", flaky_backend.url)
+    second.run() if mode == 'run' else asyncio.run(second.arun())
+    assert len(flaky_backend.requests) == requests_made
+    assert second.get_status()['circuit_breakers']['web_search']['state'] == "open"
+
+
+def test_broken_backend_does_not_open_the_breaker_of_agents_using_another(flaky_backend, search_backend):
+    flaky_backend.failing = {"research", "trends", "Recommendations"}
+    broken = _agent("geothermal", flaky_backend.url, max_workers=1)
+    broken.run()
+    assert broken.get_status()['circuit_breakers']['web_search']['state'] == "open"
+
+    healthy = _agent("geothermal", search_backend.url)
+    assert healthy.run()['status'] == 'success'
+    assert len(search_backend.requests) == 3
+    assert healthy.get_status()['circuit_breakers']['web_search']['state'] == "closed"
+
+
+def test_half_open_trial_cut_short_by_a_deadline_does_not_wedge_the_breaker(search_backend):
+    breaker = get_breaker('web_search', search_backend.url, failure_threshold=1, recovery_timeout=0.0)
+    breaker.record_failure()
+    search_backend.delay = 0.5
+    hurried = _agent("hydro power", search_backend.url, max_workers=1)
+    assert asyncio.run(hurried.arun(deadline=0.2))['timed_out_tasks']
+
+    search_backend.delay = 0.0
+    # One task at a time: while half-open, only a single trial call is let through
+    patient = _agent("hydro power", search_backend.url, max_workers=1)
+    assert asyncio.run(patient.arun())['status'] == 'success'
+    assert all(task.status == "completed" for task in patient.task_history)
+    assert breaker.state == "closed"
+
+
+def test_resume_reruns_only_unfinished_tasks(flaky_backend, tmp_path):
+    journal = str(tmp_path / "run.jsonl")
+    flaky_backend.failing = {"Recommendations"}
+    first = _agent("tidal power", flaky_backend.url, journal_path=journal)
+    first.run()
+    assert [task.status for task in first.task_history] == ["completed", "completed", "failed"]
+    assert RunJournal(journal).replay().statuses == {0: "completed", 1: "completed", 2: "failed"}
+
+    flaky_backend.failing = set()
+    requests_before = len(flaky_backend.requests)
+    resumed = ResearchAgent.resume(journal)
+    resumed.tools['web_search'] = WebSearchTool(endpoint=flaky_backend.url, coalesce=False)
+    assert resumed.run()['status'] == 'success'
+    assert [_query_of(path) for _, path, _ in flaky_backend.requests[requests_before:]] == [
+        "Recommendations regarding tidal power"
+    ]
+    assert resumed._restored == {0, 1}
+    assert all(task.status == "completed" for task in resumed.task_history)
+    assert RunJournal(journal).replay().completed
+
+
+def test_resume_ignores_a_torn_journal_tail(search_backend, tmp_path):
+    journal = str(tmp_path / "run.jsonl")
+    _agent("wave power", search_backend.url, journal_path=journal).run()
+    with open(journal, 'a', encoding='utf-8') as f:
+        f.write('{"event": "task", "index": 0, "sta')
+    state = RunJournal(journal).replay()
+    assert state.completed and state.statuses[0] == "completed"
+
+
+def test_resume_requires_a_recorded_run(tmp_path):
+    with pytest.raises(ValueError):
+        ResearchAgent.resume(str(tmp_path / "missing.jsonl"))
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from tools.analysis_engine import (ResultTable, analyze_table, date_histogram, per_task_relevance,
+                                   relevance_stats, source_distribution, trend)
+from tools.data_analyzer import DataAnalyzerTool
+from tools.records import ResultSet
+
+RESULTS = [
+    {'title': "a", 'url': "u1", 'source': "Journal", 'summary': "", 'relevance_score': 0.9, 'date': "2024-01-15"},
+    {'title': "b", 'url': "u2", 'source': "Blog", 'summary': "", 'relevance_score': 0.5, 'date': "2024-02-03"},
+    {'title': "c", 'url': "u3", 'source': "Journal", 'summary': "", 'relevance_score': 0.7, 'date': "not a date"},
+    {'title': "d", 'url': "u4", 'source': "News", 'summary': "", 'relevance_score': 0.3, 'date': "2024-02-20"},
+]
+
+
+def _rows(results):
+    return [(r['title'], r['url'], r['source'], r['summary'], r['relevance_score'], r['date']) for r in results]
+
+
+def test_result_sets_and_dicts_give_the_same_table():
+    from_dicts = ResultTable.from_results(RESULTS, task_id=2)
+    from_set = ResultTable.from_results(ResultSet(_rows(RESULTS)), task_id=2)
+    assert from_set.sources == from_dicts.sources == ["Blog", "Journal", "News"]
+    np.testing.assert_array_equal(from_set.source_codes, from_dicts.source_codes)
+    np.testing.assert_array_equal(from_set.relevance, from_dicts.relevance)
+    np.testing.assert_array_equal(from_set.dates, from_dicts.dates)
+    assert from_set.task_ids.tolist() == [2, 2, 2, 2]
+    assert np.isnat(from_set.dates[2])
+
+
+def test_relevance_stats_match_numpy_and_ignore_nan():
+    values = np.array([0.9, 0.5, np.nan, 0.7, 0.3])
+    stats = relevance_stats(values)
+    valid = values[~np.isnan(values)]
+    assert stats['count'] == 4
+    assert stats['mean'] == pytest.approx(valid.mean(), abs=1e-4)
+    assert stats['median'] == pytest.approx(np.median(valid), abs=1e-4)
+    assert (stats['min'], stats['max']) == (0.3, 0.9)
+    assert relevance_stats(np.array([np.nan])) == {'count': 0}
+
+
+def test_source_distribution_orders_by_count():
+    distribution = source_distribution(ResultTable.from_results(RESULTS))
+    assert [(d['source'], d['count']) for d in distribution] == [("Journal", 2), ("Blog", 1), ("News", 1)]
+    assert distribution[0]['share'] == 0.5
+    assert distribution[0]['mean_relevance'] == pytest.approx(0.8)
+
+
+def test_date_histogram_and_trend():
+    table = ResultTable.from_results(RESULTS)
+    assert date_histogram(table.dates) == {'2024-01': 1, '2024-02': 2}
+    dates = np.array(["2024-01-01"] + ["2024-02-01"] * 2 + ["2024-03-01"] * 4, dtype='datetime64[D]')
+    rising = trend(dates, np.linspace(0.2, 0.8, len(dates)))
+    assert rising['direction'] == 'increasing'
+    assert rising['volume_slope'] == pytest.approx(1.5)
+    assert rising['relevance_slope'] > 0
+    assert trend(np.array(['NaT'], dtype='datetime64[D]'), np.array([0.5]))['direction'] == 'unknown'
+
+
+def test_concat_merges_source_vocabularies():
+    table = ResultTable.concat([ResultTable.from_results(RESULTS[:2], task_id=0),
+                                ResultTable.from_results(RESULTS[2:], task_id=1)])
+    assert table.sources == ["Blog", "Journal", "News"]
+    assert [table.sources[c] for c in table.source_codes] == [r['source'] for r in RESULTS]
+    assert analyze_table(table)['result_count'] == 4
+
+
+def test_per_task_relevance_groups_rows_by_task():
+    table = ResultTable.concat([ResultTable.from_results(RESULTS[:2], task_id=0),
+                                ResultTable.from_results(RESULTS[2:], task_id=2)])
+    per_task = per_task_relevance(table, 3)
+    assert [(t['task'], t['count']) for t in per_task] == [(0, 2), (1, 0), (2, 2)]
+    assert per_task[0]['mean_relevance'] == pytest.approx(0.7)
+    assert per_task[1]['mean_relevance'] is None
+    assert (per_task[2]['min_relevance'], per_task[2]['max_relevance']) == (0.3, 0.7)
+
+
+def test_per_task_relevance_reports_the_given_task_ids():
+    table = ResultTable.concat([ResultTable.from_results(RESULTS[:2], task_id=1),
+                                ResultTable.from_results(RESULTS[2:], task_id=4)])
+    assert [(t['task'], t['count']) for t in per_task_relevance(table, task_ids=[1, 4])] == [(1, 2), (4, 2)]
+
+
+def test_analyze_batch_keeps_the_callers_task_ids():
+    responses = [{'results': RESULTS[:2]}, {'results': RESULTS[2:]}]
+    per_task = DataAnalyzerTool().analyze_batch(iter(responses), task_ids=[2, 5])['per_task']
+    assert [(t['task'], t['count']) for t in per_task] == [(2, 2), (5, 2)]
+    assert [t['task'] for t in DataAnalyzerTool().analyze_batch(responses)['per_task']] == [0, 1]
+
+
+def test_analyzer_summarizes_a_search_response():
+    analysis = DataAnalyzerTool().execute({'query': "q", 'results': ResultSet(_rows(RESULTS))})
+    assert analysis['key_metrics']['result_count'] == 4
+    assert analysis['key_metrics']['distinct_sources'] == 3
+    assert "Broaden the search to collect more evidence" in analysis['recommendations']
+    assert DataAnalyzerTool().execute({'results': []})['insights'] == ["No results to analyze"]
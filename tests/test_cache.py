@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from tools.decomposer import LLMDecomposer
+from tools.web_search import WebSearchTool
+from utils.cache import LRUCache, SQLiteCache, TieredCache, make_cache_key, normalize_query
+
+LANGUAGES = ["memory safety in C++", "memory safety in C#", "memory safety in C"]
+
+
+@pytest.mark.parametrize("query", ["Solar  power?", "  solar power ", "SOLAR POWER ?", "solar\tpower"])
+def test_case_whitespace_and_trailing_question_mark_are_ignored(query):
+    assert normalize_query(query) == "solar power"
+
+
+def test_other_punctuation_distinguishes_queries():
+    assert len({make_cache_key('web_search', query) for query in LANGUAGES}) == 3
+    assert make_cache_key('web_search', "solar power!") != make_cache_key('web_search', "solar power")
+
+
+def test_search_and_decomposer_keys_keep_languages_apart():
+    search = WebSearchTool(cache=TieredCache(LRUCache()))
+    assert len({search._flight_key(query) for query in LANGUAGES}) == 3
+    decomposer = LLMDecomposer("http://127.0.0.1:9/v1", "model")
+    try:
+        assert len({decomposer._cache_key(query) for query in LANGUAGES}) == 3
+    finally:
+        decomposer.close()
+
+
+def test_cached_search_is_not_served_for_a_different_language():
+    search = WebSearchTool(cache=TieredCache(LRUCache()), seed=1)
+    first = search.execute(query="memory safety in C++")
+    assert search.execute(query="Memory safety in C++?") == first
+    assert search.execute(query="memory safety in C#")['results'] != first['results']
+    assert search.cache.get_stats()['memory']['hits'] == 1
+
+
+def test_lru_expires_and_evicts():
+    cache = LRUCache(max_entries=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None and cache.get("c") == 3
+    time.sleep(0.06)
+    assert cache.get("c") is None
+
+
+def test_sqlite_tier_refills_memory(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = TieredCache(LRUCache(), SQLiteCache(path))
+    writer.set("key", {"value": 1})
+    writer.disk.close()
+    reader = TieredCache(LRUCache(), SQLiteCache(path))
+    try:
+        assert reader.get("key") == {"value": 1}
+        assert reader.memory.get("key") == {"value": 1}
+    finally:
+        reader.disk.close()
+
+
+def test_disk_hit_keeps_its_remaining_ttl_in_memory(tmp_path):
+    cache = TieredCache(LRUCache(ttl=3600), SQLiteCache(str(tmp_path / "cache.db")))
+    try:
+        cache.disk.set("key", {"value": 1}, ttl=0.2)
+        assert cache.get("key") == {"value": 1}
+        time.sleep(0.25)
+        assert cache.get("key") is None
+        assert cache.memory.get("key") is None
+    finally:
+        cache.disk.close()
+
+
+def test_disk_hit_never_outlives_the_memory_ttl(tmp_path):
+    cache = TieredCache(LRUCache(ttl=0.1), SQLiteCache(str(tmp_path / "cache.db")))
+    try:
+        cache.disk.set("key", {"value": 1}, ttl=None)
+        assert cache.get("key") == {"value": 1}
+        time.sleep(0.15)
+        assert cache.memory.get("key") is None
+        assert cache.get("key") == {"value": 1}
+    finally:
+        cache.disk.close()
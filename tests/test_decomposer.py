@@ -0,0 +1,138 @@
+import json
+import re
+import threading
+import time
+
+import pytest
+
+import batch
+from agent import ResearchAgent
+from tools.decomposer import Decomposer, LLMDecomposer, RuleBasedDecomposer
+from utils.deadline import Deadline
+
+
+def _completion(content):
+    return {
+        'id': "chatcmpl-stub", 'object': "chat.completion", 'created': 0, 'model': "stub",
+        'choices': [{'index': 0, 'finish_reason': "stop", 'message': {'role': "assistant", 'content': content}}]
+    }
+
+
+def _plans_for(body):
+    """Answer a planning request with one two-task plan per numbered query"""
+    prompt = json.loads(body)['messages'][-1]['content']
+    queries = re.findall(r"^(\d+)\. (.+)$", prompt, re.MULTILINE)
+    return {'plans': [{'id': int(number), 'tasks': [
+        {'description': f"Survey {query}", 'required_tools': ["web_search"]},
+        {'description': f"Quantify {query}", 'required_tools': ["data_analyzer"], 'depends_on': [0]}
+    ]} for number, query in queries]}
+
+
+@pytest.fixture
+def llm_server(stub_server):
+    def handle(method, path, body):
+        time.sleep(server.delay)
+        if server.fail:
+            return 500, {'error': {'message': "model unavailable"}}
+        return 200, _completion(json.dumps(_plans_for(body)))
+
+    server = stub_server(handle)
+    server.delay = 0.0
+    server.fail = False
+    return server
+
+
+@pytest.fixture
+def make_decomposer(llm_server):
+    decomposers = []
+
+    def make(**kwargs):
+        decomposer = LLMDecomposer(f"{llm_server.url}/v1", "stub", **kwargs)
+        decomposers.append(decomposer)
+        return decomposer
+
+    yield make
+    for decomposer in decomposers:
+        decomposer.close()
+
+
+def test_decomposer_is_abstract():
+    with pytest.raises(TypeError):
+        Decomposer()
+
+
+def test_concurrent_queries_share_one_request(llm_server, make_decomposer):
+    decomposer = make_decomposer(max_wait=0.3)
+    queries = [f"topic {i}" for i in range(5)]
+    plans = {}
+    threads = [threading.Thread(target=lambda q=query: plans.__setitem__(q, decomposer.decompose(q)))
+               for query in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert len(llm_server.requests) == 1
+    for query in queries:
+        assert plans[query] == [
+            {'description': f"Survey {query}", 'required_tools': ["web_search"], 'depends_on': []},
+            {'description': f"Quantify {query}", 'required_tools': ["web_search", "data_analyzer"],
+             'depends_on': [0]}
+        ]
+    assert decomposer.get_stats()['planned'] == 5
+
+
+def test_plans_are_cached_by_normalized_query(llm_server, make_decomposer):
+    decomposer = make_decomposer(max_wait=0.0)
+    first = decomposer.decompose("Solar power?")
+    assert decomposer.decompose("solar  power") == first
+    assert len(llm_server.requests) == 1
+    assert decomposer.get_stats()['cache_hits'] == 1
+
+
+def test_server_error_falls_back_to_rules_without_caching(llm_server, make_decomposer):
+    llm_server.fail = True
+    decomposer = make_decomposer(max_wait=0.0)
+    assert decomposer.decompose("wind energy") == RuleBasedDecomposer().decompose("wind energy")
+    llm_server.fail = False
+    assert decomposer.decompose("wind energy")[0]['description'] == "Survey wind energy"
+    stats = decomposer.get_stats()
+    assert (stats['fallbacks'], stats['failed_requests'], stats['planned']) == (1, 1, 1)
+
+
+def test_slow_model_falls_back_after_timeout(llm_server, make_decomposer):
+    llm_server.delay = 1.0
+    decomposer = make_decomposer(max_wait=0.0, timeout=0.2)
+    started = time.monotonic()
+    assert decomposer.decompose("tidal power") == RuleBasedDecomposer().decompose("tidal power")
+    assert time.monotonic() - started < 0.8
+
+
+def test_deadline_cuts_the_wait_for_a_plan_short(llm_server, make_decomposer):
+    llm_server.delay = 2.0
+    decomposer = make_decomposer(max_wait=0.0, timeout=6)
+    started = time.monotonic()
+    assert decomposer.decompose("tidal power", Deadline(0.2)) == RuleBasedDecomposer().decompose("tidal power")
+    assert time.monotonic() - started < 1.0
+    assert decomposer.get_stats()['fallbacks'] == 1
+
+
+def test_run_deadline_reaches_decomposition(llm_server, make_decomposer):
+    llm_server.delay = 3.0
+    agent = ResearchAgent("tidal power", decomposer=make_decomposer(max_wait=0.0, timeout=6))
+    started = time.monotonic()
+    report = agent.run(deadline=0.5)
+    assert time.monotonic() - started < 2.0
+    assert [task.description for task in agent.task_history][0] == "Background research on tidal power"
+    assert report['timed_out_tasks'] == 3
+
+
+def test_process_workers_do_not_wait_to_batch(llm_server):
+    try:
+        batch._init_worker(None, False, f"{llm_server.url}/v1", "stub")
+        assert batch._worker_decomposer.max_wait == 0
+        batch._worker_decomposer.close()
+        batch._init_worker(None, False, f"{llm_server.url}/v1", "stub", shared=True)
+        assert batch._worker_decomposer.max_wait > 0
+        batch._worker_decomposer.close()
+    finally:
+        batch._worker_decomposer = None
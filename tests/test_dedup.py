@@ -0,0 +1,50 @@
+from tools.dedup import DedupIndex
+from tools.records import ResultSet
+
+
+def _result(url: str, summary: str) -> dict:
+    return {'title': summary[:20], 'url': url, 'summary': summary}
+
+
+LONG = ("Solar panel efficiency rose sharply last year as perovskite cells moved from "
+        "laboratory prototypes into commercial rooftop installations across Europe and Asia")
+
+
+def test_same_url_variants_collapse():
+    index = DedupIndex()
+    kept, collapsed = index.filter([
+        _result("https://example.com/solar?utm_source=feed", LONG),
+        _result("https://Example.com/solar/", "Rewritten summary of the same page"),
+    ])
+    assert len(kept) == 1 and collapsed == 1
+    assert index.get_stats()['exact_duplicates'] == 1
+
+
+def test_syndicated_copy_on_another_domain_collapses():
+    index = DedupIndex()
+    kept, collapsed = index.filter([
+        _result("https://example.com/solar", LONG),
+        _result("https://mirror.org/news/123", LONG + " according to the report"),
+    ])
+    assert len(kept) == 1 and collapsed == 1
+    assert index.get_stats()['near_duplicates'] == 1
+
+
+def test_templated_summaries_about_different_subjects_are_kept():
+    index = DedupIndex()
+    results = [
+        _result("https://example.com/solar-power-0",
+                "Key findings about solar power based on research from Reuters."),
+        _result("https://example.com/wind-power-0",
+                "Key findings about wind power based on research from Reuters."),
+    ]
+    assert index.filter(results) == (results, 0)
+    assert index.get_stats()['collapsed'] == 0
+
+
+def test_filter_keeps_result_set_type():
+    index = DedupIndex()
+    results = ResultSet.from_dicts([_result("https://example.com/a", LONG), _result("https://example.com/a", LONG)])
+    kept, _ = index.filter(results)
+    assert isinstance(kept, ResultSet)
+    assert len(kept) == 1
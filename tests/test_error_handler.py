@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.error_handler import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy, async_retry, retry
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("backend", failure_threshold=1, recovery_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    return breaker
+
+
+def _fail():
+    raise ValueError("backend down")
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("backend", failure_threshold=2, recovery_timeout=60)
+    policy = RetryPolicy(max_attempts=1)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            policy.call(_fail, breaker=breaker)
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        policy.call(lambda: calls.append(1), breaker=breaker)
+    assert calls == []
+
+
+def test_half_open_trial_admits_one_call_and_success_closes():
+    breaker = _half_open_breaker()
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.before_call() is False
+
+
+def test_trial_released_when_deadline_aborts_it():
+    breaker = _half_open_breaker()
+    policy = RetryPolicy(max_attempts=1)
+
+    def too_slow():
+        raise DeadlineExceededError("out of time")
+
+    with pytest.raises(DeadlineExceededError):
+        policy.call(too_slow, breaker=breaker, deadline=Deadline(5))
+    # No verdict on the backend, so the next call becomes the trial instead of being rejected
+    assert policy.call(lambda: "ok", breaker=breaker) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_trial_released_when_async_call_is_cancelled():
+    breaker = _half_open_breaker()
+    policy = RetryPolicy(max_attempts=1)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        task = asyncio.ensure_future(policy.acall(hang, breaker=breaker))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await policy.acall(ok, breaker=breaker)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_deadline_is_not_counted_as_backend_failure():
+    breaker = CircuitBreaker("backend", failure_threshold=1, recovery_timeout=60)
+    policy = RetryPolicy(max_attempts=1)
+
+    def too_slow():
+        raise DeadlineExceededError("out of time")
+
+    with pytest.raises(DeadlineExceededError):
+        policy.call(too_slow, breaker=breaker)
+    assert breaker.state == "closed"
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(max_retries=1)
+    policy = RetryPolicy(max_attempts=5, delay=0, jitter=False)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        raise ValueError("flaky")
+
+    with pytest.raises(ValueError):
+        policy.call(flaky, budget=budget)
+    assert len(attempts) == 2
+    assert budget.remaining == 0
+
+
+def test_backoff_never_sleeps_past_deadline():
+    policy = RetryPolicy(max_attempts=5, delay=10, jitter=False)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        policy.call(_fail, deadline=Deadline(0.5))
+    assert time.monotonic() - started < 0.5
+
+
+def test_open_breaker_half_opens_after_recovery_timeout():
+    breaker = CircuitBreaker("backend", failure_threshold=1, recovery_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.15)
+    assert breaker.state == "half_open"
+
+
+def test_retry_decorator_retries_sync_and_async_functions():
+    attempts = []
+
+    @retry(max_attempts=3, delay=0, jitter=False)
+    def flaky(value):
+        attempts.append(value)
+        if len(attempts) < 3:
+            raise ValueError("flaky")
+        return value
+
+    @retry(max_attempts=2, delay=0, jitter=False)
+    async def aflaky(value):
+        attempts.append(value)
+        if len(attempts) < 5:
+            raise ValueError("flaky")
+        return value
+
+    assert flaky("sync") == "sync"
+    assert asyncio.run(aflaky("async")) == "async"
+    assert attempts == ["sync"] * 3 + ["async"] * 2
+
+
+def test_async_retry_rejects_plain_functions():
+    with pytest.raises(TypeError):
+        async_retry(max_attempts=2)(_fail)
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from tools.records import ResultSet, json_default
+from utils.findings_store import FindingsStore, estimate_size
+
+
+def _finding(query: str, count: int = 20) -> dict:
+    results = ResultSet(
+        (f"{query} result {i}", f"https://example.com/{query}/{i}", "Example",
+         f"Result {i} for {query} " * 5, 0.5, "2024-01-01")
+        for i in range(count)
+    )
+    return {'query': query, 'results': results, 'result_count': count}
+
+
+def test_estimate_is_close_to_encoded_size():
+    finding = _finding("solar power")
+    encoded = len(json.dumps(finding, default=json_default, separators=(",", ":")))
+    assert 0.5 * encoded <= estimate_size(finding) <= 2 * encoded
+
+
+def test_in_memory_append_does_not_encode_results(monkeypatch, tmp_path):
+    def fail(self):
+        raise AssertionError("result set was materialized")
+
+    monkeypatch.setattr(ResultSet, "to_dicts", fail)
+    monkeypatch.setattr(ResultSet, "__iter__", fail)
+    store = FindingsStore(spill_dir=str(tmp_path))
+    finding = _finding("solar power")
+    assert store.append(finding) == 0
+    assert store[0] is finding
+    assert store.get_stats()['spilled'] == 0
+
+
+def test_findings_over_budget_are_encoded_and_spilled(tmp_path):
+    store = FindingsStore(memory_budget=estimate_size(_finding("a")) + 1, spill_dir=str(tmp_path))
+    store.extend([_finding("a"), _finding("b")])
+    stats = store.get_stats()
+    assert stats['in_memory'] == 1 and stats['spilled'] == 1
+    spilled = store[1]
+    assert spilled['query'] == "b"
+    assert spilled['results'] == _finding("b")['results'].to_dicts()
+    store.close()
+
+
+def test_oversized_finding_always_spills(tmp_path):
+    store = FindingsStore(inline_limit=1024, spill_dir=str(tmp_path))
+    store.append({'note': "x" * 2048})
+    assert store.get_stats()['spilled'] == 1
+    assert store[0] == {'note': "x" * 2048}
+    store.close()
+
+
+@pytest.mark.parametrize("value", ["text", 3, 1.5, None, True, [1, "a"], {'k': ("v",)}])
+def test_estimate_handles_plain_json_values(value):
+    assert estimate_size(value) > 0
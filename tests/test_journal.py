@@ -0,0 +1,64 @@
+import json
+
+from agent import Task
+from tools.records import ResultSet
+from utils.journal import RunJournal
+
+
+def _journal_with_progress(path):
+    journal = RunJournal(str(path), fsync=False)
+    journal.run_started("solar power")
+    journal.plan([Task("Background research", required_tools=["web_search"]),
+                  Task("Analyze trends", required_tools=["web_search", "data_analyzer"], depends_on=[0])])
+    journal.task_status(0, "in_progress")
+    journal.stage_completed(0, "web_search", {'results': ResultSet([("t", "u", "s", "summary", 0.5, "2024-01-01")])})
+    journal.task_status(0, "completed", result={'count': 1})
+    journal.task_status(1, "failed", error="backend down")
+    journal.close()
+    return journal
+
+
+def test_replay_rebuilds_plan_statuses_and_stage_results(tmp_path):
+    state = _journal_with_progress(tmp_path / "run.jsonl").replay()
+    assert state.query == "solar power"
+    assert [task['depends_on'] for task in state.plan] == [[], [0]]
+    assert state.statuses == {0: "completed", 1: "failed"}
+    assert state.results == {0: {'count': 1}}
+    assert state.errors == {1: "backend down"}
+    # Compact result sets are journaled as plain JSON
+    assert state.tool_results[0]['web_search']['results'][0]['summary'] == "summary"
+    assert not state.completed
+
+
+def test_torn_tail_is_ignored_on_replay(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _journal_with_progress(path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"event":"run_completed","ts"')
+    state = RunJournal(str(path)).replay()
+    assert state.statuses == {0: "completed", 1: "failed"}
+    assert not state.completed
+
+
+def test_torn_tail_is_truncated_before_new_events(tmp_path):
+    path = tmp_path / "run.jsonl"
+    _journal_with_progress(path)
+    intact = path.read_bytes()
+    with open(path, 'ab') as f:
+        f.write(b'{"event":"task","index":1,"sta')
+    journal = RunJournal(str(path), fsync=False)
+    journal.task_status(1, "completed", result={'count': 2})
+    journal.run_completed()
+    journal.close()
+
+    data = path.read_bytes()
+    assert data.startswith(intact)
+    assert all(json.loads(line) for line in data.decode('utf-8').splitlines())
+    state = RunJournal(str(path)).replay()
+    assert state.statuses == {0: "completed", 1: "completed"}
+    assert state.completed
+
+
+def test_missing_journal_replays_as_empty(tmp_path):
+    state = RunJournal(str(tmp_path / "absent.jsonl")).replay()
+    assert state.query is None and not state.has_plan
@@ -0,0 +1,76 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from utils.logger import configure_logging, flush, is_enabled, log, log_task
+
+
+class _SlowStream(io.StringIO):
+    """A terminal that takes a while to accept each write"""
+
+    def write(self, text):
+        time.sleep(0.05)
+        self.writes = getattr(self, 'writes', 0) + 1
+        return super().write(text)
+
+
+def _records(stream):
+    flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_lines_for_messages_and_task_events():
+    stream = io.StringIO()
+    configure_logging(level='info', fmt='json', stream=stream)
+    log("searching")
+    log_task("Background research", "failed")
+    first, second = _records(stream)
+    assert (first['level'], first['message']) == ("info", "searching")
+    assert (second['level'], second['event'], second['status']) == ("error", "task", "failed")
+    assert second['task'] == "Background research"
+
+
+def test_messages_below_the_threshold_are_dropped():
+    stream = io.StringIO()
+    configure_logging(level='warning', fmt='json', stream=stream)
+    assert not is_enabled('info') and is_enabled('error')
+    log("routine")
+    log_task("Background research", "started")
+    log("slow backend", "warning")
+    log_task("Background research", "retry")
+    assert [r['level'] for r in _records(stream)] == ["warning", "warning"]
+
+
+def test_auto_format_writes_json_when_not_a_terminal():
+    stream = io.StringIO()
+    configure_logging(level='info', stream=stream)
+    log("plain")
+    assert _records(stream)[0]['message'] == "plain"
+
+
+def test_unknown_settings_are_rejected():
+    with pytest.raises(ValueError):
+        configure_logging(level='verbose')
+    with pytest.raises(ValueError):
+        configure_logging(fmt='xml')
+
+
+def test_callers_do_not_wait_for_a_slow_stream():
+    stream = _SlowStream()
+    configure_logging(level='info', fmt='json', stream=stream)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda i=i: [log(f"t{i} m{j}") for j in range(10)]) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started < 0.05 * 40 / 2
+    records = _records(stream)
+    assert len(records) == 40
+    for i in range(4):
+        assert [r['message'] for r in records if r['message'].startswith(f"t{i} ")] == [f"t{i} m{j}" for j in range(10)]
+    # Bursts are written in batches rather than one write per message
+    assert stream.writes < 40
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from agent import ResearchAgent
+from tools.web_search import WebSearchTool
+from utils import rate_limit
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.rate_limit import RateLimiter, TokenBucket, find_limiter, get_limiter
+
+
+def _agent(query, url, **kwargs):
+    agent = ResearchAgent(query, **kwargs)
+    agent.tools['web_search'] = WebSearchTool(endpoint=url, coalesce=False)
+    return agent
+
+
+def _timed_run(agent):
+    started = time.monotonic()
+    report = agent.run()
+    assert report['status'] == 'success'
+    return time.monotonic() - started
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_same_settings_share_a_limiter_and_other_settings_do_not_reset_it():
+    limiter = get_limiter('backend', qps=5)
+    limiter.release(limiter.acquire(), error=True)
+    lowered = limiter._limit
+    assert get_limiter('backend', qps=5.0) is limiter
+    assert get_limiter('backend', qps=2) is not limiter
+    assert get_limiter('backend') is not limiter
+    assert limiter._limit == lowered
+    assert limiter.config['qps'] == 5
+
+
+def test_unknown_setting_is_rejected():
+    with pytest.raises(TypeError):
+        get_limiter('backend', qpx=5)
+
+
+def test_concurrency_limit_grows_when_saturated_and_halves_on_error():
+    limiter = RateLimiter('backend', max_concurrency=8, initial_concurrency=2)
+    slots = [limiter.acquire(), limiter.acquire()]
+    limiter.release(slots.pop())
+    assert limiter._limit == pytest.approx(2.5)
+    limiter.release(slots.pop(), error=True)
+    assert limiter.limit == 1
+
+
+def test_acquire_gives_up_at_deadline():
+    limiter = RateLimiter('backend', max_concurrency=1)
+    held = limiter.acquire()
+    with pytest.raises(DeadlineExceededError):
+        limiter.acquire(Deadline(0.05))
+    limiter.release(held)
+    assert limiter.get_status()['in_flight'] == 0
+
+
+def test_unlimited_and_default_agents_ignore_another_agents_quota(search_backend):
+    throttled = _agent("throttled research", search_backend.url,
+                       rate_limits={'web_search': {'qps': 2, 'burst': 1}})
+    runner = threading.Thread(target=throttled.run)
+    runner.start()
+    try:
+        time.sleep(0.05)
+        unlimited = _agent("unlimited research", search_backend.url, rate_limits={'web_search': None})
+        default = _agent("default research", search_backend.url)
+        assert _timed_run(unlimited) < 0.4
+        assert _timed_run(default) < 0.4
+    finally:
+        runner.join(10)
+    assert 'web_search' not in unlimited.get_status()['rate_limits']
+    assert throttled.get_status()['rate_limits']['web_search']['qps'] == 2
+
+
+def test_agents_with_the_same_quota_share_it(search_backend):
+    limits = {'web_search': {'qps': 4, 'burst': 1}}
+    agents = [_agent(f"shared quota {i}", search_backend.url, rate_limits=limits) for i in range(2)]
+    started = time.monotonic()
+    threads = [threading.Thread(target=agent.run) for agent in agents]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    # Six backend requests at 4/s with a burst of one take at least 1.25s together
+    assert time.monotonic() - started >= 1.2
+    assert agents[0].tools.limiter('web_search') is agents[1].tools.limiter('web_search')
+
+
+def test_status_does_not_create_or_reconfigure_limiters():
+    agent = ResearchAgent("status only", rate_limits={'web_search': {'qps': 3}})
+    assert agent.get_status()['rate_limits'] == {}
+    assert rate_limit._limiters == {}
+    existing = get_limiter('web_search', qps=1)
+    agent.get_status()
+    assert existing.config['qps'] == 1
+    assert find_limiter('web_search', qps=3) is None
@@ -0,0 +1,73 @@
+import json
+import pickle
+import sys
+
+import pytest
+
+from tools.records import ResultSet, SearchHit, json_default
+
+ROWS = [
+    ("Solar cells", "https://example.com/a", "Journal", "Efficiency gains", 0.9, "2024-01-15"),
+    ("Wind farms", "https://example.com/b", "News", "Offshore growth", 0.6, ""),
+    ("Grid storage", "https://example.com/c", "Journal", "", 0.4, "2023-11-02"),
+]
+KEYS = ('title', 'url', 'source', 'summary', 'relevance_score', 'date')
+
+
+def test_result_set_reads_back_as_dicts():
+    results = ResultSet(ROWS)
+    assert len(results) == 3
+    assert results[1] == dict(zip(KEYS, ROWS[1]))
+    assert results[-1]['title'] == "Grid storage"
+    assert results[0:2] == [dict(zip(KEYS, row)) for row in ROWS[:2]]
+    assert list(results.rows()) == ROWS
+    assert results.sources() == ["Journal", "News", "Journal"]
+    assert results.dates() == ["2024-01-15", "", "2023-11-02"]
+    with pytest.raises(IndexError):
+        results[3]
+
+
+def test_result_set_round_trips_through_dicts_hits_json_and_pickle():
+    results = ResultSet(ROWS)
+    assert ResultSet.from_dicts(results.to_dicts()) == results
+    assert ResultSet.from_hits(results.hit(i) for i in range(len(results))) == results
+    assert json.loads(json.dumps({'results': results}, default=json_default))['results'] == results.to_dicts()
+    assert pickle.loads(pickle.dumps(results)) == results
+    assert results == [dict(zip(KEYS, row)) for row in ROWS]
+
+
+def test_from_dicts_fills_missing_fields():
+    results = ResultSet.from_dicts([{'title': "Only a title", 'relevance_score': "0.5"}])
+    assert results[0] == {'title': "Only a title", 'url': "", 'source': "", 'summary': "",
+                          'relevance_score': 0.5, 'date': ""}
+
+
+def test_result_set_is_smaller_than_the_dicts_it_replaces():
+    rows = [(f"title {i}", f"https://example.com/{i}", "Journal", "summary " * 20, 0.5, "2024-01-01")
+            for i in range(1000)]
+    results = ResultSet(rows)
+    dicts = results.to_dicts()
+    # Text included, the columns take less than the dict objects alone
+    assert results.nbytes() < sum(sys.getsizeof(d) for d in dicts)
+
+
+def test_search_hit_converts_to_and_from_dicts():
+    hit = SearchHit(*ROWS[0])
+    assert SearchHit.from_dict(hit.to_dict()) == hit
+    assert json.loads(json.dumps(hit, default=json_default)) == hit.to_dict()
+    with pytest.raises(AttributeError):
+        hit.title = "changed"
+
+
+def test_source_names_are_owned_by_each_result_set():
+    first = ResultSet(ROWS)
+    second = ResultSet([("Tidal", "https://example.com/d", "Blog", "", 0.3, ""), *ROWS])
+    assert first.source_names == ["Journal", "News"]
+    assert list(first.source_ids) == [0, 1, 0]
+    assert second.source_names == ["Blog", "Journal", "News"]
+    assert second.sources() == ["Blog", "Journal", "News", "Journal"]
+    # A discarded set's sources are not kept alive by any shared table
+    source = "".join(["source ", "never seen before"])
+    references = sys.getrefcount(source)
+    ResultSet([("Title", "https://example.com/e", source, "", 0.5, "")])
+    assert sys.getrefcount(source) == references
@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from tools.base_tool import Tool
+from tools.registry import ToolRegistry, ToolSet
+
+
+class EchoTool(Tool):
+    instances = 0
+
+    def __init__(self, prefix: str = ""):
+        EchoTool.instances += 1
+        self.prefix = prefix
+
+    def execute(self, text: str, **kwargs):
+        return {'text': self.prefix + text}
+
+
+@pytest.fixture
+def registry():
+    EchoTool.instances = 0
+    registry = ToolRegistry()
+    registry.register('echo', EchoTool)
+    return registry
+
+
+def test_string_targets_are_imported_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'tools.report_generator', raising=False)
+    registry = ToolRegistry()
+    registry.register('report_generator', 'tools.report_generator:ReportGeneratorTool')
+    assert 'tools.report_generator' not in sys.modules
+    tool = registry.get('report_generator')
+    assert type(tool).__name__ == "ReportGeneratorTool"
+    assert 'tools.report_generator' in sys.modules
+
+
+def test_instances_are_shared_per_constructor_arguments(registry):
+    assert registry.get('echo') is registry.get('echo')
+    assert registry.get('echo', prefix=">") is registry.get('echo', prefix=">")
+    assert registry.get('echo', prefix=">") is not registry.get('echo')
+    # Unhashable arguments cannot be shared, so each call builds its own
+    assert registry.get('echo', prefix=[">"]) is not registry.get('echo', prefix=[">"])
+    assert registry.create('echo') is not registry.get('echo')
+
+
+def test_reregistering_a_name_drops_its_shared_instances(registry):
+    before = registry.get('echo')
+    registry.register('echo', lambda: EchoTool(prefix="new:"))
+    assert registry.get('echo') is not before
+    assert registry.get('echo').execute("x") == {'text': "new:x"}
+    with pytest.raises(KeyError):
+        registry.get('missing')
+
+
+def test_toolset_resolves_tools_lazily(registry):
+    tools = ToolSet(registry, {'echo': {'prefix': ">"}})
+    assert EchoTool.instances == 0
+    assert list(tools) == ['echo'] and len(tools) == 1
+    assert tools.loaded() == {}
+    assert tools['echo'].execute("hi") == {'text': ">hi"}
+    assert EchoTool.instances == 1
+    assert ToolSet(registry, {'echo': {'prefix': ">"}})['echo'] is tools['echo']
+    with pytest.raises(KeyError):
+        tools['missing']
+
+
+def test_toolset_overrides_stay_local(registry):
+    tools = ToolSet(registry)
+    other = ToolSet(registry)
+    tools['echo'] = EchoTool(prefix="mine:")
+    tools['extra'] = EchoTool()
+    assert tools['echo'].execute("x") == {'text': "mine:x"}
+    assert other['echo'].execute("x") == {'text': "x"}
+    assert set(tools) == {'echo', 'extra'} and len(tools) == 2
+    del tools['echo']
+    assert tools['echo'] is other['echo']
+
+
+def test_toolset_limiters_follow_its_own_limits(registry):
+    limited = ToolSet(registry, limits={'echo': {'qps': 5}})
+    unlimited = ToolSet(registry, limits={'echo': None})
+    assert limited.loaded_limiters() == {}
+    assert limited.limiter('echo') is ToolSet(registry, limits={'echo': {'qps': 5}}).limiter('echo')
+    assert unlimited.limiter('echo') is None
+    assert list(limited.loaded_limiters()) == ['echo']
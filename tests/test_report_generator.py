@@ -0,0 +1,72 @@
+import io
+
+from agent import Task
+from tools.report_generator import ReportGeneratorTool
+
+FINDINGS = [
+    {'task': "Background research on solar power", 'result': {
+        'key_metrics': {'result_count': 3}, 'insights': ["Found 3 results"],
+        'recommendations': ["Diversify sources"]
+    }},
+    {'task': "Analyze current trends in solar power", 'error': "backend down"},
+    {'task': "Recommendations regarding solar power", 'error': "Deadline of 1s exceeded", 'timed_out': True}
+]
+TASKS = [Task(f['task'], status=status) for f, status in zip(FINDINGS, ["completed", "failed", "timed_out"])]
+
+
+class _RecordingSink:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+
+class _BrokenFindings(list):
+    """Findings that fail when the detailed section reads them"""
+
+    def __iter__(self):
+        if getattr(self, 'reads', 0) >= 1:
+            raise OSError("spill file gone")
+        self.reads = getattr(self, 'reads', 0) + 1
+        return super().__iter__()
+
+
+def _without_timestamp(text):
+    # The only line that may differ between two renderings of the same report
+    return [line for line in text.splitlines() if not line.startswith("**Generated on**")]
+
+
+def test_stream_yields_sections_in_report_order():
+    sections = list(ReportGeneratorTool().stream("solar power", FINDINGS, TASKS, deadline=1))
+    assert sections[0] == "# Research Report: solar power"
+    headings = [s for s in sections if s.startswith("\n## ")]
+    assert headings == ["\n## Executive Summary", "\n## Detailed Findings", "\n## Recommendations",
+                        "\n## Task Execution Log"]
+    assert "### Task 2: Analyze current trends in solar power [FAILED]" in sections
+    assert "### Task 3: Recommendations regarding solar power [TIMED OUT]" in sections
+    assert any(s.startswith("**Timed Out**: 1 of 3 tasks") for s in sections)
+
+
+def test_write_sends_each_section_to_the_sink_and_matches_execute():
+    tool = ReportGeneratorTool()
+    sink = _RecordingSink()
+    result = tool.write(sink, "solar power", FINDINGS, TASKS)
+    sections = [w for w in sink.writes if w != "\n"]
+    assert len(sections) > 10
+    assert result['status'] == 'success'
+    assert result['word_count'] == sum(len(s.split()) for s in sections)
+    report = tool.execute("solar power", FINDINGS, TASKS)['report']
+    assert _without_timestamp("".join(sink.writes)) == _without_timestamp(report)
+
+
+def test_failure_mid_stream_keeps_the_sections_already_written():
+    buffer = io.StringIO()
+    result = ReportGeneratorTool().write(buffer, "solar power", _BrokenFindings(FINDINGS), TASKS)
+    assert result['status'] == 'failed' and result['error'] == "spill file gone"
+    assert "## Executive Summary" in buffer.getvalue()
+    assert "## Recommendations" not in buffer.getvalue()
+
+    output = ReportGeneratorTool().execute("solar power", _BrokenFindings(FINDINGS), TASKS)
+    assert output['status'] == 'failed'
+    assert output['partial_report'].startswith("# Research Report: solar power")
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.scheduler import DependencyFailedError, TaskScheduler
+
+DIAMOND = [[], [0], [0], [1, 2]]
+
+
+class Recorder:
+    """Collects start/finish events and outcomes from a scheduler run"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+        self.outcomes = {}
+
+    def mark(self, event, node):
+        with self.lock:
+            self.events.append((event, node))
+
+    def on_done(self, node, result, error):
+        self.outcomes[node] = error if error is not None else result
+
+    def assert_dependencies_respected(self, dependencies):
+        for node, deps in enumerate(dependencies):
+            if ('start', node) not in self.events:
+                continue
+            started = self.events.index(('start', node))
+            for dep in deps:
+                assert self.events.index(('finish', dep)) < started
+
+
+def _sync_worker(recorder, fail=(), delay=0.02):
+    def worker(node):
+        recorder.mark('start', node)
+        time.sleep(delay)
+        recorder.mark('finish', node)
+        if node in fail:
+            raise ValueError(f"node {node} failed")
+        return node * 10
+    return worker
+
+
+def _async_worker(recorder, fail=(), delay=0.02):
+    async def worker(node):
+        recorder.mark('start', node)
+        await asyncio.sleep(delay)
+        recorder.mark('finish', node)
+        if node in fail:
+            raise ValueError(f"node {node} failed")
+        return node * 10
+    return worker
+
+
+def _run(mode, dependencies, recorder, deadline=None, **worker_kwargs):
+    scheduler = TaskScheduler(max_workers=4)
+    if mode == 'thread':
+        scheduler.run(dependencies, _sync_worker(recorder, **worker_kwargs), recorder.on_done, deadline)
+    else:
+        asyncio.run(scheduler.arun(dependencies, _async_worker(recorder, **worker_kwargs), recorder.on_done, deadline))
+
+
+@pytest.mark.parametrize("mode", ['thread', 'asyncio'])
+def test_dependencies_finish_before_dependents_start(mode):
+    recorder = Recorder()
+    _run(mode, DIAMOND, recorder)
+    recorder.assert_dependencies_respected(DIAMOND)
+    assert recorder.outcomes == {0: 0, 1: 10, 2: 20, 3: 30}
+
+
+@pytest.mark.parametrize("mode", ['thread', 'asyncio'])
+def test_independent_nodes_run_concurrently(mode):
+    recorder = Recorder()
+    started = time.monotonic()
+    _run(mode, [[], [], []], recorder, delay=0.2)
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.parametrize("mode", ['thread', 'asyncio'])
+def test_failure_skips_transitive_dependents_only(mode):
+    dependencies = [[], [0], [1], []]
+    recorder = Recorder()
+    _run(mode, dependencies, recorder, fail={0})
+    assert isinstance(recorder.outcomes[0], ValueError)
+    assert isinstance(recorder.outcomes[1], DependencyFailedError)
+    assert isinstance(recorder.outcomes[2], DependencyFailedError)
+    assert recorder.outcomes[3] == 30
+    assert ('start', 1) not in recorder.events and ('start', 2) not in recorder.events
+
+
+@pytest.mark.parametrize("dependencies", [[[1], [0]], [[0]], [[2], []]])
+def test_invalid_graphs_are_rejected(dependencies):
+    with pytest.raises(ValueError):
+        TaskScheduler().run(dependencies, lambda node: node, lambda *outcome: None)
+
+
+@pytest.mark.parametrize("mode", ['thread', 'asyncio'])
+def test_deadline_settles_unfinished_nodes(mode):
+    recorder = Recorder()
+    started = time.monotonic()
+    _run(mode, [[], [0]], recorder, deadline=Deadline(0.1), delay=0.5)
+    assert time.monotonic() - started < 0.4
+    assert all(isinstance(recorder.outcomes[node], DeadlineExceededError) for node in (0, 1))
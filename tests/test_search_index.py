@@ -0,0 +1,131 @@
+import json
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from tools.search_index import SearchIndex, main, tokenize
+
+VOCABULARY = [f"term{i}" for i in range(40)]
+
+
+def _corpus(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{
+        'id': f"doc-{i}",
+        'title': " ".join(rng.choices(VOCABULARY[:10], k=3)),
+        # Skewed term choice and varied lengths exercise idf and length normalization
+        'text': " ".join(rng.choices(VOCABULARY, weights=range(40, 0, -1), k=rng.randint(5, 60)))
+    } for i in range(count)]
+
+
+def _brute_force(documents: list, query: str, k: int, k1: float = 1.2, b: float = 0.75) -> list:
+    counts = {d['id']: Counter(tokenize(f"{d['title']} {d['text']}")) for d in documents}
+    avgdl = sum(sum(c.values()) for c in counts.values()) / len(counts)
+    scores = {}
+    for term in dict.fromkeys(tokenize(query)):
+        df = sum(1 for c in counts.values() if term in c)
+        idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+        for key, c in counts.items():
+            if term in c:
+                norm = k1 * (1 - b + b * sum(c.values()) / avgdl)
+                scores[key] = scores.get(key, 0.0) + idf * c[term] * (k1 + 1) / (c[term] + norm)
+    return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+def _assert_matches(index: SearchIndex, documents: list, query: str, k: int = 10) -> None:
+    expected = _brute_force(documents, query, k)
+    hits = index.search(query, k)
+    assert [hit['score'] for hit in hits] == pytest.approx([score for _, score in expected], abs=1e-3)
+    exact = dict(_brute_force(documents, query, len(documents)))
+    for hit in hits:
+        assert hit['score'] == pytest.approx(exact[hit['id']], abs=1e-3)
+
+
+@pytest.mark.parametrize("merged", [False, True])
+@pytest.mark.parametrize("query", ["term0", "term3 term17", "term1 term25 term39", "term9 term9 unknown"])
+def test_top_k_matches_brute_force_bm25(tmp_path, merged, query):
+    documents = _corpus(200)
+    index = SearchIndex(str(tmp_path / "idx"), segment_size=60)
+    assert index.add(documents) == 200
+    if merged:
+        index.merge()
+    assert len(index.segments) == (1 if merged else 4)
+    _assert_matches(index, documents, query)
+
+
+def test_readding_an_id_replaces_the_old_copy(tmp_path):
+    index = SearchIndex(str(tmp_path / "idx"))
+    index.add([{'id': "a", 'title': "solar", 'text': "panels"}, {'id': "b", 'title': "wind", 'text': "turbines"}])
+    index.add([{'id': "a", 'title': "geothermal", 'text': "wells"}])
+    assert index.search("solar") == []
+    assert [hit['id'] for hit in index.search("geothermal")] == ["a"]
+    assert index.get_stats()['documents'] == 2
+    assert index.get_stats()['deleted'] == 1
+
+
+def test_last_copy_in_one_batch_wins(tmp_path):
+    index = SearchIndex(str(tmp_path / "idx"))
+    index.add([{'id': "a", 'text': "first"}, {'id': "a", 'text': "second"}])
+    assert index.search("first") == []
+    assert [hit['summary'] for hit in index.search("second")] == ["second"]
+
+
+def test_deleted_documents_stay_hidden_through_merge(tmp_path):
+    documents = _corpus(120)
+    index = SearchIndex(str(tmp_path / "idx"), segment_size=50)
+    index.add(documents)
+    removed = {f"doc-{i}" for i in range(0, 120, 3)}
+    assert index.delete(removed | {"missing"}) == len(removed)
+    remaining = [d for d in documents if d['id'] not in removed]
+    _assert_matches(index, remaining, "term2 term11")
+
+    index.merge()
+    stats = index.get_stats()
+    assert stats['segments'] == 1 and stats['deleted'] == 0 and stats['documents'] == len(remaining)
+    assert not {hit['id'] for hit in index.search("term2 term11", 120)} & removed
+    _assert_matches(index, remaining, "term2 term11")
+
+
+def test_add_after_reopening(tmp_path):
+    path = str(tmp_path / "idx")
+    SearchIndex(path).add([{'id': "a", 'text': "solar panels"}, {'id': "b", 'text': "wind turbines"}])
+    reopened = SearchIndex(path)
+    assert len(reopened) == 2
+    reopened.add([{'id': "a", 'text': "tidal power"}, {'id': "c", 'text': "solar farms"}])
+    assert {hit['id'] for hit in reopened.search("solar")} == {"c"}
+    assert len(SearchIndex(path)) == 3
+
+
+def test_stats_count_terms_shared_by_segments_once(tmp_path):
+    index = SearchIndex(str(tmp_path / "idx"), segment_size=1)
+    index.add([{'id': "a", 'text': "solar power"}, {'id': "b", 'text': "wind power"}])
+    assert index.get_stats()['segments'] == 2
+    assert index.get_stats()['terms'] == 3
+
+
+def test_cli_build_and_search(tmp_path, capsys):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(json.dumps(d) for d in _corpus(30)) + "\n", encoding='utf-8')
+    path = str(tmp_path / "idx")
+    assert main(['build', str(corpus), path, '--segment-size', '10']) == 0
+    stats = json.loads(capsys.readouterr().out)
+    assert stats['documents'] == 30 and stats['segments'] == 1
+
+    assert main(['search', path, "term4 term8", '-k', '3']) == 0
+    hits = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [hit['id'] for hit in hits] == [hit['id'] for hit in SearchIndex(path).search("term4 term8", 3)]
+    assert len(hits) == 3
+
+
+def test_cli_build_refuses_existing_index(tmp_path, capsys):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text(json.dumps({'id': "a", 'text': "solar"}) + "\n", encoding='utf-8')
+    path = str(tmp_path / "idx")
+    main(['build', str(corpus), path])
+    capsys.readouterr()
+    with pytest.raises(SystemExit) as raised:
+        main(['build', str(corpus), path])
+    assert raised.value.code == 2
+    assert "already holds an index" in capsys.readouterr().err
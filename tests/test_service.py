@@ -0,0 +1,91 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from service import ResearchService, ServiceOverloadedError, create_server
+from tools.decomposer import Decomposer, RuleBasedDecomposer
+
+
+class GatedDecomposer(Decomposer):
+    """Rule-based plans that wait for ``gate`` to open, keeping workers busy on demand"""
+
+    blocking = True
+
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def decompose(self, query, deadline=None):
+        self.gate.wait(10)
+        return RuleBasedDecomposer().decompose(query, deadline)
+
+
+@pytest.fixture
+def service():
+    decomposer = GatedDecomposer()
+    service = ResearchService(workers=1, max_queue=1, decomposer=decomposer)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    service.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield service
+    decomposer.gate.set()
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_saturated_service_rejects_with_retry_after(service):
+    responses = {}
+
+    def post(name):
+        responses[name] = httpx.post(f"{service.url}/research", json={'query': f"solar {name}"}, timeout=10)
+
+    clients = [threading.Thread(target=post, args=(name,)) for name in ("running", "queued")]
+    clients[0].start()
+    _wait_for(lambda: service.get_status()['in_flight'] == 1)
+    clients[1].start()
+    _wait_for(lambda: service.get_status()['queue_depth'] == 1)
+
+    rejected = httpx.post(f"{service.url}/research", json={'query': "solar rejected"}, timeout=10)
+    assert rejected.status_code == 503
+    assert rejected.headers['Retry-After'] == "1"
+    assert rejected.json()['status']['saturated'] is True
+
+    service.decomposer.gate.set()
+    for client in clients:
+        client.join(10)
+    assert [responses[name].status_code for name in ("running", "queued")] == [200, 200]
+    assert responses["queued"].json()['report']['status'] == 'success'
+    status = httpx.get(f"{service.url}/status").json()
+    assert (status['completed'], status['rejected'], status['in_flight'], status['queue_depth']) == (2, 1, 0, 0)
+
+
+def test_submit_raises_when_saturated(service):
+    futures = [service.submit("first"), service.submit("second")]
+    with pytest.raises(ServiceOverloadedError):
+        service.submit("third")
+    service.decomposer.gate.set()
+    assert [future.result(10)['report']['status'] for future in futures] == ['success', 'success']
+
+
+@pytest.mark.parametrize("body", [
+    {}, {'query': "  "}, {'query': "solar", 'seed': "x"}, {'query': "solar", 'deadline': 0}, ["solar"]
+])
+def test_invalid_requests_are_rejected(service, body):
+    response = httpx.post(f"{service.url}/research", json=body, timeout=10)
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+def test_health_and_unknown_paths(service):
+    assert httpx.get(f"{service.url}/health").json() == {'status': 'ok'}
+    assert httpx.get(f"{service.url}/missing").status_code == 404
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent import ResearchAgent
+from tools.web_search import WebSearchTool
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    executions = []
+
+    def work():
+        executions.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+    assert results == ["result"] * 4
+    assert executions == [1]
+    stats = flight.get_stats()
+    assert (stats['calls'], stats['executions'], stats['coalesced'], stats['in_flight']) == (4, 1, 3, 0)
+
+
+def test_backend_errors_are_shared():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("backend down")
+
+    async def scenario():
+        return await asyncio.gather(flight.ado("key", failing), flight.ado("key", failing), return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, ValueError) and second is first
+    assert flight.get_stats()['executions'] == 1
+
+
+def test_cancelled_leader_hands_over_to_follower():
+    flight = SingleFlight()
+    executions = []
+
+    async def work():
+        executions.append(1)
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "result"
+    assert len(executions) == 2
+    stats = flight.get_stats()
+    assert (stats['calls'], stats['executions'], stats['coalesced'], stats['abandoned']) == (2, 2, 0, 1)
+
+
+def test_leader_deadline_is_not_shared():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.2)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(flight.ado("key", work, Deadline(0.05)), flight.ado("key", work),
+                                    return_exceptions=True)
+
+    leader, follower = asyncio.run(scenario())
+    assert isinstance(leader, DeadlineExceededError)
+    assert follower == "result"
+
+
+def test_follower_waits_only_until_its_own_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.02)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        flight.do("key", lambda: None, Deadline(0.1))
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join(5)
+
+
+def test_cancelled_follower_does_not_cancel_the_flight():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(scenario()) == "result"
+
+
+def test_agent_without_deadline_survives_coalescing_with_a_timed_out_agent(search_backend):
+    search_backend.delay = 0.4
+    tool = WebSearchTool(endpoint=search_backend.url)
+
+    def agent(query):
+        agent = ResearchAgent(query)
+        agent.tools['web_search'] = tool
+        return agent
+
+    async def scenario():
+        hurried, patient = agent("coalesced query"), agent("coalesced query")
+        return await asyncio.gather(hurried.arun(deadline=0.2), patient.arun())
+
+    hurried, patient = asyncio.run(scenario())
+    assert hurried['timed_out_tasks']
+    assert patient['status'] == 'success'
+    assert not patient.get('timed_out_tasks')
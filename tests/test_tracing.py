@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.tracing import LatencyHistogram, Tracer
+
+
+def test_histogram_percentiles_use_nearest_rank():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms * 1_000_000)
+    assert histogram.summary() == {'count': 100, 'mean_ms': 50.5, 'p50_ms': 50.0, 'p95_ms': 95.0,
+                                   'p99_ms': 99.0, 'max_ms': 100.0}
+
+
+def test_histogram_window_bounds_samples_but_not_totals():
+    histogram = LatencyHistogram(window=10)
+    for ms in range(1, 101):
+        histogram.record(ms * 1_000_000)
+    summary = histogram.summary()
+    assert (summary['count'], summary['mean_ms'], summary['max_ms']) == (100, 50.5, 100.0)
+    # Percentiles come from the 10 most recent samples
+    assert summary['p50_ms'] == 95.0
+    assert LatencyHistogram().summary() == {'count': 0}
+
+
+def test_spans_feed_histograms_and_counters():
+    tracer = Tracer()
+    for _ in range(3):
+        with tracer.span("tool.web_search", "tool"):
+            pass
+    with pytest.raises(ValueError):
+        with tracer.span("tool.web_search", "tool"):
+            raise ValueError("boom")
+    tracer.count("retries.web_search", 2)
+    metrics = tracer.get_metrics()
+    assert metrics['latency']['tool.web_search']['count'] == 4
+    assert metrics['counters'] == {'retries.web_search': 2}
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("run") as span:
+        span.set(query="x")
+    tracer.count("retries")
+    assert tracer.get_metrics() == {'latency': {}, 'counters': {}}
+
+
+def test_chrome_trace_export(tmp_path):
+    tracer = Tracer(keep_spans=True, max_spans=3)
+    with tracer.span("run", query="solar"):
+        with tracer.span("task", "task") as span:
+            span.set(description="Background research")
+        with pytest.raises(KeyError):
+            with tracer.span("tool.report_generator", "tool"):
+                raise KeyError("missing")
+    with tracer.span("dropped"):
+        pass
+    path = tmp_path / "trace.json"
+    assert tracer.export_chrome_trace(str(path)) == 3
+    trace = json.loads(path.read_text())
+    events = {event['name']: event for event in trace['traceEvents']}
+    assert set(events) == {"run", "task", "tool.report_generator"}
+    assert all(event['ph'] == 'X' for event in events.values())
+    run, task = events['run'], events['task']
+    assert run['ts'] <= task['ts'] and task['ts'] + task['dur'] <= run['ts'] + run['dur']
+    assert task['args'] == {'description': "Background research"}
+    assert events['tool.report_generator']['args'] == {'error': "KeyError"}
+    assert trace['otherData']['dropped_spans'] == 1
+
+
+def test_concurrent_coroutines_get_separate_trace_lanes(tmp_path):
+    tracer = Tracer(keep_spans=True)
+
+    async def task():
+        with tracer.span("task", "task"):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(task(), task())
+
+    asyncio.run(main())
+    tracer.export_chrome_trace(str(tmp_path / "trace.json"))
+    lanes = {event['tid'] for event in json.loads((tmp_path / "trace.json").read_text())['traceEvents']}
+    assert len(lanes) == 2
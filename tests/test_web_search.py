@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from tools.base_tool import Tool
+from tools.web_search import WebSearchTool
+
+
+def test_aexecute_queries_the_backend(search_backend):
+    tool = WebSearchTool(endpoint=search_backend.url, max_results=2)
+    response = asyncio.run(tool.aexecute(query="solar power"))
+    assert response['status'] == 'success'
+    assert [r['title'] for r in response['results']] == ["solar power result 0", "solar power result 1"]
+    params = parse_qs(urlparse(search_backend.requests[0][1]).query)
+    assert params == {'q': ["solar power"], 'count': ["2"]}
+
+
+def test_concurrent_aexecute_calls_share_the_pooled_client(search_backend):
+    search_backend.delay = 0.05
+    tool = WebSearchTool(endpoint=search_backend.url, coalesce=False)
+
+    async def scenario():
+        return await asyncio.gather(*(tool.aexecute(query=f"query {i}") for i in range(40)))
+
+    responses = asyncio.run(scenario())
+    assert all(response['status'] == 'success' for response in responses)
+    assert len(search_backend.requests) == 40
+
+
+def test_identical_concurrent_searches_are_coalesced(search_backend):
+    search_backend.delay = 0.1
+    tool = WebSearchTool(endpoint=search_backend.url)
+
+    async def scenario():
+        return await asyncio.gather(*(tool.aexecute(query="same query") for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert len(search_backend.requests) == 1
+    assert all(response == responses[0] for response in responses)
+
+
+def test_backend_error_is_reported_as_failed_status(stub_server):
+    server = stub_server(lambda method, path, body: (500, {'error': "down"}))
+    response = asyncio.run(WebSearchTool(endpoint=server.url).aexecute(query="solar"))
+    assert response['status'] == 'failed'
+
+
+def test_default_aexecute_runs_execute_off_the_event_loop():
+    class ThreadNameTool(Tool):
+        def execute(self, **kwargs):
+            return {'status': 'success', 'thread': threading.current_thread().name}
+
+    async def scenario():
+        return await ThreadNameTool().aexecute(), threading.current_thread().name
+
+    result, loop_thread = asyncio.run(scenario())
+    assert result['thread'] != loop_thread
@@ -0,0 +1,263 @@
+"""
+Columnar analysis of search results
+
+Search results are converted once into a ResultTable of NumPy arrays; every
+statistic after that is computed with array operations, so analyzing a
+single result page and a million rows from a whole batch share one code path.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from tools.records import ResultSet
+
+_DAY = np.timedelta64(1, 'D')
+
+
+def _parse_dates(values: Sequence[Any]) -> np.ndarray:
+    """ISO dates to datetime64[D]; anything unparseable becomes NaT"""
+    try:
+        return np.array(values, dtype='datetime64[D]')
+    except (ValueError, TypeError):
+        # Rare path: at least one malformed value, so fall back to element-wise parsing
+        parsed = np.empty(len(values), dtype='datetime64[D]')
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = np.datetime64(value, 'D') if value else np.datetime64('NaT')
+            except (ValueError, TypeError):
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
+
+class ResultTable:
+    """
+    Search results stored column-wise
+
+    Attributes:
+        relevance: float64 relevance scores
+        source_codes: int32 index into ``sources`` per row
+        sources: Distinct source names
+        dates: datetime64[D] publication dates (NaT when missing)
+        task_ids: int32 id of the task each row came from
+    """
+
+    __slots__ = ('relevance', 'source_codes', 'sources', 'dates', 'task_ids')
+
+    def __init__(self, relevance: np.ndarray, source_codes: np.ndarray, sources: List[str],
+                 dates: np.ndarray, task_ids: np.ndarray):
+        self.relevance = relevance
+        self.source_codes = source_codes
+        self.sources = sources
+        self.dates = dates
+        self.task_ids = task_ids
+
+    def __len__(self) -> int:
+        return len(self.relevance)
+
+    @classmethod
+    def from_columns(cls, relevance: Sequence[float], sources: Sequence[str], dates: Sequence[Any],
+                     task_ids: Optional[Sequence[int]] = None) -> "ResultTable":
+        """Build a table from parallel column sequences (or arrays)"""
+        relevance_array = np.asarray(relevance, dtype=np.float64)
+        source_names, codes = np.unique(np.asarray(sources, dtype=object), return_inverse=True)
+        if isinstance(dates, np.ndarray) and dates.dtype.kind == 'M':
+            date_array = dates.astype('datetime64[D]')
+        else:
+            date_array = _parse_dates(dates)
+        if task_ids is None:
+            task_array = np.zeros(len(relevance_array), dtype=np.int32)
+        else:
+            task_array = np.asarray(task_ids, dtype=np.int32)
+        return cls(relevance_array, codes.astype(np.int32), [str(name) for name in source_names],
+                   date_array, task_array)
+
+    @classmethod
+    def from_results(cls, results: Sequence[Dict[str, Any]], task_id: int = 0) -> "ResultTable":
+        """Build a table from WebSearchTool ``results`` (a ResultSet or a list of dicts)"""
+        if isinstance(results, ResultSet):
+            # Already columnar: reuse the arrays without materializing any dicts
+            ids, codes = np.unique(np.frombuffer(results.source_ids, dtype=np.uint32), return_inverse=True)
+            names = [results.source_names[int(i)] or 'unknown' for i in ids]
+            # Source ids follow first-seen order; keep the vocabulary sorted as from_columns does
+            order = sorted(range(len(names)), key=names.__getitem__)
+            rank = np.empty(len(names), dtype=np.int32)
+            rank[order] = np.arange(len(names), dtype=np.int32)
+            return cls(
+                np.frombuffer(results.relevance, dtype=np.float64).copy(),
+                rank[codes],
+                [names[i] for i in order],
+                _parse_dates([date or 'NaT' for date in results.dates()]),
+                np.full(len(results), task_id, dtype=np.int32)
+            )
+        return cls.from_columns(
+            [r.get('relevance_score', np.nan) for r in results],
+            [r.get('source', '') or 'unknown' for r in results],
+            [r.get('date') or 'NaT' for r in results],
+            np.full(len(results), task_id, dtype=np.int32)
+        )
+
+    @classmethod
+    def from_result_sets(cls, result_sets: Sequence[Sequence[Dict[str, Any]]]) -> "ResultTable":
+        """One table over several tasks' results; row task ids are the set positions"""
+        return cls.concat([cls.from_results(results, task_id=i) for i, results in enumerate(result_sets)])
+
+    @classmethod
+    def concat(cls, tables: Sequence["ResultTable"]) -> "ResultTable":
+        """Stack tables, merging their source vocabularies"""
+        sources = sorted({name for table in tables for name in table.sources})
+        lookup = {name: code for code, name in enumerate(sources)}
+        remapped = [
+            np.asarray([lookup[name] for name in table.sources], dtype=np.int32)[table.source_codes]
+            if len(table) else np.empty(0, dtype=np.int32)
+            for table in tables
+        ]
+        return cls(
+            np.concatenate([t.relevance for t in tables]) if tables else np.empty(0),
+            np.concatenate(remapped) if tables else np.empty(0, dtype=np.int32),
+            sources,
+            np.concatenate([t.dates for t in tables]) if tables else np.empty(0, dtype='datetime64[D]'),
+            np.concatenate([t.task_ids for t in tables]) if tables else np.empty(0, dtype=np.int32)
+        )
+
+
+def relevance_stats(values: np.ndarray) -> Dict[str, Any]:
+    """Summary statistics of a relevance column, ignoring NaN"""
+    valid = values[~np.isnan(values)]
+    if valid.size == 0:
+        return {'count': 0}
+    p25, p50, p75 = np.percentile(valid, [25, 50, 75])
+    return {
+        'count': int(valid.size),
+        'mean': round(float(valid.mean()), 4),
+        'std': round(float(valid.std()), 4),
+        'min': round(float(valid.min()), 4),
+        'p25': round(float(p25), 4),
+        'median': round(float(p50), 4),
+        'p75': round(float(p75), 4),
+        'max': round(float(valid.max()), 4)
+    }
+
+
+def source_distribution(table: ResultTable) -> List[Dict[str, Any]]:
+    """Result count, share and mean relevance per source, most frequent first"""
+    if len(table) == 0:
+        return []
+    n_sources = len(table.sources)
+    counts = np.bincount(table.source_codes, minlength=n_sources)
+    relevance = np.nan_to_num(table.relevance)
+    sums = np.bincount(table.source_codes, weights=relevance, minlength=n_sources)
+    order = np.lexsort((np.arange(n_sources), -counts))
+    total = counts.sum()
+    return [
+        {
+            'source': table.sources[i],
+            'count': int(counts[i]),
+            'share': round(float(counts[i] / total), 4),
+            'mean_relevance': round(float(sums[i] / counts[i]), 4)
+        }
+        for i in order if counts[i]
+    ]
+
+
+def date_histogram(dates: np.ndarray) -> Dict[str, int]:
+    """Number of results per calendar month (YYYY-MM), in date order"""
+    valid = dates[~np.isnat(dates)]
+    if valid.size == 0:
+        return {}
+    months, counts = np.unique(valid.astype('datetime64[M]'), return_counts=True)
+    return {str(month): int(count) for month, count in zip(months, counts)}
+
+
+def trend(dates: np.ndarray, relevance: np.ndarray) -> Dict[str, Any]:
+    """
+    Least-squares trends over time
+
+    ``volume_slope`` is the change in results per month across the observed
+    months (gaps count as zero); ``relevance_slope`` is the change in
+    relevance per 30 days across individual results.
+    """
+    mask = ~np.isnat(dates)
+    if not mask.any():
+        return {'direction': 'unknown', 'volume_slope': 0.0, 'relevance_slope': 0.0}
+
+    months = dates[mask].astype('datetime64[M]').astype(np.int64)
+    first = months.min()
+    monthly = np.bincount(months - first)
+    volume_slope = 0.0
+    if monthly.size >= 2:
+        volume_slope = float(np.polyfit(np.arange(monthly.size), monthly, 1)[0])
+
+    relevance_slope = 0.0
+    days = (dates[mask] - dates[mask].min()) / _DAY
+    scores = relevance[mask]
+    keep = ~np.isnan(scores)
+    if keep.sum() >= 2 and np.ptp(days[keep]) > 0:
+        relevance_slope = float(np.polyfit(days[keep], scores[keep], 1)[0] * 30)
+
+    # Call it a trend only if the fitted change over the window is at least 10% of the mean
+    mean_volume = monthly.mean()
+    change = volume_slope * max(monthly.size - 1, 1)
+    if mean_volume and change > 0.1 * mean_volume:
+        direction = 'increasing'
+    elif mean_volume and change < -0.1 * mean_volume:
+        direction = 'decreasing'
+    else:
+        direction = 'stable'
+    return {
+        'direction': direction,
+        'volume_slope': round(volume_slope, 4),
+        'relevance_slope': round(relevance_slope, 4)
+    }
+
+
+def analyze_table(table: ResultTable) -> Dict[str, Any]:
+    """Every statistic for a table, treating all rows as one population"""
+    return {
+        'result_count': len(table),
+        'relevance': relevance_stats(table.relevance),
+        'sources': source_distribution(table),
+        'date_histogram': date_histogram(table.dates),
+        'trend': trend(table.dates, table.relevance)
+    }
+
+
+def per_task_relevance(table: ResultTable, n_tasks: Optional[int] = None,
+                       task_ids: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Count and mean/min/max relevance per task id, computed in one grouped pass
+
+    Args:
+        table: Rows tagged with task ids
+        n_tasks: Report ids ``0..n_tasks - 1`` (default: up to the largest id in the table)
+        task_ids: Report exactly these ids, in this order; takes precedence over ``n_tasks``
+    """
+    largest = int(table.task_ids.max()) + 1 if len(table) else 0
+    if task_ids is not None:
+        reported = [int(i) for i in task_ids]
+        n_tasks = max(max(reported, default=-1) + 1, largest)
+    else:
+        n_tasks = n_tasks if n_tasks is not None else largest
+        reported = list(range(n_tasks))
+    if not reported:
+        return []
+    valid = ~np.isnan(table.relevance)
+    ids = table.task_ids[valid]
+    scores = table.relevance[valid]
+    counts = np.bincount(ids, minlength=n_tasks)
+    sums = np.bincount(ids, weights=scores, minlength=n_tasks)
+    maxima = np.full(n_tasks, -np.inf)
+    np.maximum.at(maxima, ids, scores)
+    minima = np.full(n_tasks, np.inf)
+    np.minimum.at(minima, ids, scores)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return [
+        {
+            'task': i,
+            'count': int(counts[i]),
+            'mean_relevance': round(float(means[i]), 4) if counts[i] else None,
+            'min_relevance': round(float(minima[i]), 4) if counts[i] else None,
+            'max_relevance': round(float(maxima[i]), 4) if counts[i] else None
+        }
+        for i in reported
+    ]
@@ -1,7 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+class ToolExecutionError(Exception):
+    """Raised when a tool reports a failed status instead of raising itself"""
 
 class Tool(ABC):
+    # True for tools that take the caller's rate limiter (a ``limiter`` keyword argument) and
+    # apply it to backend calls themselves, so cache hits do not use up quota; others are limited per call
+    rate_limited = False
+    # Identity of the backend the tool calls (e.g. an endpoint URL), or None for local tools; circuit
+    # breakers are kept per tool name and backend, so one agent's broken endpoint does not trip another's
+    backend: Optional[str] = None
+
     @abstractmethod
     def execute(self, *args, **kwargs) -> Dict[str, Any]:
         """
@@ -10,4 +21,16 @@ class Tool(ABC):
         Returns:
             Dictionary containing tool's output and metadata
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def aexecute(self, *args, **kwargs) -> Dict[str, Any]:
+        """
+        Asynchronous variant of execute
+        
+        Tools with native async I/O should override this. The default runs
+        ``execute`` in a worker thread so it never blocks the event loop.
+        
+        Returns:
+            Dictionary containing tool's output and metadata
+        """
+        return await asyncio.to_thread(self.execute, *args, **kwargs)
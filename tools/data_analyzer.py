@@ -1,56 +1,141 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Sequence
 from tools.base_tool import Tool
+from tools.analysis_engine import ResultTable, analyze_table, per_task_relevance
+from tools.records import ResultSet
 from utils.logger import log
 
 class DataAnalyzerTool(Tool):
     def execute(self, data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """
         Analyze structured data and extract insights
-        
+
         Args:
-            data: Dictionary containing data to analyze
+            data: Search response from WebSearchTool (its ``results`` list is
+                analyzed; a legacy ``search_results`` list is accepted too)
             **kwargs: Additional context
-            
+
         Returns:
             Dictionary containing analysis results
         """
         log("Starting data analysis...")
-        
+
         try:
-            # Mock analysis - in a real implementation, this would perform actual analysis
             if not data:
                 raise ValueError("No data provided for analysis")
-            
-            # Extract key information from the data
-            if 'search_results' in data:
-                search_data = data['search_results']
-                analysis_result = {
-                    'key_metrics': {
-                        'relevance_score': 0.85,
-                        'sentiment': 'neutral',
-                        'trend': 'increasing'
-                    },
-                    'insights': [
-                        f"Found {len(search_data)} relevant sources",
-                        "Primary concerns: energy consumption and carbon footprint",
-                        "Emerging solutions: renewable energy mining operations"
-                    ],
-                    'recommendations': [
-                        "Consider transitioning to proof-of-stake consensus",
-                        "Explore renewable energy partnerships",
-                        "Implement carbon offset programs"
-                    ]
-                }
-            else:
+
+            results = self._extract_results(data)
+            if results is None:
                 analysis_result = {
                     'key_metrics': {},
                     'insights': ["No specific insights - generic data provided"],
                     'recommendations': ["Collect more specific data for better analysis"]
                 }
-            
+            else:
+                analysis_result = self._summarize(analyze_table(ResultTable.from_results(results)))
+
             log("Data analysis completed successfully")
             return analysis_result
-            
+
         except Exception as e:
             log(f"Data analysis failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def analyze_batch(self, datasets: Iterable[Dict[str, Any]],
+                      task_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Analyze several search responses (e.g. every task of a run) at once
+
+        All results go into one columnar table, so the cross-task statistics
+        and the per-task breakdown come from a single vectorized pass. Each
+        response is only needed while its rows are converted, so ``datasets``
+        may be a lazy iterator.
+
+        Args:
+            datasets: Search responses, one per task
+            task_ids: The task each response belongs to (e.g. its index in the
+                agent's task history), reported in ``per_task``; defaults to
+                the response's position in ``datasets``
+
+        Returns:
+            Dictionary with an overall analysis and per-task relevance
+        """
+        if task_ids is None:
+            tables = [ResultTable.from_results(self._extract_results(data) or [], task_id=i)
+                      for i, data in enumerate(datasets)]
+            task_ids = range(len(tables))
+        else:
+            tables = [ResultTable.from_results(self._extract_results(data) or [], task_id=task_id)
+                      for task_id, data in zip(task_ids, datasets)]
+        table = ResultTable.concat(tables)
+        overall = self._summarize(analyze_table(table))
+        overall['per_task'] = per_task_relevance(table, task_ids=task_ids)
+        return overall
+
+    @staticmethod
+    def _extract_results(data: Dict[str, Any]) -> Any:
+        """The list of result rows in a payload, or None if it has none"""
+        for key in ('results', 'search_results'):
+            value = data.get(key)
+            if isinstance(value, dict):
+                value = value.get('results')
+            if isinstance(value, (list, ResultSet)):
+                return value
+        return None
+
+    def _summarize(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn raw statistics into the metrics/insights/recommendations shape reports use"""
+        count = stats['result_count']
+        relevance = stats['relevance']
+        sources = stats['sources']
+        trend = stats['trend']
+
+        if count == 0:
+            return {
+                'key_metrics': {'result_count': 0},
+                'insights': ["No results to analyze"],
+                'recommendations': ["Broaden the search query to collect results"],
+                'statistics': stats
+            }
+
+        key_metrics = {
+            'result_count': count,
+            'relevance_score': relevance.get('mean', 0.0),
+            'relevance_spread': relevance.get('std', 0.0),
+            'distinct_sources': len(sources),
+            'trend': trend['direction']
+        }
+
+        top = sources[0]
+        insights = [
+            f"Found {count} results from {len(sources)} distinct sources",
+            f"Most represented source: {top['source']} ({top['share']:.0%} of results, "
+            f"mean relevance {top['mean_relevance']:.2f})",
+            f"Relevance ranges from {relevance.get('min', 0):.2f} to {relevance.get('max', 0):.2f} "
+            f"(median {relevance.get('median', 0):.2f})"
+        ]
+        if trend['direction'] != 'unknown':
+            insights.append(
+                f"Publication volume is {trend['direction']} "
+                f"({trend['volume_slope']:+.2f} results/month)"
+            )
+
+        recommendations: List[str] = []
+        if relevance.get('mean', 0) < 0.6:
+            recommendations.append("Refine the query - average relevance is low")
+        if top['share'] > 0.5 and len(sources) > 1:
+            recommendations.append(f"Diversify sources beyond {top['source']}")
+        if len(sources) == 1:
+            recommendations.append("Corroborate findings with additional independent sources")
+        if count < 5:
+            recommendations.append("Broaden the search to collect more evidence")
+        if trend['direction'] == 'increasing':
+            recommendations.append("Prioritize recent publications - activity is increasing")
+        if not recommendations:
+            recommendations.append("Evidence base looks balanced; proceed with synthesis")
+
+        return {
+            'key_metrics': key_metrics,
+            'insights': insights,
+            'recommendations': recommendations,
+            'statistics': stats
+        }
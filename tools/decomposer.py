@@ -0,0 +1,296 @@
+"""
+Query decomposition
+
+A decomposer turns a research query into a plan: a list of task specs
+(``{'description', 'required_tools', 'depends_on'}`` dicts, the same shape the
+run journal records). RuleBasedDecomposer is the built-in keyword plan;
+LLMDecomposer asks an OpenAI-compatible chat endpoint and falls back to the
+rules whenever the model is slow, unreachable or returns an unusable plan.
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.cache import TieredCache, make_cache_key, normalize_query
+from utils.deadline import Deadline
+from utils.logger import log
+
+TaskSpec = Dict[str, Any]
+
+# Bump when the prompt or plan format changes so stale cached plans are not reused
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = """You plan research work for an autonomous agent.
+For every numbered query you are given, break it into 2 to 5 sub-tasks.
+Each task has:
+- "description": one sentence saying what to research
+- "required_tools": tools to run in order, chosen from {tools}
+- "depends_on": 0-based indices of earlier tasks in the same plan that must finish first
+Reply with a single JSON object: {{"plans": [{{"id": <query number>, "tasks": [...]}}, ...]}}"""
+
+
+class Decomposer(ABC):
+    """Interface: build the task plan for a query"""
+
+    # Whether decompose() may wait on I/O; async callers then run it in a thread
+    blocking = False
+
+    @abstractmethod
+    def decompose(self, query: str, deadline: Optional[Deadline] = None) -> List[TaskSpec]:
+        """
+        Plan the research for a query
+
+        Args:
+            query: Research query
+            deadline: The run's deadline; a decomposer that waits on I/O must
+                not wait past it
+
+        Returns:
+            Task specs in execution order
+        """
+
+
+class RuleBasedDecomposer(Decomposer):
+    """Fixed keyword-driven plans; instant and always available"""
+
+    def decompose(self, query: str, deadline: Optional[Deadline] = None) -> List[TaskSpec]:
+        if "environmental impact" in query.lower():
+            return [
+                {
+                    'description': "Find current statistics on environmental impact",
+                    'required_tools': ["web_search", "data_analyzer"]
+                },
+                {
+                    'description': "Identify key contributing factors",
+                    'required_tools': ["web_search", "data_analyzer"]
+                },
+                {
+                    'description': "Research sustainable alternatives",
+                    'required_tools': ["web_search"]
+                }
+            ]
+        # Default decomposition pattern
+        return [
+            {
+                'description': f"Background research on {query}",
+                'required_tools': ["web_search"]
+            },
+            {
+                'description': f"Analyze current trends in {query}",
+                'required_tools': ["web_search", "data_analyzer"]
+            },
+            {
+                'description': f"Recommendations regarding {query}",
+                'required_tools': ["web_search", "data_analyzer"]
+            }
+        ]
+
+
+def validate_plan(tasks: Any, tools: Sequence[str]) -> Optional[List[TaskSpec]]:
+    """
+    Clean up a model-produced plan, or return None if it cannot be used
+
+    Unknown tools are dropped, tools are put in pipeline order (a task that
+    analyzes data also searches first), and dependencies may only point at
+    earlier tasks, which rules out cycles.
+    """
+    if not isinstance(tasks, list) or not tasks:
+        return None
+    plan = []
+    for index, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            return None
+        description = task.get('description')
+        if not isinstance(description, str) or not description.strip():
+            return None
+        requested = task.get('required_tools') or []
+        if not isinstance(requested, list):
+            return None
+        required = [tool for tool in tools if tool in requested]
+        if 'data_analyzer' in required and 'web_search' not in required and 'web_search' in tools:
+            required.insert(0, 'web_search')
+        if not required:
+            return None
+        depends_on = task.get('depends_on') or []
+        if not isinstance(depends_on, list):
+            return None
+        plan.append({
+            'description': description.strip(),
+            'required_tools': required,
+            'depends_on': sorted({d for d in depends_on if isinstance(d, int) and 0 <= d < index})
+        })
+    return plan
+
+
+class LLMDecomposer(Decomposer):
+    """
+    Decomposition by an OpenAI-compatible chat completions endpoint
+
+    Queries from every thread sharing the instance are gathered for up to
+    ``max_wait`` seconds and sent as one prompt of up to ``batch_size``
+    numbered queries, so a burst of agents costs a few LLM round trips rather
+    than one each. Plans are cached by normalized query (pass a TieredCache
+    with a SQLite tier to keep them across restarts). A query that gets no
+    valid plan within ``timeout`` seconds (or before the caller's deadline)
+    uses the fallback decomposer; its plan is not cached, so the next run asks
+    the model again.
+    """
+
+    blocking = True
+
+    def __init__(self, base_url: str, model: str, api_key: str = "not-needed", timeout: float = 10.0,
+                 batch_size: int = 16, max_wait: float = 0.05, max_concurrent_requests: int = 4,
+                 cache: Optional[TieredCache] = None, fallback: Optional[Decomposer] = None,
+                 tools: Sequence[str] = ("web_search", "data_analyzer")):
+        """
+        Args:
+            base_url: API root, e.g. ``http://localhost:8000/v1``
+            model: Model name sent with each request
+            api_key: Bearer token (local servers usually ignore it)
+            timeout: Seconds a caller waits for its plan before falling back
+            batch_size: Most queries sent in one request
+            max_wait: Seconds to wait for more queries before sending a partial batch
+            max_concurrent_requests: Batches allowed in flight at once
+            cache: Plan cache; memory-only if omitted
+            fallback: Used on timeout or failure (default: RuleBasedDecomposer)
+            tools: Tools the model may assign, in pipeline order
+        """
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.cache = cache if cache is not None else TieredCache()
+        self.fallback = fallback if fallback is not None else RuleBasedDecomposer()
+        self.tools = list(tools)
+        self._client = None
+        self._condition = threading.Condition()
+        # normalized query -> (query, future); dict order is arrival order
+        self._pending: Dict[str, Tuple[str, Future]] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._batcher: Optional[threading.Thread] = None
+        self._senders = ThreadPoolExecutor(max_workers=max_concurrent_requests, thread_name_prefix="decompose")
+        self._stats_lock = threading.Lock()
+        self.stats = {'queries': 0, 'cache_hits': 0, 'requests': 0, 'planned': 0, 'fallbacks': 0,
+                      'failed_requests': 0}
+
+    def _count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _cache_key(self, query: str) -> str:
+        return make_cache_key('decompose', query, {'model': self.model, 'tools': self.tools,
+                                                   'version': PROMPT_VERSION})
+
+    def decompose(self, query: str, deadline: Optional[Deadline] = None) -> List[TaskSpec]:
+        self._count(queries=1)
+        cached = self.cache.get(self._cache_key(query))
+        if cached is not None:
+            self._count(cache_hits=1)
+            return cached
+        future = self._enqueue(query)
+        try:
+            # The batch request carries on for other callers; only this caller stops waiting
+            plan = future.result(timeout=deadline.timeout(self.timeout) if deadline else self.timeout)
+        except Exception as e:
+            log(f"LLM decomposition unavailable ({type(e).__name__}); using fallback plan", "warning")
+            plan = None
+        if plan is None:
+            self._count(fallbacks=1)
+            return self.fallback.decompose(query, deadline)
+        return plan
+
+    def _enqueue(self, query: str) -> Future:
+        """Future for the query's plan, shared with any identical query already waiting"""
+        key = normalize_query(query)
+        with self._condition:
+            if key in self._pending:
+                return self._pending[key][1]
+            if key in self._in_flight:
+                return self._in_flight[key]
+            future: Future = Future()
+            self._pending[key] = (query, future)
+            if self._batcher is None or not self._batcher.is_alive():
+                self._batcher = threading.Thread(target=self._batch_loop, name="decompose-batcher", daemon=True)
+                self._batcher.start()
+            self._condition.notify()
+            return future
+
+    def _batch_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                # Give other callers a moment to join this batch
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                keys = list(self._pending)[:self.batch_size]
+                batch = [(key, *self._pending.pop(key)) for key in keys]
+                for key, _, future in batch:
+                    self._in_flight[key] = future
+            self._senders.submit(self._send_batch, batch)
+
+    def _send_batch(self, batch: List[Tuple[str, str, Future]]) -> None:
+        plans: Dict[int, List[TaskSpec]] = {}
+        try:
+            self._count(requests=1)
+            plans = self._request_plans([query for _, query, _ in batch])
+        except Exception as e:
+            self._count(failed_requests=1)
+            log(f"LLM decomposition request failed: {e}", "warning")
+        finally:
+            with self._condition:
+                for key, _, _ in batch:
+                    self._in_flight.pop(key, None)
+        for index, (_, query, future) in enumerate(batch):
+            plan = plans.get(index)
+            if plan is not None:
+                self.cache.set(self._cache_key(query), plan)
+                self._count(planned=1)
+            future.set_result(plan)
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            from openai import OpenAI  # only needed when an LLM endpoint is configured
+            self._client = OpenAI(base_url=self.base_url, api_key=self.api_key, timeout=self.timeout,
+                                  max_retries=0)
+        return self._client
+
+    def _request_plans(self, queries: List[str]) -> Dict[int, List[TaskSpec]]:
+        """One chat completion for a batch; maps batch position to a validated plan"""
+        numbered = "\n".join(f"{i}. {query}" for i, query in enumerate(queries))
+        response = self._get_client().chat.completions.create(
+            model=self.model,
+            temperature=0,
+            response_format={'type': 'json_object'},
+            messages=[
+                {'role': 'system', 'content': SYSTEM_PROMPT.format(tools=", ".join(self.tools))},
+                {'role': 'user', 'content': f"Queries:\n{numbered}"}
+            ]
+        )
+        payload = json.loads(response.choices[0].message.content or "{}")
+        plans = {}
+        for entry in payload.get('plans', []) if isinstance(payload, dict) else []:
+            if not isinstance(entry, dict) or not isinstance(entry.get('id'), int):
+                continue
+            if 0 <= entry['id'] < len(queries):
+                plan = validate_plan(entry.get('tasks'), self.tools)
+                if plan is not None:
+                    plans[entry['id']] = plan
+        return plans
+
+    def close(self) -> None:
+        self._senders.shutdown(wait=False)
@@ -0,0 +1,197 @@
+"""
+Duplicate and near-duplicate filtering of search results
+
+Overlapping task phrasings make the search backend return the same page (same
+URL) or a near copy of it (a summary with a few words added or cut) more than
+once. A DedupIndex is shared by every task of a run and drops both kinds
+before the results reach the analyzer and the report:
+
+- exact duplicates: a 64-bit hash of the normalized URL
+- near duplicates: a MinHash signature of the summary's word bigrams,
+  looked up through banded LSH tables so only candidates sharing a band are
+  compared. A candidate is a duplicate when the estimated Jaccard similarity
+  reaches the threshold and one summary's content words include all of the
+  other's (one may only add words, e.g. a truncated or boilerplate-padded
+  copy). Templated summaries that differ in their subject ("Key findings
+  about solar power" vs "... wind power") are therefore kept.
+"""
+import hashlib
+import re
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from tools.records import ResultSet
+from tools.search_index import STOPWORDS
+
+_WORD = re.compile(r"\w+")
+_TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def content_words(text: str) -> frozenset:
+    """Lowercased words of a summary, without stopwords"""
+    return frozenset(word for word in _WORD.findall(text.lower()) if word not in STOPWORDS)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical URL: lowercase scheme and host, no fragment, tracking parameters or trailing slash"""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(_TRACKING_PARAMS)]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+
+class MinHasher:
+    """
+    MinHash signatures over word bigrams, computed with NumPy
+
+    Each of the ``num_perm`` hash functions is ``(a * h + b) mod p`` applied to
+    a 32-bit hash ``h`` of every bigram; products stay below 2**63, so the
+    arithmetic is exact in uint64.
+    """
+
+    _PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        features = {" ".join(pair) for pair in zip(words, words[1:])} or set(words)
+        if not features:
+            return np.full(self.num_perm, self._PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=4).digest(), 'big') for f in features),
+            dtype=np.uint64, count=len(features)
+        )
+        return ((self._a * hashes + self._b) % self._PRIME).min(axis=1)
+
+
+class DedupIndex:
+    """
+    Thread-safe index of the search results already kept in a run
+
+    The first copy of a result to reach the index wins, so with concurrent
+    tasks which task keeps a duplicate depends on completion order.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity of two summaries' word
+                bigrams at or above which they may count as near duplicates
+            num_perm: MinHash signature length
+            bands: LSH bands; ``num_perm / bands`` rows each. The default 16x4
+                makes pairs at about half the threshold candidates, so
+                near duplicates are rarely missed
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._urls: set = set()
+        self._signatures = np.empty((64, num_perm), dtype=np.uint64)
+        self._words: List[frozenset] = []
+        self._count = 0
+        self._tables: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self.seen = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self._rows:(i + 1) * self._rows].tobytes() for i in range(self.bands)]
+
+    def _near_match(self, signature: np.ndarray, band_keys: List[bytes], words: frozenset) -> bool:
+        candidates = set()
+        for table, key in zip(self._tables, band_keys):
+            candidates.update(table.get(key, ()))
+        if not candidates:
+            return False
+        # Compare against every candidate signature in one vectorized step
+        positions = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+        agreement = np.count_nonzero(self._signatures[positions] == signature, axis=1)
+        similar = positions[agreement >= self.threshold * signature.size]
+        # Similar wording is not enough: a word swapped for another usually means a different subject
+        return any(words <= self._words[p] or self._words[p] <= words for p in similar.tolist())
+
+    def _insert(self, url_key: int, signature: np.ndarray, band_keys: List[bytes], words: frozenset) -> None:
+        self._urls.add(url_key)
+        self._words.append(words)
+        position = self._count
+        if position == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[position] = signature
+        self._count += 1
+        for table, key in zip(self._tables, band_keys):
+            table.setdefault(key, []).append(position)
+
+    def _keys(self, results: Sequence[Dict[str, Any]]) -> List[Tuple[int, np.ndarray, List[bytes], frozenset]]:
+        # Hashing happens outside the lock; only the index lookups are serialized
+        keys = []
+        for r in results:
+            summary = r.get('summary', '')
+            signature = self._hasher.signature(summary)
+            keys.append((_hash64(normalize_url(r.get('url', ''))), signature, self._band_keys(signature),
+                         content_words(summary)))
+        return keys
+
+    def filter(self, results: Sequence[Dict[str, Any]]) -> Tuple[Sequence[Dict[str, Any]], int]:
+        """
+        Drop results already in the index (and duplicates within ``results``)
+
+        Args:
+            results: A ResultSet or a list of result dicts
+
+        Returns:
+            The kept results, in the same container type, and how many were dropped
+        """
+        keys = self._keys(results)
+        keep = []
+        with self._lock:
+            for url_key, signature, band_keys, words in keys:
+                self.seen += 1
+                if url_key in self._urls:
+                    self.exact_duplicates += 1
+                    keep.append(False)
+                elif self._near_match(signature, band_keys, words):
+                    self.near_duplicates += 1
+                    keep.append(False)
+                else:
+                    self._insert(url_key, signature, band_keys, words)
+                    keep.append(True)
+        collapsed = keep.count(False)
+        if not collapsed:
+            return results, 0
+        if isinstance(results, ResultSet):
+            return ResultSet(row for row, kept in zip(results.rows(), keep) if kept), collapsed
+        return [r for r, kept in zip(results, keep) if kept], collapsed
+
+    def add(self, results: Sequence[Dict[str, Any]]) -> None:
+        """Index results without filtering them (e.g. ones restored from a journal)"""
+        keys = self._keys(results)
+        with self._lock:
+            for url_key, signature, band_keys, words in keys:
+                self._insert(url_key, signature, band_keys, words)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'seen': self.seen,
+                'kept': self.seen - self.exact_duplicates - self.near_duplicates,
+                'exact_duplicates': self.exact_duplicates,
+                'near_duplicates': self.near_duplicates,
+                'collapsed': self.exact_duplicates + self.near_duplicates
+            }
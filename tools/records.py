@@ -0,0 +1,193 @@
+"""
+Compact record types for search results
+
+A page of results is held column-wise: every text column is one string plus
+an offsets array, relevance is an array of doubles, and sources are small
+integer ids into the set's own table of distinct source names. Dicts are only
+built at the API boundary (``to_dicts``, item access, JSON encoding).
+"""
+import sys
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """A single search result"""
+    title: str
+    url: str
+    source: str
+    summary: str
+    relevance_score: float
+    date: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'title': self.title,
+            'url': self.url,
+            'source': self.source,
+            'summary': self.summary,
+            'relevance_score': self.relevance_score,
+            'date': self.date
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchHit":
+        return cls(
+            title=data.get('title', ''),
+            url=data.get('url', ''),
+            source=data.get('source', ''),
+            summary=data.get('summary', ''),
+            relevance_score=float(data.get('relevance_score', 0.0)),
+            date=data.get('date', '')
+        )
+
+
+class _TextColumn:
+    """Many strings stored as one string and an offsets array"""
+
+    __slots__ = ('_text', '_offsets')
+
+    def __init__(self, values: List[str]):
+        offsets = array('I', [0])
+        position = 0
+        for value in values:
+            position += len(value)
+            offsets.append(position)
+        self._text = "".join(values)
+        self._offsets = offsets
+
+    def __getitem__(self, index: int) -> str:
+        return self._text[self._offsets[index]:self._offsets[index + 1]]
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._text) + sys.getsizeof(self._offsets)
+
+
+class ResultSet(Sequence):
+    """
+    Array-backed page of search results
+
+    Behaves as a read-only sequence of result dicts, so existing consumers
+    keep working, but stores no per-result Python objects. Columnar readers
+    (e.g. the analysis engine) use ``relevance`` and ``source_ids`` directly;
+    ``source_ids`` index ``source_names``, the distinct sources of this set in
+    first-seen order.
+    """
+
+    __slots__ = ('_titles', '_urls', '_summaries', '_dates', 'source_ids', 'source_names', 'relevance',
+                 '_length')
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str, str, float, str]] = ()):
+        """
+        Args:
+            rows: ``(title, url, source, summary, relevance_score, date)`` tuples
+        """
+        titles: List[str] = []
+        urls: List[str] = []
+        summaries: List[str] = []
+        dates: List[str] = []
+        self.source_ids = array('I')
+        self.source_names: List[str] = []
+        self.relevance = array('d')
+        # Only as long-lived as the set, unlike a process-wide table
+        source_index: Dict[str, int] = {}
+        for title, url, source, summary, relevance_score, date in rows:
+            titles.append(title)
+            urls.append(url)
+            source_id = source_index.get(source)
+            if source_id is None:
+                source_id = source_index[source] = len(self.source_names)
+                self.source_names.append(sys.intern(source))
+            self.source_ids.append(source_id)
+            summaries.append(summary)
+            self.relevance.append(relevance_score)
+            dates.append(date)
+        self._titles = _TextColumn(titles)
+        self._urls = _TextColumn(urls)
+        self._summaries = _TextColumn(summaries)
+        self._dates = _TextColumn(dates)
+        self._length = len(titles)
+
+    @classmethod
+    def from_dicts(cls, results: Iterable[Dict[str, Any]]) -> "ResultSet":
+        return cls(
+            (r.get('title', ''), r.get('url', ''), r.get('source', ''), r.get('summary', ''),
+             float(r.get('relevance_score', 0.0)), r.get('date', ''))
+            for r in results
+        )
+
+    @classmethod
+    def from_hits(cls, hits: Iterable[SearchHit]) -> "ResultSet":
+        return cls((h.title, h.url, h.source, h.summary, h.relevance_score, h.date) for h in hits)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __reduce__(self):
+        # Rebuilt from rows, so the copy gets compact text columns and its own source table
+        return (ResultSet, (list(self.rows()),))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ResultSet index out of range")
+        return {
+            'title': self._titles[index],
+            'url': self._urls[index],
+            'source': self.source_names[self.source_ids[index]],
+            'summary': self._summaries[index],
+            'relevance_score': self.relevance[index],
+            'date': self._dates[index]
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._length):
+            yield self[index]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ResultSet, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResultSet({self._length} results)"
+
+    def rows(self) -> Iterator[Tuple[str, str, str, str, float, str]]:
+        for index in range(self._length):
+            yield (self._titles[index], self._urls[index], self.source_names[self.source_ids[index]],
+                   self._summaries[index], self.relevance[index], self._dates[index])
+
+    def hit(self, index: int) -> SearchHit:
+        return SearchHit(**self[index])
+
+    def sources(self) -> List[str]:
+        names = self.source_names
+        return [names[i] for i in self.source_ids]
+
+    def dates(self) -> List[str]:
+        return [self._dates[i] for i in range(self._length)]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by this result set"""
+        return (sys.getsizeof(self) + self._titles.nbytes() + self._urls.nbytes() + self._summaries.nbytes()
+                + self._dates.nbytes() + sys.getsizeof(self.source_ids) + sys.getsizeof(self.source_names)
+                + sys.getsizeof(self.relevance))
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` hook that encodes compact records (and other lazy sequences) as plain JSON"""
+    if isinstance(value, ResultSet):
+        return value.to_dicts()
+    if isinstance(value, SearchHit):
+        return value.to_dict()
+    if isinstance(value, Sequence):
+        return list(value)
+    return str(value)
@@ -0,0 +1,181 @@
+"""
+Tool registry
+
+Tools are declared by name and a ``"module:Class"`` path (or a factory), and
+are only imported and constructed the first time an agent actually uses
+them. Constructed tools are shared: every agent asking for the same tool with
+the same constructor arguments gets the same instance, so registered tools
+must keep no per-call state (all built-in tools qualify).
+"""
+import importlib
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from tools.base_tool import Tool
+from utils.error_handler import CircuitBreaker, find_breaker, get_breaker
+from utils.rate_limit import RateLimiter, get_limiter
+
+ToolFactory = Callable[..., Tool]
+
+
+class ToolRegistry:
+    """Thread-safe mapping of tool names to lazily imported, shared tool instances"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._targets: Dict[str, Union[str, ToolFactory]] = {}
+        self._factories: Dict[str, ToolFactory] = {}
+        self._shared: Dict[Tuple[Any, ...], Tool] = {}
+
+    def register(self, name: str, target: Union[str, ToolFactory]) -> None:
+        """
+        Declare a tool
+
+        Args:
+            name: Name tasks use in ``required_tools``
+            target: ``"package.module:ClassName"`` (imported on first use) or
+                a callable returning a Tool
+        """
+        with self._lock:
+            self._targets[name] = target
+            self._factories.pop(name, None)
+            self._shared = {key: tool for key, tool in self._shared.items() if key[0] != name}
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._targets)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._targets
+
+    def factory(self, name: str) -> ToolFactory:
+        """The tool's class (or factory), importing its module on first use"""
+        factory = self._factories.get(name)
+        if factory is not None:
+            return factory
+        with self._lock:
+            if name not in self._targets:
+                raise KeyError(f"Unknown tool: {name}")
+            target = self._targets[name]
+            if isinstance(target, str):
+                module_name, _, attribute = target.partition(':')
+                factory = getattr(importlib.import_module(module_name), attribute)
+            else:
+                factory = target
+            self._factories[name] = factory
+            return factory
+
+    def create(self, name: str, **kwargs) -> Tool:
+        """A new, unshared instance of a tool"""
+        return self.factory(name)(**kwargs)
+
+    def get(self, name: str, **kwargs) -> Tool:
+        """
+        The shared instance of a tool for these constructor arguments
+
+        Arguments that cannot be hashed get a fresh instance instead.
+        """
+        key = (name, *sorted(kwargs.items()))
+        try:
+            tool = self._shared.get(key)
+        except TypeError:
+            return self.create(name, **kwargs)
+        if tool is not None:
+            return tool
+        factory = self.factory(name)
+        with self._lock:
+            tool = self._shared.get(key)
+            if tool is None:
+                tool = self._shared[key] = factory(**kwargs)
+            return tool
+
+
+class ToolSet(MutableMapping):
+    """
+    The tools of one agent
+
+    Looks like a dict of name -> Tool, but a tool is only resolved from the
+    registry when it is first looked up. Assigning an entry overrides the tool
+    for this agent alone.
+
+    ``limits`` maps tool names to RateLimiter settings (``qps``,
+    ``max_concurrency``, ...). Limiters are process-wide per tool name and
+    settings, so agents that configure a tool the same way share its quota;
+    a tool without an entry (or with ``None``) is not limited, whatever other
+    agents use. Circuit breakers are likewise process-wide per tool name and
+    backend (``Tool.backend``), so an agent only shares breaker state with
+    agents calling the same endpoint or index.
+    """
+
+    def __init__(self, registry: ToolRegistry, options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 limits: Optional[Dict[str, Optional[Dict[str, Any]]]] = None):
+        """
+        Args:
+            registry: Where tools are declared
+            options: Constructor arguments per tool name
+            limits: Rate limiter settings per tool name
+        """
+        self.registry = registry
+        self.options = options or {}
+        self.limits = limits or {}
+        self._tools: Dict[str, Tool] = {}
+        self._limiters: Dict[str, Optional[RateLimiter]] = {}
+
+    def __getitem__(self, name: str) -> Tool:
+        tool = self._tools.get(name)
+        if tool is None:
+            if name not in self.registry:
+                raise KeyError(name)
+            tool = self._tools[name] = self.registry.get(name, **self.options.get(name, {}))
+        return tool
+
+    def __setitem__(self, name: str, tool: Tool) -> None:
+        self._tools[name] = tool
+
+    def __delitem__(self, name: str) -> None:
+        del self._tools[name]
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.registry.names()
+        yield from names
+        yield from (name for name in self._tools if name not in names)
+
+    def __len__(self) -> int:
+        return len(set(self.registry.names()) | set(self._tools))
+
+    def loaded(self) -> Dict[str, Tool]:
+        """Tools resolved so far, without loading any others"""
+        return dict(self._tools)
+
+    def limiter(self, name: str) -> Optional[RateLimiter]:
+        """The shared rate limiter for a tool under these limits, or None if the tool is not limited"""
+        if name not in self._limiters:
+            config = self.limits.get(name)
+            self._limiters[name] = get_limiter(name, **config) if config is not None else None
+        return self._limiters[name]
+
+    def loaded_limiters(self) -> Dict[str, RateLimiter]:
+        """Rate limiters resolved so far, without creating any"""
+        return {name: limiter for name, limiter in self._limiters.items() if limiter is not None}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """The shared circuit breaker for a tool and the backend this agent's instance of it calls"""
+        return get_breaker(name, self[name].backend)
+
+    def loaded_breakers(self) -> Dict[str, CircuitBreaker]:
+        """Circuit breakers of the tools resolved so far, without creating any"""
+        breakers = {name: find_breaker(name, tool.backend) for name, tool in self._tools.items()}
+        return {name: breaker for name, breaker in breakers.items() if breaker is not None}
+
+
+default_registry = ToolRegistry()
+default_registry.register('web_search', 'tools.web_search:WebSearchTool')
+default_registry.register('data_analyzer', 'tools.data_analyzer:DataAnalyzerTool')
+default_registry.register('report_generator', 'tools.report_generator:ReportGeneratorTool')
+
+# Tools that call an external backend get adaptive concurrency out of the box;
+# add 'qps' (and 'burst') to match the provider's quota
+DEFAULT_LIMITS: Dict[str, Optional[Dict[str, Any]]] = {
+    'web_search': {'max_concurrency': 16}
+}
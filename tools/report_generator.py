@@ -1,10 +1,11 @@
-from typing import List, Dict, Any
+import io
+from typing import List, Dict, Any, Iterator, Sequence, TextIO
 from datetime import datetime
 from tools.base_tool import Tool
 from utils.logger import log
 
 class ReportGeneratorTool(Tool):
-    def execute(self, query: str, findings: List[Dict], task_history: List[Any], **kwargs) -> Dict[str, Any]:
+    def execute(self, query: str, findings: Sequence[Dict], task_history: List[Any], **kwargs) -> Dict[str, Any]:
         """
         Generate a comprehensive report from research findings
         
@@ -17,70 +18,138 @@ class ReportGeneratorTool(Tool):
         Returns:
             Dictionary containing formatted report
         """
+        buffer = io.StringIO()
+        result = self.write(buffer, query, findings, task_history, **kwargs)
+        text = buffer.getvalue()
+        
+        # Compile final output
+        output = {
+            'status': result['status'],
+            'report': text if text else "No report generated",
+            'summary': result['summary'],
+            'word_count': result['word_count']
+        }
+        
+        if 'error' in result:
+            output['error'] = result['error']
+            if text:
+                output['partial_report'] = text
+            
+        return output
+
+    def write(self, sink: TextIO, query: str, findings: Sequence[Dict], task_history: List[Any], **kwargs) -> Dict[str, Any]:
+        """
+        Write the report to a text stream section by section
+        
+        Nothing is buffered: each section reaches ``sink`` as soon as it is
+        produced, so a file or socket (``sock.makefile('w')``) sees output
+        immediately and memory does not grow with the size of the report.
+        
+        Args:
+            sink: Any object with a ``write(str)`` method
+            query: Original research query
+            findings: List of all findings from tasks
+            task_history: List of all tasks executed
+            **kwargs: Additional context
+            
+        Returns:
+            Dictionary with status, summary and word count (but not the report text)
+        """
         log("Starting report generation...")
         
-        # Initialize sections list at the start
-        sections = []
         status = 'success'
         error = None
-        partial_report = None
+        word_count = 0
+        first = True
         
         try:
-            # Generate report sections
-            sections.append(f"# Research Report: {query}")
-            sections.append(f"**Generated on**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            sections.append(f"**Total Tasks**: {len(task_history)}")
-            
-            # Executive summary
-            sections.append("\n## Executive Summary")
-            sections.append(self._generate_summary(findings))
-            
-            # Detailed findings
-            sections.append("\n## Detailed Findings")
-            for i, finding in enumerate(findings, 1):
-                if 'error' in finding:
-                    sections.append(f"### Task {i}: {finding['task']} [FAILED]")
-                    sections.append(f"Error: {finding['error']}")
-                else:
-                    sections.append(f"### Task {i}: {finding['task']}")
-                    sections.append(self._format_finding(finding['result']))
-            
-            # Recommendations
-            sections.append("\n## Recommendations")
-            sections.append(self._extract_recommendations(findings))
-            
-            # Task log
-            sections.append("\n## Task Execution Log")
-            sections.append(self._generate_task_log(task_history))
-            
+            for section in self.stream(query, findings, task_history, **kwargs):
+                if not first:
+                    sink.write("\n")
+                sink.write(section)
+                first = False
+                word_count += len(section.split())
         except Exception as e:
             log(f"Report generation failed: {str(e)}", "error")
             status = 'failed'
             error = str(e)
-            partial_report = "\n".join(sections) if sections else None
         
-        # Compile final output
         output = {
             'status': status,
-            'report': "\n".join(sections) if sections else "No report generated",
             'summary': self._generate_short_summary(findings) if status == 'success' else "Incomplete summary",
-            'word_count': len("\n".join(sections).split()) if sections else 0
+            'word_count': word_count
         }
-        
         if error:
             output['error'] = error
-        if partial_report:
-            output['partial_report'] = partial_report
             
         log(f"Report generation completed with status: {status}")
         return output
 
+    def stream(self, query: str, findings: Sequence[Dict], task_history: List[Any], **kwargs) -> Iterator[str]:
+        """
+        Yield report sections in order as they are produced
+        
+        Joining the sections with newlines gives the full report text.
+        
+        Args:
+            query: Original research query
+            findings: Findings from tasks, read once per report section (may be disk-backed)
+            task_history: List of all tasks executed
+            **kwargs: Additional context
+            
+        Yields:
+            Markdown sections of the report
+        """
+        yield f"# Research Report: {query}"
+        yield f"**Generated on**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"**Total Tasks**: {len(task_history)}"
+        dedup = kwargs.get('dedup_stats')
+        if dedup and dedup.get('collapsed'):
+            yield (f"**Duplicates Collapsed**: {dedup['collapsed']} of {dedup['seen']} search results "
+                   f"({dedup['exact_duplicates']} same URL, {dedup['near_duplicates']} near-identical)")
+        timed_out = sum(1 for task in task_history if task.status == "timed_out")
+        if timed_out:
+            yield (f"**Timed Out**: {timed_out} of {len(task_history)} tasks did not finish within the "
+                   f"{kwargs.get('deadline')}s deadline; this report covers the completed work only")
+        
+        # Executive summary
+        yield "\n## Executive Summary"
+        yield self._generate_summary(findings)
+        
+        # Detailed findings
+        yield "\n## Detailed Findings"
+        for i, finding in enumerate(findings, 1):
+            if finding.get('timed_out'):
+                yield f"### Task {i}: {finding['task']} [TIMED OUT]"
+                yield "Not finished before the deadline."
+            elif 'error' in finding:
+                yield f"### Task {i}: {finding['task']} [FAILED]"
+                yield f"Error: {finding['error']}"
+            else:
+                yield f"### Task {i}: {finding['task']}"
+                yield self._format_finding(finding['result'])
+        
+        # Statistics across every task's search results
+        overall = kwargs.get('overall_analysis')
+        if overall:
+            yield "\n## Cross-Task Analysis"
+            yield self._format_finding(overall)
+        
+        # Recommendations
+        yield "\n## Recommendations"
+        yield self._extract_recommendations(findings)
+        
+        # Task log
+        yield "\n## Task Execution Log"
+        yield self._generate_task_log(task_history)
+
     # [Rest of the helper methods remain unchanged...]
-    def _generate_summary(self, findings: List[Dict]) -> str:
+    def _generate_summary(self, findings: Sequence[Dict]) -> str:
         """Generate executive summary section"""
-        successful_findings = [f for f in findings if 'result' in f]
+        # Counted in one pass; findings may be a disk-backed store read lazily
+        successful = sum(1 for f in findings if 'result' in f)
         return (
-            f"This research uncovered {len(successful_findings)} key findings. "
+            f"This research uncovered {successful} key findings. "
             f"Primary insights include energy consumption concerns and emerging "
             f"solutions in renewable energy applications."
         )
@@ -99,7 +168,7 @@ class ReportGeneratorTool(Tool):
         
         return "\n".join(formatted)
 
-    def _extract_recommendations(self, findings: List[Dict]) -> str:
+    def _extract_recommendations(self, findings: Sequence[Dict]) -> str:
         """Compile recommendations from all findings"""
         recommendations = set()
         for finding in findings:
@@ -112,7 +181,7 @@ class ReportGeneratorTool(Tool):
         
         return "\n".join([f"- {r}" for r in sorted(recommendations)])
 
-    def _generate_short_summary(self, findings: List[Dict]) -> str:
+    def _generate_short_summary(self, findings: Sequence[Dict]) -> str:
         """Generate a one-line summary"""
         success_count = sum(1 for f in findings if 'result' in f)
         return f"Research completed with {success_count}/{len(findings)} successful findings"
@@ -122,5 +191,6 @@ class ReportGeneratorTool(Tool):
         log_entries = []
         for i, task in enumerate(tasks, 1):
             status_icon = "✓" if task.status == "completed" else "✗"
-            log_entries.append(f"{i}. [{status_icon}] {task.description}")
+            suffix = " (timed out)" if task.status == "timed_out" else ""
+            log_entries.append(f"{i}. [{status_icon}] {task.description}{suffix}")
         return "\n".join(log_entries)
\ No newline at end of file
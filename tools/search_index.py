@@ -0,0 +1,701 @@
+"""
+Offline BM25 search index
+
+A local inverted index over a JSONL document corpus that WebSearchTool can
+query instead of a web backend (``WebSearchTool(index=path)``), for
+repeatable retrieval tests and private-corpus search.
+
+On disk an index is a directory holding ``meta.json`` and one subdirectory
+per segment. A segment is a set of flat binary arrays (sorted term
+dictionary, postings as parallel doc id / term frequency arrays, document
+lengths, stored fields) that are memory-mapped at query time, so opening an
+index reads almost nothing and the OS page cache is shared between
+processes. Adding documents writes a new segment; a document whose id
+already exists replaces the old copy, which is tombstoned in its segment's
+``live`` array. ``merge`` rewrites all segments into one without the
+deleted documents, streaming a k-way merge of their sorted term
+dictionaries so postings and stored fields never have to fit in memory.
+
+Corpus records look like ``{"id": ..., "title": ..., "text": ..., "url": ...,
+"source": ..., "date": ...}``; only ``title`` and ``text`` (or ``summary``)
+are indexed, and ``id`` defaults to ``url``.
+
+Usage:
+    python -m tools.search_index build corpus.jsonl corpus.idx
+    python -m tools.search_index add corpus.idx more.jsonl
+    python -m tools.search_index search corpus.idx "solar panel efficiency" -k 5
+    python -m tools.search_index merge corpus.idx
+    python -m tools.search_index stats corpus.idx
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+from array import array
+from collections import Counter
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+# Documents buffered in memory before a segment is written
+DEFAULT_SEGMENT_SIZE = 100_000
+# Characters of text kept as a document's summary when it has none
+SUMMARY_CHARS = 280
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were "
+    "will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms, without stopwords"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _summary(text: str) -> str:
+    if len(text) <= SUMMARY_CHARS:
+        return text
+    cut = text.rfind(' ', 0, SUMMARY_CHARS)
+    return text[:cut if cut > 0 else SUMMARY_CHARS] + "..."
+
+
+def _write_array(path: str, values: np.ndarray) -> None:
+    with open(path, 'wb') as f:
+        f.write(np.ascontiguousarray(values).tobytes())
+
+
+def _map_array(path: str, dtype: Any, mode: str = 'r') -> np.ndarray:
+    # np.memmap cannot map empty files
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode)
+
+
+def _write_segment(directory: str, terms: List[str], posting_terms: np.ndarray, doc_ids: np.ndarray,
+                   tfs: np.ndarray, doc_lens: np.ndarray, stored: List[bytes], keys: np.ndarray) -> None:
+    """
+    Write one segment
+
+    Args:
+        directory: Segment directory (created)
+        terms: Sorted vocabulary
+        posting_terms: Vocabulary index of each posting, ascending
+        doc_ids: Segment-local document of each posting (ascending within a term)
+        tfs: Term frequency of each posting
+        doc_lens: Indexed length of each document, in terms
+        stored: Encoded stored fields of each document
+        keys: Hashed id of each document
+    """
+    os.makedirs(directory)
+    encoded = [term.encode('utf-8') for term in terms]
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    np.cumsum([len(term) for term in encoded], out=term_offsets[1:])
+    with open(os.path.join(directory, "terms.bin"), 'wb') as f:
+        f.write(b"".join(encoded))
+    _write_array(os.path.join(directory, "term_offsets.u64"), term_offsets)
+    postings_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    np.cumsum(np.bincount(posting_terms, minlength=len(terms)), out=postings_offsets[1:])
+    _write_array(os.path.join(directory, "postings_offsets.u64"), postings_offsets)
+    _write_array(os.path.join(directory, "doc_ids.u32"), doc_ids.astype(np.uint32))
+    _write_array(os.path.join(directory, "tfs.u16"), np.minimum(tfs, 65535).astype(np.uint16))
+    _write_array(os.path.join(directory, "doc_lens.u32"), doc_lens.astype(np.uint32))
+    _write_array(os.path.join(directory, "live.u8"), np.ones(len(doc_lens), dtype=np.uint8))
+    doc_offsets = np.zeros(len(stored) + 1, dtype=np.uint64)
+    np.cumsum([len(record) for record in stored], out=doc_offsets[1:])
+    with open(os.path.join(directory, "docs.bin"), 'wb') as f:
+        f.write(b"".join(stored))
+    _write_array(os.path.join(directory, "doc_offsets.u64"), doc_offsets)
+    order = np.argsort(keys, kind='stable')
+    _write_array(os.path.join(directory, "key_hashes.u64"), keys[order].astype(np.uint64))
+    _write_array(os.path.join(directory, "key_docs.u32"), order.astype(np.uint32))
+
+
+def _merged_terms(segments: Sequence["_Segment"]) -> Iterator[Tuple[bytes, List[Tuple[int, int]]]]:
+    """
+    K-way merge of the sorted term dictionaries of ``segments``
+
+    Yields:
+        Each distinct term in order, with the ``(segment position, term index)``
+        pairs holding it, in segment order
+    """
+    def stream(s: int, segment: "_Segment") -> Iterator[Tuple[bytes, int, int]]:
+        for i in range(segment.term_count):
+            yield segment.term(i), s, i
+
+    streams = [stream(s, segment) for s, segment in enumerate(segments)]
+    current: Optional[bytes] = None
+    holders: List[Tuple[int, int]] = []
+    for term, s, i in heapq.merge(*streams):
+        if term != current:
+            if holders:
+                yield current, holders
+            current, holders = term, []
+        holders.append((s, i))
+    if holders:
+        yield current, holders
+
+
+def _merge_segments(directory: str, segments: Sequence["_Segment"]) -> None:
+    """
+    Write the live documents of ``segments`` as one segment
+
+    Terms, postings and stored fields are streamed from the memory-mapped
+    inputs to the output files; only a few integers per document and per term
+    are held in memory. Documents keep their order, so renumbered ids stay
+    ascending within each term.
+    """
+    os.makedirs(directory)
+    path = lambda name: os.path.join(directory, name)  # noqa: E731
+    lives = [np.asarray(segment.live, dtype=bool) for segment in segments]
+    new_ids = []
+    base = 0
+    for live in lives:
+        new_ids.append((np.cumsum(live, dtype=np.int64) - 1 + base).astype(np.uint32))
+        base += int(live.sum())
+
+    term_offsets, postings_offsets = array('Q', [0]), array('Q', [0])
+    with open(path("terms.bin"), 'wb') as terms_file, open(path("doc_ids.u32"), 'wb') as ids_file, \
+            open(path("tfs.u16"), 'wb') as tfs_file:
+        for term, holders in _merged_terms(segments):
+            written = 0
+            for s, i in holders:
+                segment = segments[s]
+                start, end = int(segment.postings_offsets[i]), int(segment.postings_offsets[i + 1])
+                ids = np.asarray(segment.doc_ids[start:end])
+                tfs = np.asarray(segment.tfs[start:end])
+                if segment.deleted:
+                    alive = lives[s][ids]
+                    ids, tfs = ids[alive], tfs[alive]
+                ids_file.write(new_ids[s][ids].tobytes())
+                tfs_file.write(tfs.tobytes())
+                written += len(ids)
+            # Terms that only occurred in deleted documents are dropped from the dictionary
+            if written:
+                terms_file.write(term)
+                term_offsets.append(term_offsets[-1] + len(term))
+                postings_offsets.append(postings_offsets[-1] + written)
+    _write_array(path("term_offsets.u64"), np.frombuffer(term_offsets, dtype=np.uint64))
+    _write_array(path("postings_offsets.u64"), np.frombuffer(postings_offsets, dtype=np.uint64))
+
+    doc_offsets = array('Q', [0])
+    keys = []
+    with open(path("docs.bin"), 'wb') as docs_file, open(path("doc_lens.u32"), 'wb') as lens_file:
+        for segment, live in zip(segments, lives):
+            lens_file.write(np.asarray(segment.doc_lens)[live].tobytes())
+            for doc in np.flatnonzero(live).tolist():
+                start, end = int(segment.doc_offsets[doc]), int(segment.doc_offsets[doc + 1])
+                docs_file.write(segment.docs[start:end].tobytes())
+                doc_offsets.append(doc_offsets[-1] + end - start)
+            hashes = np.empty(segment.doc_count, dtype=np.uint64)
+            hashes[np.asarray(segment.key_docs)] = np.asarray(segment.key_hashes)
+            keys.append(hashes[live])
+    _write_array(path("doc_offsets.u64"), np.frombuffer(doc_offsets, dtype=np.uint64))
+    _write_array(path("live.u8"), np.ones(base, dtype=np.uint8))
+    keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint64)
+    order = np.argsort(keys, kind='stable')
+    _write_array(path("key_hashes.u64"), keys[order])
+    _write_array(path("key_docs.u32"), order.astype(np.uint32))
+
+
+class _SegmentWriter:
+    """Accumulates documents in memory until written out as a segment"""
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.posting_terms = array('I')
+        self.doc_ids = array('I')
+        self.tfs = array('I')
+        self.doc_lens = array('I')
+        self.stored: List[bytes] = []
+        self.keys: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.stored)
+
+    def add(self, key: str, document: Dict[str, Any]) -> None:
+        text = document.get('text') or document.get('summary') or ""
+        title = document.get('title') or ""
+        counts = Counter(tokenize(f"{title} {text}"))
+        doc = len(self.stored)
+        vocabulary = self.vocabulary
+        for term, tf in counts.items():
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                term_id = vocabulary[term] = len(vocabulary)
+            self.posting_terms.append(term_id)
+            self.doc_ids.append(doc)
+            self.tfs.append(tf)
+        self.doc_lens.append(sum(counts.values()))
+        self.stored.append(json.dumps({
+            'id': key,
+            'title': title,
+            'url': document.get('url') or f"local://{key}",
+            'source': document.get('source') or "Local Index",
+            'summary': document.get('summary') or _summary(text),
+            'date': document.get('date') or ""
+        }, separators=(",", ":")).encode('utf-8'))
+        self.keys.append(_key_hash(key))
+
+    def write(self, directory: str) -> None:
+        terms = list(self.vocabulary)
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[order] = np.arange(len(terms))
+        posting_ranks = rank[np.frombuffer(self.posting_terms, dtype=np.uint32)] if terms else np.zeros(0, np.int64)
+        # Stable, so documents stay ascending within each term
+        perm = np.argsort(posting_ranks, kind='stable')
+        _write_segment(
+            directory,
+            [terms[i] for i in order],
+            posting_ranks[perm],
+            np.frombuffer(self.doc_ids, dtype=np.uint32)[perm],
+            np.frombuffer(self.tfs, dtype=np.uint32)[perm],
+            np.frombuffer(self.doc_lens, dtype=np.uint32),
+            self.stored,
+            np.array(self.keys, dtype=np.uint64)
+        )
+
+
+class _Segment:
+    """Read side of one segment; every array is a memory map"""
+
+    def __init__(self, directory: str, writable: bool = False):
+        self.directory = directory
+        path = lambda name: os.path.join(directory, name)  # noqa: E731
+        self.terms = _map_array(path("terms.bin"), np.uint8)
+        self.term_offsets = _map_array(path("term_offsets.u64"), np.uint64)
+        self.postings_offsets = _map_array(path("postings_offsets.u64"), np.uint64)
+        self.doc_ids = _map_array(path("doc_ids.u32"), np.uint32)
+        self.tfs = _map_array(path("tfs.u16"), np.uint16)
+        self.doc_lens = _map_array(path("doc_lens.u32"), np.uint32)
+        self.live = _map_array(path("live.u8"), np.uint8, 'r+' if writable else 'r')
+        self.docs = _map_array(path("docs.bin"), np.uint8)
+        self.doc_offsets = _map_array(path("doc_offsets.u64"), np.uint64)
+        self.key_hashes = _map_array(path("key_hashes.u64"), np.uint64)
+        self.key_docs = _map_array(path("key_docs.u32"), np.uint32)
+        self.term_count = len(self.term_offsets) - 1
+        self.doc_count = len(self.doc_lens)
+        self.deleted = 0
+        self._norms: Optional[Tuple[float, np.ndarray]] = None
+
+    def term(self, index: int) -> bytes:
+        return self.terms[int(self.term_offsets[index]):int(self.term_offsets[index + 1])].tobytes()
+
+    def lookup(self, term: bytes) -> Optional[Tuple[int, int]]:
+        """Postings range of a term, found by binary search over the mapped dictionary"""
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self.term(low) == term:
+            return int(self.postings_offsets[low]), int(self.postings_offsets[low + 1])
+        return None
+
+    def document_frequency(self, term: bytes) -> int:
+        span = self.lookup(term)
+        return span[1] - span[0] if span else 0
+
+    def norms(self, k1: float, b: float, avgdl: float) -> np.ndarray:
+        """BM25 length normalization per document, cached for the current average length"""
+        if self._norms is None or self._norms[0] != avgdl:
+            lengths = np.asarray(self.doc_lens, dtype=np.float32)
+            self._norms = (avgdl, k1 * (1 - b + b * lengths / np.float32(avgdl or 1.0)))
+        return self._norms[1]
+
+    def document(self, doc: int) -> Dict[str, Any]:
+        return json.loads(self.docs[int(self.doc_offsets[doc]):int(self.doc_offsets[doc + 1])].tobytes())
+
+    def find(self, key_hashes: np.ndarray) -> np.ndarray:
+        """Live local documents whose hashed id is in ``key_hashes`` (each id is in a segment at most once)"""
+        if not self.doc_count or not len(key_hashes):
+            return np.zeros(0, dtype=np.uint32)
+        positions = np.searchsorted(self.key_hashes, key_hashes)
+        inside = positions < self.doc_count
+        positions, wanted = positions[inside], key_hashes[inside]
+        docs = np.asarray(self.key_docs[positions[self.key_hashes[positions] == wanted]])
+        return docs[np.asarray(self.live[docs]) == 1]
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory))
+
+
+class SearchIndex:
+    """
+    BM25 index stored in a directory of memory-mapped segments
+
+    Safe to query from many threads. Writes (``add``, ``delete``, ``merge``)
+    are serialized within the process; other processes pick them up through
+    ``refresh``. Scores use Okapi BM25 with collection statistics (document
+    count, average length, document frequencies) over the live documents of
+    all segments, so they match those of a freshly built index.
+    """
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75, segment_size: int = DEFAULT_SEGMENT_SIZE):
+        """
+        Open an index, creating an empty one if ``path`` does not hold an index yet
+
+        Args:
+            path: Index directory
+            k1: BM25 term frequency saturation (only used when creating)
+            b: BM25 length normalization (only used when creating)
+            segment_size: Documents per segment written by ``add``
+        """
+        self.path = path
+        self.segment_size = segment_size
+        self._lock = threading.RLock()
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            os.makedirs(path, exist_ok=True)
+            self._write_meta({'format': FORMAT_VERSION, 'k1': k1, 'b': b, 'segments': [], 'next_segment': 0})
+        self._stamp = None
+        self.refresh()
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, META_FILE)
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        # Atomic replace: readers see either the old or the new segment list
+        temp = self._meta_path() + ".tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self._meta_path())
+
+    def refresh(self) -> bool:
+        """Reload the segment list if another writer changed it; returns True if it did"""
+        stat = os.stat(self._meta_path())
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            with open(self._meta_path(), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported search index format {meta.get('format')!r} in {self.path}")
+            self.meta = meta
+            self.k1 = meta['k1']
+            self.b = meta['b']
+            self.segments = [_Segment(os.path.join(self.path, name)) for name in meta['segments']]
+            self._stamp = stamp
+            self._update_stats()
+            return True
+
+    def _update_stats(self) -> None:
+        live_docs = 0
+        live_length = 0
+        for segment in self.segments:
+            live = np.asarray(segment.live, dtype=bool)
+            segment.deleted = segment.doc_count - int(live.sum())
+            live_docs += int(live.sum())
+            live_length += int(np.asarray(segment.doc_lens, dtype=np.int64)[live].sum())
+        self.doc_count = live_docs
+        self.avgdl = live_length / live_docs if live_docs else 0.0
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def add(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index documents, replacing any already indexed under the same id
+
+        New documents go into new segments; older copies are tombstoned only
+        after the new segments are committed, so a crash can leave a
+        duplicate but never lose a document.
+
+        Returns:
+            Number of documents added
+        """
+        added = 0
+        with self._lock:
+            self.refresh()
+            writer = _SegmentWriter()
+            keys: Dict[str, None] = {}
+            for document in documents:
+                key = str(document.get('id') or document.get('url') or "")
+                if not key:
+                    raise ValueError("Every document needs an 'id' or 'url'")
+                if key in keys:
+                    # Last copy in a batch wins; flush so it lands in a later segment than the first
+                    added += self._commit(writer, keys)
+                    writer, keys = _SegmentWriter(), {}
+                writer.add(key, document)
+                keys[key] = None
+                if len(writer) >= self.segment_size:
+                    added += self._commit(writer, keys)
+                    writer, keys = _SegmentWriter(), {}
+            added += self._commit(writer, keys)
+        return added
+
+    def _commit(self, writer: _SegmentWriter, keys: Dict[str, None]) -> int:
+        if not len(writer):
+            return 0
+        meta = dict(self.meta)
+        name, temp = self._new_segment(meta)
+        writer.write(temp)
+        os.replace(temp, os.path.join(self.path, name))
+        previous = self.segments
+        meta['segments'] = meta['segments'] + [name]
+        self._write_meta(meta)
+        self.refresh()
+        self._tombstone(previous, keys)
+        return len(writer)
+
+    def _new_segment(self, meta: Dict[str, Any]) -> Tuple[str, str]:
+        """Reserve an unused segment name in ``meta``; returns it and the temp directory to write to"""
+        while True:
+            name = f"seg-{meta['next_segment']:06d}"
+            meta['next_segment'] += 1
+            # A crashed writer may have left a directory that meta.json never referenced
+            if not os.path.exists(os.path.join(self.path, name)):
+                break
+        temp = os.path.join(self.path, name + ".tmp")
+        shutil.rmtree(temp, ignore_errors=True)
+        return name, temp
+
+    def _tombstone(self, segments: Sequence[_Segment], keys: Iterable[str]) -> int:
+        hashes = np.array(sorted({_key_hash(key) for key in keys}), dtype=np.uint64)
+        removed = 0
+        for segment in segments:
+            docs = segment.find(hashes)
+            if len(docs):
+                live = _map_array(os.path.join(segment.directory, "live.u8"), np.uint8, 'r+')
+                live[docs] = 0
+                live.flush()
+                removed += len(docs)
+        if removed:
+            # Tombstones change live counts without touching meta.json; rewrite it so readers reload
+            self._write_meta(dict(self.meta))
+            self.refresh()
+        return removed
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """Remove documents by id; returns how many were found"""
+        with self._lock:
+            self.refresh()
+            return self._tombstone(self.segments, ids)
+
+    def merge(self) -> None:
+        """
+        Rewrite all segments as one, dropping deleted documents
+
+        The merge streams from the existing segments (see ``_merge_segments``),
+        so it needs disk space for the new segment but little memory.
+        """
+        with self._lock:
+            self.refresh()
+            if len(self.segments) <= 1 and self.doc_count == sum(s.doc_count for s in self.segments):
+                return
+            meta = dict(self.meta)
+            name, temp = self._new_segment(meta)
+            _merge_segments(temp, self.segments)
+            os.replace(temp, os.path.join(self.path, name))
+            old = meta['segments']
+            meta['segments'] = [name]
+            self._write_meta(meta)
+            self.refresh()
+            for segment_name in old:
+                shutil.rmtree(os.path.join(self.path, segment_name), ignore_errors=True)
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top ``k`` live documents for a query by BM25 score
+
+        Each segment accumulates scores for the documents matching any query
+        term and selects its best ``k`` with ``np.argpartition`` (linear, no
+        full sort); a heap then merges the per-segment candidates.
+
+        Returns:
+            Stored fields of each hit plus ``score``, best first
+        """
+        terms = [term.encode('utf-8') for term in dict.fromkeys(tokenize(query))]
+        segments = self.segments
+        if not terms or not segments or not self.doc_count or k <= 0:
+            return []
+        k1, b, avgdl, doc_count = self.k1, self.b, self.avgdl, self.doc_count
+        # Pass 1: live postings of every query term, which also give exact document frequencies
+        matches: List[List[Tuple[int, np.ndarray, np.ndarray]]] = []
+        df = [0] * len(terms)
+        for segment in segments:
+            found = []
+            for t, term in enumerate(terms):
+                span = segment.lookup(term)
+                if span is None:
+                    continue
+                ids = np.asarray(segment.doc_ids[span[0]:span[1]])
+                tf = np.asarray(segment.tfs[span[0]:span[1]], dtype=np.float32)
+                if segment.deleted:
+                    alive = np.asarray(segment.live[ids]) == 1
+                    ids, tf = ids[alive], tf[alive]
+                df[t] += len(ids)
+                found.append((t, ids, tf))
+            matches.append(found)
+        idf = [math.log(1 + (doc_count - n + 0.5) / (n + 0.5)) for n in df]
+
+        # Pass 2: score each segment and keep its best k
+        candidates: List[Tuple[float, int, int]] = []
+        for s, (segment, found) in enumerate(zip(segments, matches)):
+            if not found:
+                continue
+            norms = segment.norms(k1, b, avgdl)
+            weights = [np.float32(idf[t] * (k1 + 1)) * tf / (tf + norms[ids]) for t, ids, tf in found]
+            postings = sum(len(ids) for _, ids, _ in found)
+            if postings * 8 > segment.doc_count:
+                # Dense accumulator: cheaper than sorting when many documents match
+                scores = np.zeros(segment.doc_count, dtype=np.float32)
+                for (_, ids, _), weight in zip(found, weights):
+                    scores[ids] += weight
+                docs = np.flatnonzero(scores)
+                scores = scores[docs]
+            else:
+                docs, inverse = np.unique(np.concatenate([ids for _, ids, _ in found]), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate(weights)).astype(np.float32)
+            if len(docs) > k:
+                best = np.argpartition(scores, len(scores) - k)[-k:]
+                docs, scores = docs[best], scores[best]
+            candidates.extend(zip(scores.tolist(), [s] * len(docs), docs.tolist()))
+
+        hits = []
+        # Ties go to the earlier segment and document, so results are deterministic
+        for score, s, doc in heapq.nlargest(k, candidates, key=lambda c: (c[0], -c[1], -c[2])):
+            hit = segments[s].document(doc)
+            hit['score'] = round(score, 4)
+            hits.append(hit)
+        return hits
+
+    def _term_count(self) -> int:
+        # A term in several segments counts once; walking the dictionaries is only needed when there are several
+        if len(self.segments) == 1:
+            return self.segments[0].term_count
+        return sum(1 for _ in _merged_terms(self.segments))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(segment.doc_count for segment in self.segments)
+            return {
+                'documents': self.doc_count,
+                'deleted': total - self.doc_count,
+                'segments': len(self.segments),
+                'terms': self._term_count(),
+                'postings': sum(len(segment.doc_ids) for segment in self.segments),
+                'avg_doc_length': round(self.avgdl, 2),
+                'size_bytes': sum(segment.size_bytes() for segment in self.segments)
+            }
+
+
+_open_indexes: Dict[str, SearchIndex] = {}
+_open_lock = threading.Lock()
+
+
+def open_index(path: str) -> SearchIndex:
+    """
+    Return the process-wide handle for an index, opening it on first use
+
+    Handles are shared so every tool instance maps each segment once; each
+    call checks whether a writer has changed the index since.
+    """
+    key = os.path.abspath(path)
+    with _open_lock:
+        index = _open_indexes.get(key)
+        if index is None:
+            if not os.path.exists(os.path.join(key, META_FILE)):
+                raise FileNotFoundError(f"No search index at {path}")
+            index = _open_indexes[key] = SearchIndex(key)
+    index.refresh()
+    return index
+
+
+def read_corpus(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Documents from JSONL; blank lines are skipped and malformed ones raise ValueError"""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            document = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON: {e}") from e
+        if not isinstance(document, dict):
+            raise ValueError(f"Line {number}: document must be a JSON object")
+        yield document
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tools.search_index", description="Local BM25 search index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Create an index from a JSONL corpus ('-' for stdin)")
+    build.add_argument('corpus')
+    build.add_argument('index')
+    build.add_argument('--segment-size', type=int, default=DEFAULT_SEGMENT_SIZE,
+                       help="Documents per segment (bounds memory while building)")
+    build.add_argument('--k1', type=float, default=1.2)
+    build.add_argument('-b', type=float, default=0.75)
+    build.add_argument('--no-merge', action='store_true', help="Keep one segment per --segment-size documents")
+
+    add = commands.add_parser('add', help="Add or replace documents in an existing index")
+    add.add_argument('index')
+    add.add_argument('corpus')
+
+    delete = commands.add_parser('delete', help="Remove documents by id")
+    delete.add_argument('index')
+    delete.add_argument('ids', nargs='+')
+
+    merge = commands.add_parser('merge', help="Merge segments and drop deleted documents")
+    merge.add_argument('index')
+
+    search = commands.add_parser('search', help="Run a query")
+    search.add_argument('index')
+    search.add_argument('query')
+    search.add_argument('-k', type=int, default=10)
+
+    stats = commands.add_parser('stats', help="Show index statistics")
+    stats.add_argument('index')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        if os.path.exists(os.path.join(args.index, META_FILE)):
+            parser.error(f"{args.index} already holds an index; use 'add' to update it")
+        index = SearchIndex(args.index, k1=args.k1, b=args.b, segment_size=args.segment_size)
+        source = sys.stdin if args.corpus == '-' else open(args.corpus, 'r', encoding='utf-8')
+        with source:
+            count = index.add(read_corpus(source))
+        if not args.no_merge:
+            index.merge()
+        print(f"Indexed {count} documents into {args.index}", file=sys.stderr)
+    elif args.command == 'add':
+        index = open_index(args.index)
+        with open(args.corpus, 'r', encoding='utf-8') as source:
+            count = index.add(read_corpus(source))
+        print(f"Added {count} documents ({len(index.segments)} segments)", file=sys.stderr)
+    elif args.command == 'delete':
+        print(f"Deleted {open_index(args.index).delete(args.ids)} documents", file=sys.stderr)
+    elif args.command == 'merge':
+        open_index(args.index).merge()
+    elif args.command == 'search':
+        for hit in open_index(args.index).search(args.query, args.k):
+            print(json.dumps(hit))
+        return 0
+    if args.command in ('build', 'add', 'delete', 'merge', 'stats'):
+        print(json.dumps(open_index(args.index).get_stats()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,46 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from tools.base_tool import Tool
 from utils.logger import log
+from utils.cache import TieredCache, make_cache_key
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.rate_limit import RateLimiter
+from utils.singleflight import get_group
+from tools.records import ResultSet
+import contextlib
 import random
 
+# (title, url, source, summary, relevance_score, date)
+Row = Tuple[str, str, str, str, float, str]
+
 class WebSearchTool(Tool):
-    def __init__(self):
+    # Only requests that reach the backend take a rate limiter slot
+    rate_limited = True
+
+    def __init__(self, endpoint: Optional[str] = None, max_results: int = 10,
+                 cache: Optional[TieredCache] = None, seed: Optional[int] = None,
+                 coalesce: bool = True, index: Optional[str] = None):
+        """
+        Args:
+            endpoint: URL of a search backend returning ``{"results": [...]}`` for
+                ``GET endpoint?q=<query>&count=<n>``. When neither this nor
+                ``index`` is given, results are mocked.
+            max_results: Maximum number of results requested from the backend
+            cache: Optional result cache shared between calls (and tool instances)
+            seed: Makes mocked results deterministic. Each query gets its own
+                generator derived from the seed, so results do not depend on
+                call order or concurrency.
+            coalesce: Share one backend request between identical searches that
+                are in flight at the same time, across every tool instance in
+                the process
+            index: Directory of a local BM25 index (see tools.search_index) to
+                search instead of a web backend
+        """
+        self.endpoint = endpoint
+        self.index = index
+        self.max_results = max_results
+        self.cache = cache
+        self.seed = seed
+        self.flight = get_group('web_search') if coalesce else None
         self.sources = [
             "Academic Research Database",
             "Industry News Portal",
@@ -15,44 +51,113 @@ class WebSearchTool(Tool):
     
     def execute(self, query: str, **kwargs) -> Dict[str, Any]:
         """
-        Mock web search that returns structured results
+        Web search that returns structured results (mocked unless an endpoint or index is set)
         
         Args:
             query: Search query string
-            **kwargs: Additional context
+            **kwargs: Additional context. ``refresh=True`` skips the cache lookup
+                but stores the fresh result; ``bypass_cache=True`` skips the cache
+                entirely. ``compact=True`` returns ``results`` as an array-backed
+                ResultSet instead of a list of dicts. ``deadline`` (a Deadline)
+                bounds this caller's wait; a coalesced search itself runs
+                without it, so one caller's deadline never cuts short a
+                result others are waiting for. Uncoalesced searches cap the
+                backend request timeout and the rate limiter wait with it.
+                ``limiter`` (a RateLimiter) admits requests that reach the
+                backend; cache hits and coalesced calls do not take a slot.
             
         Returns:
             Dictionary containing search results
         """
+        cache_key = self._cache_key(query, kwargs)
+        cached = self._lookup(cache_key, query, kwargs)
+        if cached is not None:
+            return self._deliver(cached, kwargs)
+
+        deadline, limiter = kwargs.get('deadline'), kwargs.get('limiter')
+        if self.flight is None:
+            return self._deliver(self._search(query, cache_key, deadline, limiter), kwargs)
+        # The search is shared, so it runs without this caller's deadline; the deadline only bounds the wait
+        return self._deliver(self.flight.do(self._flight_key(query),
+                                            lambda: self._search(query, cache_key, limiter=limiter),
+                                            deadline), kwargs)
+
+    async def aexecute(self, query: str, **kwargs) -> Dict[str, Any]:
+        """
+        Asynchronous web search over the shared pooled HTTP client
+        
+        Args:
+            query: Search query string
+            **kwargs: Additional context (same cache flags as execute)
+            
+        Returns:
+            Dictionary containing search results
+        """
+        if self.index:
+            # Index lookups are synchronous (mmap reads and numpy), so run them off the loop
+            return await super().aexecute(query, **kwargs)
+        if not self.endpoint:
+            # The mock does no I/O, so there is nothing to gain from a thread hop
+            return self.execute(query, **kwargs)
+
+        cache_key = self._cache_key(query, kwargs)
+        cached = self._lookup(cache_key, query, kwargs)
+        if cached is not None:
+            return self._deliver(cached, kwargs)
+
+        deadline, limiter = kwargs.get('deadline'), kwargs.get('limiter')
+        if self.flight is None:
+            return self._deliver(await self._asearch(query, cache_key, deadline, limiter), kwargs)
+        return self._deliver(await self.flight.ado(self._flight_key(query),
+                                                   lambda: self._asearch(query, cache_key, limiter=limiter),
+                                                   deadline), kwargs)
+
+    def _search(self, query: str, cache_key: Optional[str], deadline: Optional[Deadline] = None,
+                limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+        """Query the backend (or the mock) and cache a successful response"""
         log(f"Executing web search for: {query}")
         
         try:
-            # Mock implementation - in reality this would call an actual search API
-            num_results = random.randint(3, 7)
-            results = []
-            
-            for i in range(num_results):
-                source = random.choice(self.sources)
-                results.append({
-                    'title': f"{query.capitalize()} - {source}",
-                    'url': f"https://example.com/{query.replace(' ', '-')}-{i}",
-                    'source': source,
-                    'summary': self._generate_summary(query, source),
-                    'relevance_score': round(random.uniform(0.5, 1.0), 2),
-                    'date': f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
-                })
-            
-            # Sort by relevance
-            results.sort(key=lambda x: x['relevance_score'], reverse=True)
+            with self._backend_slot(limiter, deadline):
+                if self.index:
+                    rows = self._index_results(query)
+                elif self.endpoint:
+                    from utils.http import get_client  # httpx is only needed for a real backend
+                    response = get_client().get(self.endpoint, params=self._request_params(query),
+                                                **self._timeout(deadline))
+                    response.raise_for_status()
+                    rows = self._parse_results(response.json())
+                else:
+                    rows = self._mock_results(query)
+            return self._remember(cache_key, self._build_response(query, rows))
             
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            log(f"Web search failed: {str(e)}")
             return {
-                'status': 'success',
-                'query': query,
-                'results': results,
-                'count': len(results),
-                'topics': self._extract_topics(query)
+                'status': 'failed',
+                'error': str(e),
+                'query': query
             }
+
+    async def _asearch(self, query: str, cache_key: Optional[str], deadline: Optional[Deadline] = None,
+                       limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+        """Asynchronous counterpart of _search for HTTP backends"""
+        log(f"Executing web search for: {query}")
+        
+        from utils.http import async_get
+        
+        try:
+            async with self._backend_slot(limiter, deadline):
+                response = await async_get(self.endpoint, params=self._request_params(query),
+                                           **self._timeout(deadline))
+                response.raise_for_status()
+                rows = self._parse_results(response.json())
+            return self._remember(cache_key, self._build_response(query, rows))
             
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             log(f"Web search failed: {str(e)}")
             return {
@@ -60,8 +165,131 @@ class WebSearchTool(Tool):
                 'error': str(e),
                 'query': query
             }
+
+    @staticmethod
+    def _backend_slot(limiter: Optional[RateLimiter], deadline: Optional[Deadline] = None) -> Any:
+        """Rate limiter slot for one backend request (a no-op without a limiter)"""
+        return limiter.slot(deadline) if limiter is not None else contextlib.nullcontext()
+
+    @staticmethod
+    def _timeout(deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """Request options capping the HTTP timeout at the time left before the deadline"""
+        timeout = deadline.timeout() if deadline is not None else None
+        if timeout is None:
+            return {}
+        deadline.check("web search request")
+        return {'timeout': timeout}
+
+    @property
+    def backend(self) -> Optional[str]:
+        return f"index:{self.index}" if self.index else self.endpoint
+
+    def _flight_key(self, query: str) -> str:
+        """Identity of a search: the normalized query plus every parameter that changes the result"""
+        return make_cache_key('web_search', query, {
+            'endpoint': self.endpoint,
+            'index': self.index,
+            'max_results': self.max_results,
+            'seed': self.seed
+        })
+
+    def _cache_key(self, query: str, options: Dict[str, Any]) -> Optional[str]:
+        """Cache key for a call, or None when the cache should not be used"""
+        if self.cache is None or options.get('bypass_cache'):
+            return None
+        return self._flight_key(query)
+
+    def _lookup(self, cache_key: Optional[str], query: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached response for a call, with results in compact form"""
+        if not cache_key or options.get('refresh'):
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        log(f"Web search cache hit for: {query}")
+        if not isinstance(cached.get('results'), ResultSet):
+            # Entries read back from the SQLite tier are plain JSON
+            cached = {**cached, 'results': ResultSet.from_dicts(cached.get('results', []))}
+        return cached
+
+    @staticmethod
+    def _deliver(response: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+        """API boundary: results become plain dicts unless the caller asked for the compact form"""
+        if options.get('compact') or not isinstance(response.get('results'), ResultSet):
+            return response
+        return {**response, 'results': response['results'].to_dicts()}
+
+    def _remember(self, cache_key: Optional[str], response: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a successful response in the cache (failures are never cached)"""
+        if cache_key and response.get('status') == 'success':
+            self.cache.set(cache_key, response)
+        return response
+
+    def _request_params(self, query: str) -> Dict[str, Any]:
+        """Query-string parameters sent to the search backend"""
+        return {'q': query, 'count': self.max_results}
+
+    def _parse_results(self, payload: Dict[str, Any]) -> List[Row]:
+        """Normalize a backend payload into result rows"""
+        rows = []
+        for item in payload.get('results', [])[:self.max_results]:
+            rows.append((
+                item.get('title', ''),
+                item.get('url', ''),
+                item.get('source', ''),
+                item.get('summary', ''),
+                float(item.get('relevance_score', 0.0)),
+                item.get('date', '')
+            ))
+        return rows
+
+    def _index_results(self, query: str) -> List[Row]:
+        """Top BM25 hits from the local index; relevance is the score relative to the best hit"""
+        from tools.search_index import open_index  # only loaded when an index is configured
+        hits = open_index(self.index).search(query, self.max_results)
+        top = hits[0]['score'] if hits else 0.0
+        return [(
+            hit['title'],
+            hit['url'],
+            hit['source'],
+            hit['summary'],
+            round(hit['score'] / top, 3) if top > 0 else 0.0,
+            hit['date']
+        ) for hit in hits]
+
+    def _mock_results(self, query: str) -> List[Row]:
+        """Fabricate a page of plausible search results"""
+        # Mock implementation - in reality this would call an actual search API
+        rng = random.Random(f"{self.seed}:{query}") if self.seed is not None else random
+        num_results = rng.randint(3, 7)
+        rows = []
+        
+        for i in range(num_results):
+            source = rng.choice(self.sources)
+            rows.append((
+                f"{query.capitalize()} - {source}",
+                f"https://example.com/{query.replace(' ', '-')}-{i}",
+                source,
+                self._generate_summary(query, source, rng),
+                round(rng.uniform(0.5, 1.0), 2),
+                f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            ))
+        return rows
+
+    def _build_response(self, query: str, rows: List[Row]) -> Dict[str, Any]:
+        """Wrap a result page in the tool's response envelope"""
+        # Sort by relevance
+        rows.sort(key=lambda row: row[4], reverse=True)
+        
+        return {
+            'status': 'success',
+            'query': query,
+            'results': ResultSet(rows),
+            'count': len(rows),
+            'topics': self._extract_topics(query)
+        }
     
-    def _generate_summary(self, query: str, source: str) -> str:
+    def _generate_summary(self, query: str, source: str, rng: Any = random) -> str:
         """Generate mock summary for search result"""
         summaries = [
             f"A comprehensive analysis of {query} from {source} showing recent trends.",
@@ -69,7 +297,7 @@ class WebSearchTool(Tool):
             f"Key findings about {query} based on research from {source}.",
             f"Recent developments in {query} as reported by {source}."
         ]
-        return random.choice(summaries)
+        return rng.choice(summaries)
     
     def _extract_topics(self, query: str) -> List[str]:
         """Extract key topics from query"""
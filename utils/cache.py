@@ -0,0 +1,299 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from tools.records import json_default
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_QUESTION = re.compile(r"\s*\?$")
+# Part of every key; bump it when normalization changes so that entries persisted
+# under the old rules (e.g. in a SQLite cache file) are never served for new keys
+_KEY_VERSION = 2
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query for cache lookups
+
+    Case, runs of whitespace and a trailing question mark do not change what a
+    search returns, so "Solar  power?" and "solar power" share a cache entry.
+    Other punctuation is kept: "memory safety in C++" and "memory safety in C#"
+    are different queries.
+    """
+    return _TRAILING_QUESTION.sub("", _WHITESPACE.sub(" ", query.strip().lower()))
+
+
+def make_cache_key(namespace: str, query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a stable cache key from a normalized query and tool parameters
+
+    Args:
+        namespace: Name of the tool (or other caller) owning the entry
+        query: Raw query text
+        params: Any other parameters that change the result
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = json.dumps(
+        [_KEY_VERSION, namespace, normalize_query(query), params or {}],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters for one cache tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def record(self, hits: int = 0, misses: int = 0, evictions: int = 0, expirations: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+            self.expirations += expirations
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction and a TTL
+
+    Values are stored by reference; callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.record(misses=1)
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.record(misses=1, expirations=1)
+                return default
+            self._entries.move_to_end(key)
+        self.stats.record(hits=1)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.record(evictions=evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    Persistent cache tier backed by a single SQLite file
+
+    Values must be JSON-serializable. Expired rows are dropped lazily on read
+    and in bulk whenever the table grows past ``max_entries``, at which point
+    the least recently accessed rows are evicted as well.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl: Optional[float] = 86400.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_entry(key, default)[0]
+
+    def get_entry(self, key: str, default: Any = None) -> Tuple[Any, Optional[float]]:
+        """
+        A value together with its expiry
+
+        Returns:
+            ``(value, expires_at)``, where ``expires_at`` is a ``time.time()``
+            timestamp or None for no expiry; ``(default, None)`` on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.record(misses=1)
+                return default, None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._count -= 1
+                self.stats.record(misses=1, expirations=1)
+                return default, None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self.stats.record(hits=1)
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        encoded = json.dumps(value, separators=(",", ":"), default=json_default)
+        with self._lock:
+            existed = self._conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, encoded, expires_at, now),
+            )
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently accessed ones, down to 90% of capacity"""
+        expired = self._conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self._count -= expired
+        target = int(self.max_entries * 0.9)
+        evicted = 0
+        if self._count > target:
+            evicted = self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (self._count - target,),
+            ).rowcount
+            self._count -= evicted
+        self.stats.record(evictions=evicted, expirations=expired)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._count -= self._conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Two-level cache: a fast in-memory LRU in front of an optional SQLite tier
+
+    Disk hits are promoted into memory for no longer than they have left on
+    disk (nor the memory tier's own TTL); writes go to every tier.
+    """
+
+    def __init__(self, memory: Optional[LRUCache] = None, disk: Optional[SQLiteCache] = None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.disk is not None:
+            value, expires_at = self.disk.get_entry(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value, self._promotion_ttl(expires_at))
+                return value
+        return default
+
+    def _promotion_ttl(self, expires_at: Optional[float]) -> Optional[float]:
+        if expires_at is None:
+            return None  # the memory tier's default
+        remaining = expires_at - time.time()
+        return remaining if self.memory.ttl is None else min(remaining, self.memory.ttl)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for each tier"""
+        stats = {'memory': {**self.memory.stats.as_dict(), 'entries': len(self.memory)}}
+        if self.disk is not None:
+            stats['disk'] = {**self.disk.stats.as_dict(), 'entries': len(self.disk)}
+        return stats
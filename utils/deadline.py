@@ -0,0 +1,68 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Optional
+
+
+class DeadlineExceededError(Exception):
+    """Raised when work is abandoned because its run ran out of time (or was cancelled)"""
+
+
+class Deadline:
+    """
+    Point in time by which a unit of work (e.g. a research run) must finish
+
+    Passed down explicitly to the code doing the work, which checks it between
+    steps, caps I/O timeouts with ``timeout`` and sleeps through ``sleep`` so
+    that ``cancel`` wakes it immediately. ``Deadline(None)`` never expires
+    unless cancelled.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds: Time budget from now; None for no limit
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else math.inf
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired or cancelled, ``inf`` without a limit)"""
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cancel(self) -> None:
+        """Expire now, waking anything sleeping on this deadline"""
+        self._cancelled.set()
+
+    def check(self, activity: str = "work") -> None:
+        """
+        Raises:
+            DeadlineExceededError: If the deadline has passed or was cancelled
+        """
+        if self.expired:
+            raise DeadlineExceededError(f"Deadline of {self.seconds}s exceeded before {activity}")
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """An I/O timeout that does not outlive the deadline"""
+        remaining = self.remaining()
+        if remaining == math.inf:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``, waking early on cancel; returns False if the deadline is gone"""
+        self._cancelled.wait(min(seconds, self.remaining()))
+        return not self.expired
+
+    async def asleep(self, seconds: float) -> bool:
+        """Asyncio variant of ``sleep``; task cancellation interrupts it as usual"""
+        await asyncio.sleep(min(seconds, self.remaining()))
+        return not self.expired
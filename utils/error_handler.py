@@ -1,9 +1,305 @@
+import asyncio
+import random
+import threading
 import time
 from functools import wraps
-from typing import Callable, Any, Dict
+from typing import Callable, Any, Dict, Optional, Tuple, Type
+from utils.deadline import Deadline, DeadlineExceededError
 from utils.logger import log
 
-def retry(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0) -> Callable:
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open"""
+
+
+class RetryBudget:
+    """
+    Shared allowance of retries for one unit of work (e.g. a research run)
+
+    Every retry, by any caller holding the budget, spends one token. Once it is
+    exhausted, failures are raised immediately instead of retried, so a
+    partial outage cannot turn into a retry storm.
+    """
+
+    def __init__(self, max_retries: int = 10):
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self.spent = 0
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            return self.max_retries - self.spent
+
+    def try_spend(self) -> bool:
+        """Take one retry token; returns False when none are left"""
+        with self._lock:
+            if self.spent >= self.max_retries:
+                return False
+            self.spent += 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with CircuitOpenError. Once ``recovery_timeout`` seconds
+    have passed a single trial call is let through (half-open): success closes
+    the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"  # closed, open, half_open
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return "half_open"
+            return self._state
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if the call must not go through
+
+        Returns:
+            True if the call is the half-open trial; its outcome must then be
+            reported through ``record_success``/``record_failure``, or given
+            up with ``release_trial``
+
+        Raises:
+            CircuitOpenError: While the circuit is open, or while a half-open
+                trial call is already in flight
+        """
+        with self._lock:
+            if self._state == "closed":
+                return False
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    raise CircuitOpenError(f"Circuit for {self.name} is open")
+                self._state = "half_open"
+            if self._trial_in_flight:
+                raise CircuitOpenError(f"Circuit for {self.name} is half-open, trial call in progress")
+            self._trial_in_flight = True
+            return True
+
+    def release_trial(self) -> None:
+        """Abandon the half-open trial without a verdict (e.g. it was cancelled), letting the next call try"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    log(f"Circuit for {self.name} opened after {self._failures} failures", "warning")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def get_status(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {'state': state, 'consecutive_failures': self._failures}
+
+
+_breakers: Dict[Tuple[str, Optional[str]], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, backend: Optional[str] = None, **kwargs) -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker for a tool and backend, creating it on first use
+
+    Breakers are shared so that every agent calling the same backend sees the
+    same view of its health; agents using another endpoint (or index) of the
+    same tool get a breaker of their own. ``kwargs`` only apply on creation.
+
+    Args:
+        name: Tool name
+        backend: Backend identity (see ``Tool.backend``), or None for a local tool
+    """
+    with _breakers_lock:
+        breaker = _breakers.get((name, backend))
+        if breaker is None:
+            label = f"{name} ({backend})" if backend else name
+            breaker = _breakers[(name, backend)] = CircuitBreaker(label, **kwargs)
+        return breaker
+
+
+def find_breaker(name: str, backend: Optional[str] = None) -> Optional[CircuitBreaker]:
+    """The existing circuit breaker for a tool and backend, or None (never creates one)"""
+    with _breakers_lock:
+        return _breakers.get((name, backend))
+
+
+class RetryPolicy:
+    """
+    Retry with capped exponential backoff and full jitter
+
+    Usable directly via ``call``/``acall`` (handy when the budget or breaker is
+    only known at call time) or through the ``retry`` decorator.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        delay: float = 1.0,
+        backoff: float = 2.0,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        self.max_attempts = max_attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = retry_on
+
+    def _next_delay(self, attempt: int) -> float:
+        """Sleep before retry number ``attempt`` (1-based)"""
+        ceiling = min(self.max_delay, self.delay * self.backoff ** (attempt - 1))
+        # Full jitter spreads simultaneous retries out instead of synchronizing them
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    def _should_retry(self, error: Exception, attempts: int, budget: Optional[RetryBudget]) -> bool:
+        if isinstance(error, (CircuitOpenError, DeadlineExceededError)) or not isinstance(error, self.retry_on):
+            return False
+        if attempts >= self.max_attempts:
+            log(f"Operation failed after {attempts} attempts: {str(error)}", "error")
+            return False
+        if budget is not None and not budget.try_spend():
+            log(f"Retry budget exhausted, giving up: {str(error)}", "error")
+            return False
+        return True
+
+    @staticmethod
+    def _backoff_fits(wait: float, deadline: Optional[Deadline], error: Exception) -> None:
+        """Give up now rather than sleep past the deadline"""
+        if deadline is not None and wait >= deadline.remaining():
+            log(f"No time left to retry before the deadline: {str(error)}", "warning")
+            raise DeadlineExceededError(f"Deadline of {deadline.seconds}s leaves no time to retry: {error}") from error
+
+    @staticmethod
+    def _record_failure(breaker: CircuitBreaker, error: Exception, trial: bool) -> None:
+        """Count a failed attempt against the breaker unless it says nothing about the backend"""
+        if not isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+            breaker.record_failure()
+        elif trial:
+            breaker.release_trial()
+
+    def call(self, func: Callable, *args, budget: Optional[RetryBudget] = None,
+             breaker: Optional[CircuitBreaker] = None, on_retry: Optional[Callable[[int, Exception], None]] = None,
+             deadline: Optional[Deadline] = None, **kwargs) -> Any:
+        """
+        Call ``func(*args, **kwargs)``, retrying failures
+
+        Args:
+            func: Callable to invoke
+            budget: Optional shared retry budget
+            breaker: Optional circuit breaker guarding the call
+            on_retry: Optional callback ``(attempt, error)`` invoked before each retry
+            deadline: Optional deadline; no attempt starts and no backoff sleeps past it
+
+        Returns:
+            Whatever ``func`` returns
+
+        Raises:
+            DeadlineExceededError: If the deadline passes before an attempt or a backoff
+        """
+        attempts = 0
+        while True:
+            trial = False
+            try:
+                if deadline is not None:
+                    deadline.check(f"attempt {attempts + 1}")
+                if breaker is not None:
+                    trial = breaker.before_call()
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if breaker is not None:
+                    self._record_failure(breaker, e, trial)
+                attempts += 1
+                if not self._should_retry(e, attempts, budget):
+                    raise
+                wait = self._next_delay(attempts)
+                self._backoff_fits(wait, deadline, e)
+                log(f"Attempt {attempts} failed. Retrying in {wait:.1f}s... ({str(e)})", "warning")
+                if on_retry is not None:
+                    on_retry(attempts, e)
+                if deadline is None:
+                    time.sleep(wait)
+                elif not deadline.sleep(wait):
+                    raise DeadlineExceededError(f"Deadline of {deadline.seconds}s exceeded during backoff") from e
+            except BaseException:
+                # Cancelled (e.g. the asyncio task running a run that hit its deadline): no verdict
+                if trial:
+                    breaker.release_trial()
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+    async def acall(self, func: Callable, *args, budget: Optional[RetryBudget] = None,
+                    breaker: Optional[CircuitBreaker] = None, on_retry: Optional[Callable[[int, Exception], None]] = None,
+                    deadline: Optional[Deadline] = None, **kwargs) -> Any:
+        """Asyncio variant of ``call`` for coroutine functions; backs off with asyncio.sleep"""
+        attempts = 0
+        while True:
+            trial = False
+            try:
+                if deadline is not None:
+                    deadline.check(f"attempt {attempts + 1}")
+                if breaker is not None:
+                    trial = breaker.before_call()
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                if breaker is not None:
+                    self._record_failure(breaker, e, trial)
+                attempts += 1
+                if not self._should_retry(e, attempts, budget):
+                    raise
+                wait = self._next_delay(attempts)
+                self._backoff_fits(wait, deadline, e)
+                log(f"Attempt {attempts} failed. Retrying in {wait:.1f}s... ({str(e)})", "warning")
+                if on_retry is not None:
+                    on_retry(attempts, e)
+                if deadline is None:
+                    await asyncio.sleep(wait)
+                elif not await deadline.asleep(wait):
+                    raise DeadlineExceededError(f"Deadline of {deadline.seconds}s exceeded during backoff") from e
+            except BaseException:
+                # Cancelled (e.g. the asyncio task running a run that hit its deadline): no verdict
+                if trial:
+                    breaker.release_trial()
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+
+
+def retry(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0, max_delay: float = 30.0,
+          jitter: bool = True, budget: Optional[RetryBudget] = None,
+          breaker: Optional[CircuitBreaker] = None) -> Callable:
     """
     Decorator that retries a function upon failure with exponential backoff
     
@@ -11,32 +307,46 @@ def retry(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0) -> Ca
         max_attempts: Maximum number of retry attempts
         delay: Initial delay between attempts in seconds
         backoff: Multiplier for delay between attempts
+        max_delay: Upper bound on any single delay
+        jitter: Randomize each delay between zero and its nominal value
+        budget: Optional retry budget shared with other callers
+        breaker: Optional circuit breaker guarding the function
         
     Returns:
-        Decorated function
+        Decorated function (coroutine functions are retried with asyncio.sleep)
     """
+    policy = RetryPolicy(max_attempts=max_attempts, delay=delay, backoff=backoff,
+                         max_delay=max_delay, jitter=jitter)
+
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                return await policy.acall(func, *args, budget=budget, breaker=breaker, **kwargs)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            attempts = 0
-            current_delay = delay
-            
-            while attempts < max_attempts:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    attempts += 1
-                    if attempts == max_attempts:
-                        log(f"Operation failed after {attempts} attempts: {str(e)}", "error")
-                        raise
-                    
-                    log(f"Attempt {attempts} failed. Retrying in {current_delay:.1f}s... ({str(e)})", "warning")
-                    time.sleep(current_delay)
-                    current_delay *= backoff
-                    
+            return policy.call(func, *args, budget=budget, breaker=breaker, **kwargs)
         return wrapper
     return decorator
 
+
+def async_retry(**policy_kwargs) -> Callable:
+    """
+    Async-only spelling of ``retry``, for readability at call sites
+
+    Raises:
+        TypeError: If applied to a function that is not a coroutine function
+    """
+    sync_decorator = retry(**policy_kwargs)
+
+    def decorator(func: Callable) -> Callable:
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"async_retry requires a coroutine function, got {func!r}")
+        return sync_decorator(func)
+    return decorator
+
 class ErrorHandler:
     @staticmethod
     def handle_error(error: Exception, context: str = "") -> Dict[str, Any]:
@@ -0,0 +1,170 @@
+import json
+import mmap
+import os
+import tempfile
+import threading
+import weakref
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional
+
+from tools.records import ResultSet, json_default
+
+# Findings kept in RAM per store before new ones go to disk
+DEFAULT_MEMORY_BUDGET = 4 * 1024 * 1024
+# A single finding larger than this always goes to disk
+DEFAULT_INLINE_LIMIT = 256 * 1024
+# JSON keys and punctuation around each result of a ResultSet, on top of its text
+_RESULT_OVERHEAD = 100
+
+
+class _Spilled:
+    """Location of a finding in the spill file"""
+
+    __slots__ = ('offset', 'length')
+
+    def __init__(self, offset: int, length: int):
+        self.offset = offset
+        self.length = length
+
+
+def estimate_size(value: Any) -> int:
+    """Rough encoded JSON size of a finding, without encoding it or expanding result sets"""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, ResultSet):
+        return value.nbytes() + len(value) * _RESULT_OVERHEAD
+    if isinstance(value, dict):
+        return 2 + sum(len(str(k)) + 4 + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(estimate_size(v) + 1 for v in value)
+    return 8
+
+
+def _discard(file: Any, path: str) -> None:
+    try:
+        file.close()
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class FindingsStore(Sequence):
+    """
+    Append-only sequence of findings with bounded memory
+
+    Findings stay in memory until ``memory_budget`` bytes (estimated from
+    string lengths and result counts; see ``estimate_size``) are in use; after
+    that, and for any single finding over ``inline_limit``, the finding is
+    encoded as JSON and appended to a temporary spill file and only its offset
+    is kept. Findings kept in memory are never encoded. Spilled findings are
+    decoded from a memory map on each access, so iterating a store holds one
+    of them in memory at a time. Spilled findings come back as plain JSON
+    (e.g. compact result sets as lists of dicts). The spill file is deleted on
+    ``close`` or when the store is garbage collected.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, inline_limit: int = DEFAULT_INLINE_LIMIT,
+                 spill_dir: Optional[str] = None):
+        """
+        Args:
+            memory_budget: Estimated bytes of findings kept in RAM
+            inline_limit: Largest single finding (estimated bytes) kept in RAM
+            spill_dir: Directory for the spill file (default: the system temp dir)
+        """
+        self.memory_budget = memory_budget
+        self.inline_limit = inline_limit
+        self.spill_dir = spill_dir
+        self._lock = threading.Lock()
+        self._entries: List[Any] = []
+        self._memory_bytes = 0
+        self._spilled = 0
+        self._file = None
+        self._size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._finalizer = None
+        self.path: Optional[str] = None
+
+    def append(self, finding: Dict[str, Any]) -> int:
+        """Add a finding and return its position"""
+        size = estimate_size(finding)
+        with self._lock:
+            if size <= self.inline_limit and self._memory_bytes + size <= self.memory_budget:
+                self._memory_bytes += size
+                self._entries.append(finding)
+                return len(self._entries) - 1
+        encoded = json.dumps(finding, default=json_default, separators=(",", ":")).encode('utf-8')
+        with self._lock:
+            self._entries.append(self._spill(encoded))
+            self._spilled += 1
+            return len(self._entries) - 1
+
+    def extend(self, findings: Any) -> None:
+        for finding in findings:
+            self.append(finding)
+
+    def _spill(self, encoded: bytes) -> _Spilled:
+        if self._file is None:
+            fd, self.path = tempfile.mkstemp(prefix="findings-", suffix=".jsonl", dir=self.spill_dir)
+            self._file = os.fdopen(fd, 'ab+')
+            self._finalizer = weakref.finalize(self, _discard, self._file, self.path)
+        entry = _Spilled(self._size, len(encoded))
+        self._file.write(encoded + b"\n")
+        self._size += len(encoded) + 1
+        return entry
+
+    def _read(self, entry: _Spilled) -> Dict[str, Any]:
+        with self._lock:
+            if self._map is None or entry.offset + entry.length > len(self._map):
+                # The file grew since it was last mapped
+                self._file.flush()
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+            data = self._map[entry.offset:entry.offset + entry.length]
+        return json.loads(data)
+
+    def reorder(self, order: List[int]) -> None:
+        """Rearrange findings so that position ``i`` holds the finding previously at ``order[i]``"""
+        with self._lock:
+            self._entries = [self._entries[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        entry = self._entries[index]
+        return self._read(entry) if isinstance(entry, _Spilled) else entry
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self._entries)):
+            yield self[index]
+
+    def __reduce__(self):
+        # Sent to another process (e.g. a failed report from a batch worker) as a plain list
+        return list, (list(self),)
+
+    def __repr__(self) -> str:
+        return f"FindingsStore({len(self)} findings, {self._spilled} on disk)"
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'count': len(self._entries),
+                'in_memory': len(self._entries) - self._spilled,
+                'spilled': self._spilled,
+                'memory_bytes': self._memory_bytes,
+                'spilled_bytes': self._size
+            }
+
+    def close(self) -> None:
+        """Release the memory map and delete the spill file; spilled findings become unreadable"""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._finalizer is not None:
+                self._finalizer()
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+# Connection pool sizing shared by every search-style tool in the process
+MAX_CONNECTIONS = 64
+DEFAULT_LIMITS = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=32)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+_lock = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+# An AsyncClient's connections belong to the loop that opened them, so keep one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide pooled synchronous HTTP client"""
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT)
+        return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the pooled asynchronous HTTP client for the running event loop
+
+    Must be called from inside a coroutine. All tools running on the same loop
+    share one client and therefore one connection pool.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT)
+            _async_clients[loop] = client
+        return client
+
+
+async def async_get(url: str, **kwargs) -> httpx.Response:
+    """
+    GET through the pooled asynchronous client
+
+    httpcore rescans every queued request against every connection whenever a
+    connection frees up, which degrades quadratically once thousands of
+    requests pile up on one pool. Admission is therefore gated by a semaphore
+    sized to the pool, so waiting happens in a cheap FIFO instead.
+    """
+    client = get_async_client()
+    loop = asyncio.get_running_loop()
+    with _lock:
+        slots = _async_slots.get(loop)
+        if slots is None:
+            slots = _async_slots[loop] = asyncio.Semaphore(MAX_CONNECTIONS)
+    async with slots:
+        return await client.get(url, **kwargs)
+
+
+async def aclose_async_client() -> None:
+    """Close the pooled asynchronous client for the running event loop, if any"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_client() -> None:
+    """Close the pooled synchronous client, if any"""
+    global _sync_client
+    with _lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from tools.records import json_default
+
+
+class JournalState:
+    """What a replayed journal says about a run"""
+
+    def __init__(self):
+        self.query: Optional[str] = None
+        self.plan: Optional[List[Dict[str, Any]]] = None
+        self.statuses: Dict[int, str] = {}
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.errors: Dict[int, str] = {}
+        self.tool_results: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self.completed = False
+
+    @property
+    def has_plan(self) -> bool:
+        return self.plan is not None
+
+
+class RunJournal:
+    """
+    Append-only JSONL log of a research run's progress
+
+    Every status transition and tool result is written (and by default
+    fsynced) as it happens, so after a crash ``replay`` can reconstruct which
+    tasks finished and what they produced. A torn final line from a crash
+    mid-write is ignored.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        event['ts'] = time.time()
+        line = json.dumps(event, default=json_default, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._truncate_torn_tail()
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _truncate_torn_tail(self) -> None:
+        """Drop a partial last line left by a crash so new events start on a fresh line"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def run_started(self, query: str) -> None:
+        self._write({'event': 'run_started', 'query': query})
+
+    def plan(self, tasks: List[Any]) -> None:
+        self._write({'event': 'plan', 'tasks': [
+            {
+                'description': task.description,
+                'required_tools': list(task.required_tools),
+                'depends_on': list(task.depends_on)
+            }
+            for task in tasks
+        ]})
+
+    def task_status(self, index: int, status: str, result: Optional[Dict[str, Any]] = None,
+                    error: Optional[str] = None) -> None:
+        event: Dict[str, Any] = {'event': 'task', 'index': index, 'status': status}
+        if result is not None:
+            event['result'] = result
+        if error is not None:
+            event['error'] = error
+        self._write(event)
+
+    def stage_completed(self, index: int, tool_name: str, result: Dict[str, Any]) -> None:
+        self._write({'event': 'stage', 'index': index, 'tool': tool_name, 'result': result})
+
+    def run_completed(self) -> None:
+        self._write({'event': 'run_completed'})
+
+    def replay(self) -> JournalState:
+        """Rebuild run state from the journal file (empty state if it does not exist)"""
+        state = JournalState()
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn write from a crash; nothing after it is trustworthy
+                kind = event.get('event')
+                if kind == 'run_started':
+                    state.query = event['query']
+                elif kind == 'plan':
+                    state.plan = event['tasks']
+                elif kind == 'task':
+                    index = event['index']
+                    state.statuses[index] = event['status']
+                    if 'result' in event:
+                        state.results[index] = event['result']
+                    if 'error' in event:
+                        state.errors[index] = event['error']
+                elif kind == 'stage':
+                    state.tool_results.setdefault(event['index'], {})[event['tool']] = event['result']
+                elif kind == 'run_completed':
+                    state.completed = True
+        return state
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,37 +1,205 @@
-from rich.console import Console
-from rich.theme import Theme
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
+from typing import Any, List, Optional, TextIO, Tuple
 
-custom_theme = Theme({
+THEME_STYLES = {
     "info": "bold blue",
     "warning": "bold yellow",
     "error": "bold red",
     "success": "bold green",
     "tool": "bold cyan",
     "agent": "bold magenta"
-})
+}
+
+# rich is imported on first colored write, so JSON/off logging never pays for it
+_console: Any = None
+
+# Numeric severities; messages below the configured threshold are dropped
+LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "tool": 20,
+    "agent": 20,
+    "success": 25,
+    "warning": 30,
+    "error": 40,
+    "off": 100
+}
+
+_TASK_LEVELS = {"failed": "error", "retry": "warning"}
+
+_threshold = LEVELS["info"]
+_format = "auto"  # auto, rich, json
+_stream: Optional[TextIO] = None
+
+_lock = threading.Lock()
+_queue: "queue.Queue[Optional[Tuple[Any, ...]]]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_pid: Optional[int] = None
+
+
+def configure_logging(level: str = "info", fmt: str = "auto", stream: Optional[TextIO] = None) -> None:
+    """
+    Configure the logging pipeline
+
+    Args:
+        level: Minimum level to emit (debug, info, success, warning, error, off)
+        fmt: "rich" for colored console output, "json" for one JSON object per
+            line, or "auto" to use rich only when the stream is an interactive TTY
+        stream: Destination for output (default: stdout)
+    """
+    global _threshold, _format, _stream, _console
+    if level not in LEVELS:
+        raise ValueError(f"Unknown log level: {level}")
+    if fmt not in ("auto", "rich", "json"):
+        raise ValueError(f"Unknown log format: {fmt}")
+    flush()
+    with _lock:
+        _threshold = LEVELS[level]
+        _format = fmt
+        if stream is not _stream:
+            _stream = stream
+            _console = None
+
+
+def is_enabled(level: str) -> bool:
+    """Whether a message at ``level`` would be emitted; lets callers skip building expensive messages"""
+    return LEVELS.get(level, LEVELS["info"]) >= _threshold
 
-console = Console(theme=custom_theme)
 
 def log(message: str, level: str = "info") -> None:
     """
     Enhanced logging with colored output and timestamps
-    
+
+    Only enqueues the message; formatting and I/O happen on a background
+    writer thread, so callers never block on the terminal.
+
     Args:
         message: Message to log
-        level: Log level (info, warning, error, success, tool, agent)
+        level: Log level (debug, info, warning, error, success, tool, agent)
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if LEVELS.get(level, LEVELS["info"]) < _threshold:
+        return
+    _enqueue(("log", time.time(), level, message))
+
+
+def log_task(task: str, status: str = "started") -> None:
+    """Specialized logging for tasks"""
+    if LEVELS[_TASK_LEVELS.get(status, "info")] < _threshold:
+        return
+    _enqueue(("task", time.time(), status, task))
+
+
+def flush() -> None:
+    """Block until every message enqueued so far has been written"""
+    if _writer is not None and _writer.is_alive() and _writer_pid == os.getpid():
+        _queue.join()
+
+
+def _enqueue(record: Tuple[Any, ...]) -> None:
+    if _writer_pid != os.getpid():
+        _start_writer()
+    _queue.put(record)
+
+
+def _start_writer() -> None:
+    """Start the writer thread (again, after a fork, since threads do not survive it)"""
+    global _queue, _writer, _writer_pid
+    with _lock:
+        if _writer_pid == os.getpid():
+            return
+        _queue = queue.Queue()
+        _writer = threading.Thread(target=_write_loop, args=(_queue,), name="log-writer", daemon=True)
+        _writer.start()
+        _writer_pid = os.getpid()
+
+
+def _write_loop(records: "queue.Queue[Optional[Tuple[Any, ...]]]") -> None:
+    while True:
+        batch = [records.get()]
+        # Drain whatever else is waiting so bursts are written together
+        while True:
+            try:
+                batch.append(records.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write_batch([record for record in batch if record is not None])
+        except Exception:
+            pass  # Logging must never take the process down
+        finally:
+            for _ in batch:
+                records.task_done()
+        if any(record is None for record in batch):
+            return
+
+
+def get_console() -> Any:
+    """The rich Console used for colored output, created on first use"""
+    global _console
+    with _lock:
+        if _console is None:
+            from rich.console import Console
+            from rich.theme import Theme
+            _console = Console(theme=Theme(THEME_STYLES), file=_stream)
+        return _console
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps ``utils.logger.console`` working without importing rich up front
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _use_rich() -> bool:
+    if _format == "auto":
+        stream = _stream or sys.stdout
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+    return _format == "rich"
+
+
+def _write_batch(batch: List[Tuple[Any, ...]]) -> None:
+    if not batch:
+        return
+    if not _use_rich():
+        stream = _stream or sys.stdout
+        stream.write("".join(_format_json(record) for record in batch))
+        stream.flush()
+        return
+    for record in batch:
+        if record[0] == "task":
+            _render_task(*record[1:])
+        else:
+            _render_log(*record[1:])
+
+
+def _format_json(record: Tuple[Any, ...]) -> str:
+    kind, created, first, second = record
+    entry = {"ts": datetime.fromtimestamp(created).isoformat(timespec="milliseconds")}
+    if kind == "task":
+        entry.update(level=_TASK_LEVELS.get(first, "info"), event="task", task=second, status=first)
+    else:
+        entry.update(level=first, message=second)
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+def _render_log(created: float, level: str, message: str) -> None:
+    timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
     log_message = f"[{timestamp}] {message}"
-    
-    if level == "info":
-        console.print(log_message, style="info")
-    elif level == "warning":
-        console.print(log_message, style="warning")
-    elif level == "error":
-        console.print(log_message, style="error")
-    elif level == "success":
-        console.print(log_message, style="success")
+
+    console = get_console()
+    if level in ("info", "warning", "error", "success"):
+        console.print(log_message, style=level)
     elif level == "tool":
         console.print(f"[TOOL] {log_message}", style="tool")
     elif level == "agent":
@@ -39,9 +207,9 @@ def log(message: str, level: str = "info") -> None:
     else:
         console.print(log_message)
 
-def log_task(task: str, status: str = "started") -> None:
-    """Specialized logging for tasks"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _render_task(created: float, status: str, task: str) -> None:
+    timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
     status_map = {
         "started": ("▶", "blue"),
         "completed": ("✓", "green"),
@@ -49,4 +217,13 @@ def log_task(task: str, status: str = "started") -> None:
         "retry": ("↻", "yellow")
     }
     icon, color = status_map.get(status, ("•", "white"))
-    console.print(f"[{timestamp}] {icon} [{color}]{task}[/{color}] - {status.upper()}")
\ No newline at end of file
+    get_console().print(f"[{timestamp}] {icon} [{color}]{task}[/{color}] - {status.upper()}")
+
+
+def _shutdown() -> None:
+    if _writer is not None and _writer.is_alive() and _writer_pid == os.getpid():
+        _queue.put(None)
+        _writer.join(timeout=5)
+
+
+atexit.register(_shutdown)
@@ -0,0 +1,354 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from utils.deadline import Deadline, DeadlineExceededError
+from utils.logger import log
+from utils.tracing import LatencyHistogram
+
+
+class TokenBucket:
+    """
+    Requests-per-second limit with bursts of up to ``burst`` requests
+
+    Callers reserve a token up front and are told how long to wait for it, so
+    waiters are served in arrival order and sleep outside the lock. The
+    long-run rate never exceeds ``rate`` whatever the number of callers.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.burst, self._tokens + elapsed * self.rate)
+
+
+class RateLimiter:
+    """
+    Per-tool admission control: a token bucket plus an AIMD concurrency limit
+
+    ``qps`` (optional) caps the request rate. The concurrency limit starts at
+    ``initial_concurrency`` and adapts between ``min_concurrency`` and
+    ``max_concurrency``: every success while the limit is in use adds
+    ``1/limit`` (about +1 per round of calls), and an error or a latency spike
+    multiplies it by ``decrease``. A spike is a call slower than
+    ``latency_target`` seconds if given, otherwise slower than
+    ``spike_factor`` times the smoothed latency of recent calls. Only calls
+    started after the previous decrease can cause another, so one bad moment
+    shrinks the limit once rather than once per in-flight call.
+
+    Waiters for a concurrency slot are tracked as ``concurrent.futures.Future``
+    objects, so threads and asyncio tasks share one limiter fairly.
+    """
+
+    def __init__(self, name: str, qps: Optional[float] = None, burst: Optional[float] = None,
+                 max_concurrency: int = 16, min_concurrency: int = 1, initial_concurrency: Optional[int] = None,
+                 decrease: float = 0.5, latency_target: Optional[float] = None, spike_factor: float = 3.0):
+        """
+        Args:
+            name: Tool (or backend) name, for logs and status
+            qps: Requests per second allowed; unlimited if omitted
+            burst: Requests allowed at once after an idle period (default: ``qps``)
+            max_concurrency: Upper bound of the adaptive concurrency limit
+            min_concurrency: Lower bound of the adaptive concurrency limit
+            initial_concurrency: Starting limit (default: ``min(4, max_concurrency)``)
+            decrease: Factor applied to the limit on an error or latency spike
+            latency_target: Seconds above which a call counts as a spike
+            spike_factor: Spike threshold relative to smoothed latency when no target is set
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._waiters: Deque[Future] = deque()
+        self._in_flight = 0
+        self._smoothed_latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self.queue_delay = LatencyHistogram(window=1000)
+        self.calls = 0
+        self.throttled = 0
+        self.increases = 0
+        self.decreases = 0
+        self.configure(qps=qps, burst=burst, max_concurrency=max_concurrency, min_concurrency=min_concurrency,
+                       initial_concurrency=initial_concurrency, decrease=decrease,
+                       latency_target=latency_target, spike_factor=spike_factor)
+
+    def configure(self, qps: Optional[float] = None, burst: Optional[float] = None, max_concurrency: int = 16,
+                  min_concurrency: int = 1, initial_concurrency: Optional[int] = None, decrease: float = 0.5,
+                  latency_target: Optional[float] = None, spike_factor: float = 3.0) -> None:
+        """Replace the limits (same arguments as the constructor); in-flight calls are unaffected"""
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("need 1 <= min_concurrency <= max_concurrency")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        with self._lock:
+            self.config = {'qps': qps, 'burst': burst, 'max_concurrency': max_concurrency,
+                           'min_concurrency': min_concurrency, 'initial_concurrency': initial_concurrency,
+                           'decrease': decrease, 'latency_target': latency_target, 'spike_factor': spike_factor}
+            self.bucket = TokenBucket(qps, burst) if qps else None
+            self.max_concurrency = max_concurrency
+            self.min_concurrency = min_concurrency
+            start = initial_concurrency if initial_concurrency is not None else min(4, max_concurrency)
+            self._limit = float(min(max_concurrency, max(min_concurrency, start)))
+            self.decrease = decrease
+            self.latency_target = latency_target
+            self.spike_factor = spike_factor
+            self._wake()
+
+    @property
+    def limit(self) -> int:
+        with self._lock:
+            return int(self._limit)
+
+    def _take_slot(self) -> Optional[Future]:
+        """Claim a concurrency slot now (returns None) or queue for one (returns the future to wait on)"""
+        with self._lock:
+            self.calls += 1
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return None
+            self.throttled += 1
+            waiter: Future = Future()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _wake(self) -> None:
+        # Lock held. Hand free slots to waiters in arrival order, skipping ones that gave up
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            if waiter.set_running_or_notify_cancel():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> float:
+        """
+        Block until a call may start
+
+        Args:
+            deadline: Give up instead of waiting past this
+
+        Returns:
+            Start time to pass to ``release`` (``time.monotonic()``)
+
+        Raises:
+            DeadlineExceededError: If the deadline passes while waiting
+        """
+        queued_at = time.monotonic()
+        waiter = self._take_slot()
+        if waiter is not None:
+            try:
+                waiter.result(timeout=deadline.timeout() if deadline else None)
+            except FutureTimeoutError:
+                self._abandon(waiter)
+                raise DeadlineExceededError(f"Deadline exceeded waiting for a {self.name} slot") from None
+        wait = self.bucket.reserve() if self.bucket else 0.0
+        if wait > 0:
+            if deadline is None:
+                time.sleep(wait)
+            elif wait >= deadline.remaining() or not deadline.sleep(wait):
+                self._release_slot()
+                raise DeadlineExceededError(f"Deadline exceeded waiting for {self.name} rate limit")
+        return self._started(queued_at)
+
+    async def aacquire(self, deadline: Optional[Deadline] = None) -> float:
+        """Asyncio variant of ``acquire``; waits without blocking the event loop"""
+        queued_at = time.monotonic()
+        waiter = self._take_slot()
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.wrap_future(waiter), deadline.timeout() if deadline else None)
+            except asyncio.TimeoutError:
+                self._abandon(waiter)
+                raise DeadlineExceededError(f"Deadline exceeded waiting for a {self.name} slot") from None
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+        try:
+            wait = self.bucket.reserve() if self.bucket else 0.0
+            if wait > 0:
+                if deadline is not None and wait >= deadline.remaining():
+                    raise DeadlineExceededError(f"Deadline exceeded waiting for {self.name} rate limit")
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._release_slot()
+            raise
+        return self._started(queued_at)
+
+    def _abandon(self, waiter: Future) -> None:
+        with self._lock:
+            if not waiter.cancel():
+                # The slot was granted just as the caller gave up; put it back
+                self._in_flight -= 1
+                self._wake()
+
+    def _started(self, queued_at: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self.queue_delay.record(int((now - queued_at) * 1e9))
+        return now
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake()
+
+    def release(self, started_at: float, error: bool = False) -> None:
+        """
+        Return the slot taken by ``acquire`` and adapt the limit to the call's outcome
+
+        Args:
+            started_at: Value returned by ``acquire``
+            error: Whether the call failed
+        """
+        latency = time.monotonic() - started_at
+        with self._lock:
+            spike = self._is_spike(latency)
+            if error or spike:
+                if started_at >= self._last_decrease:
+                    old = int(self._limit)
+                    self._limit = max(float(self.min_concurrency), self._limit * self.decrease)
+                    self._last_decrease = time.monotonic()
+                    self.decreases += 1
+                    if int(self._limit) < old:
+                        reason = "error" if error else f"latency spike ({latency * 1000:.0f}ms)"
+                        log(f"Concurrency limit for {self.name} lowered to {int(self._limit)} after {reason}",
+                            "debug")
+            elif self._in_flight >= int(self._limit) and self._limit < self.max_concurrency:
+                # Only grow while the limit is actually what holds callers back
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+                self.increases += 1
+            if not error:
+                self._observe(latency)
+            self._in_flight -= 1
+            self._wake()
+
+    def _is_spike(self, latency: float) -> bool:
+        if self.latency_target is not None:
+            return latency > self.latency_target
+        # A handful of samples are needed before "slower than usual" means anything
+        return (self._samples > 10 and latency > self.spike_factor * self._smoothed_latency)
+
+    def _observe(self, latency: float) -> None:
+        self._samples += 1
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += 0.1 * (latency - self._smoothed_latency)
+
+    def slot(self, deadline: Optional[Deadline] = None) -> "_Slot":
+        """Context manager (``with`` or ``async with``) holding a slot for the duration of a call"""
+        return _Slot(self, deadline)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            status = {
+                'qps': self.bucket.rate if self.bucket else None,
+                'tokens': round(self.bucket.tokens, 2) if self.bucket else None,
+                'concurrency_limit': int(self._limit),
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiters),
+                'calls': self.calls,
+                'throttled': self.throttled,
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'smoothed_latency_ms': (round(self._smoothed_latency * 1000, 3)
+                                        if self._smoothed_latency is not None else None),
+                'queue_delay': self.queue_delay.summary()
+            }
+        return status
+
+
+def _is_backend_error(exc_type: Optional[type]) -> bool:
+    return (exc_type is not None and issubclass(exc_type, Exception)
+            and not issubclass(exc_type, DeadlineExceededError))
+
+
+class _Slot:
+    """
+    Sync and async context manager around ``acquire``/``release``
+
+    Exceptions count as errors; cancellation, deadlines and other BaseExceptions
+    just free the slot.
+    """
+
+    __slots__ = ('limiter', 'deadline', 'started_at')
+
+    def __init__(self, limiter: RateLimiter, deadline: Optional[Deadline] = None):
+        self.limiter = limiter
+        self.deadline = deadline
+        self.started_at = 0.0
+
+    def __enter__(self) -> "_Slot":
+        self.started_at = self.limiter.acquire(self.deadline)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.limiter.release(self.started_at, error=_is_backend_error(exc_type))
+
+    async def __aenter__(self) -> "_Slot":
+        self.started_at = await self.limiter.aacquire(self.deadline)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.limiter.release(self.started_at, error=_is_backend_error(exc_type))
+
+
+_DEFAULT_CONFIG = {name: parameter.default
+                   for name, parameter in inspect.signature(RateLimiter.configure).parameters.items()
+                   if name != 'self'}
+
+_limiters: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_key(name: str, config: Dict[str, Any]) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+    """Identity of a limiter: the tool name plus its complete settings (defaults filled in)"""
+    unknown = set(config) - set(_DEFAULT_CONFIG)
+    if unknown:
+        raise TypeError(f"Unknown rate limit settings for {name}: {', '.join(sorted(unknown))}")
+    return name, tuple(sorted({**_DEFAULT_CONFIG, **config}.items()))
+
+
+def get_limiter(name: str, **config: Any) -> RateLimiter:
+    """
+    Return the process-wide rate limiter for a tool and settings, creating it on first use
+
+    Every agent that configures a tool the same way shares one limiter, and
+    so one quota and one learned concurrency limit. Different settings get a
+    limiter of their own; an existing limiter is never reconfigured here, so
+    its adaptive limit is not reset by another caller.
+    """
+    key = _limiter_key(name, config)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(name, **config)
+        return limiter
+
+
+def find_limiter(name: str, **config: Any) -> Optional[RateLimiter]:
+    """The existing rate limiter for a tool and settings, or None (never creates one)"""
+    with _limiters_lock:
+        return _limiters.get(_limiter_key(name, config))
@@ -0,0 +1,252 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+from utils.deadline import Deadline, DeadlineExceededError
+
+# Seconds cancelled asyncio nodes get to unwind once a deadline passes
+CANCEL_GRACE = 0.5
+
+
+class DependencyFailedError(Exception):
+    """Raised for a node that was skipped because one of its dependencies failed"""
+
+
+def _validate_graph(dependencies: Sequence[Sequence[int]]) -> None:
+    """
+    Check that every dependency index exists and that the graph has no cycles
+
+    Args:
+        dependencies: For each node, the indices of the nodes it depends on
+
+    Raises:
+        ValueError: If an index is out of range or the graph contains a cycle
+    """
+    count = len(dependencies)
+    for node, deps in enumerate(dependencies):
+        for dep in deps:
+            if not 0 <= dep < count:
+                raise ValueError(f"Task {node} depends on unknown task {dep}")
+            if dep == node:
+                raise ValueError(f"Task {node} depends on itself")
+
+    # Kahn's algorithm - if we cannot drain every node there is a cycle
+    remaining = [len(set(deps)) for deps in dependencies]
+    dependents: List[List[int]] = [[] for _ in range(count)]
+    for node, deps in enumerate(dependencies):
+        for dep in set(deps):
+            dependents[dep].append(node)
+    ready = [node for node in range(count) if remaining[node] == 0]
+    visited = 0
+    while ready:
+        node = ready.pop()
+        visited += 1
+        for child in dependents[node]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    if visited != count:
+        raise ValueError("Task dependencies contain a cycle")
+
+
+class TaskScheduler:
+    """
+    Runs a DAG of work items on a bounded thread pool
+
+    Nodes are identified by their index. A node becomes ready once every node
+    it depends on has finished successfully; ready nodes run concurrently, up
+    to ``max_workers`` at a time. If a dependency fails, its dependents are not
+    executed and are reported with a ``DependencyFailedError`` instead.
+
+    With a deadline, the runners return as soon as it passes: every node not
+    finished by then is reported with a ``DeadlineExceededError``, queued
+    nodes never start, running asyncio nodes are cancelled and running threads
+    are abandoned (the deadline is cancelled so they can stop at their next
+    check; their results are discarded).
+    """
+
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._running: Set[int] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of nodes currently executing"""
+        with self._lock:
+            return len(self._running)
+
+    def _track(self, node: int, running: bool) -> None:
+        with self._lock:
+            if running:
+                self._running.add(node)
+            else:
+                self._running.discard(node)
+
+    def run(
+        self,
+        dependencies: Sequence[Sequence[int]],
+        worker: Callable[[int], Any],
+        on_done: Callable[[int, Optional[Any], Optional[BaseException]], None],
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """
+        Execute every node, respecting dependencies
+
+        Args:
+            dependencies: For each node, the indices of the nodes it depends on
+            worker: Called with a node index; its return value is the node result
+            on_done: Called as ``on_done(index, result, error)`` when a node
+                finishes, fails or is skipped. Calls happen on the scheduling
+                thread, never concurrently, and never after ``run`` returns.
+            deadline: Optional deadline for the whole graph
+        """
+        graph = _Graph(dependencies, on_done)
+        if graph.finished:
+            return
+
+        def execute(node: int) -> Any:
+            self._track(node, True)
+            try:
+                return worker(node)
+            finally:
+                self._track(node, False)
+
+        futures: Dict[Future, int] = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        timed_out = False
+        try:
+            while graph.ready or futures:
+                if deadline is not None and deadline.expired:
+                    timed_out = True
+                    break
+                while graph.ready:
+                    node = graph.ready.pop(0)
+                    futures[pool.submit(execute, node)] = node
+
+                timeout = deadline.timeout() if deadline is not None else None
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=futures.__getitem__):
+                    node = futures.pop(future)
+                    error = future.exception()
+                    graph.settle(node, None if error else future.result(), error)
+        finally:
+            if timed_out:
+                deadline.cancel()
+            # Without a deadline (or if the graph finished in time) this waits for nothing
+            pool.shutdown(wait=not timed_out, cancel_futures=True)
+        if timed_out:
+            graph.expire(deadline)
+
+    async def arun(
+        self,
+        dependencies: Sequence[Sequence[int]],
+        worker: Callable[[int], Awaitable[Any]],
+        on_done: Callable[[int, Optional[Any], Optional[BaseException]], None],
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """
+        Asyncio counterpart of ``run``
+
+        Ready nodes are scheduled as tasks on the running event loop, at most
+        ``max_workers`` at a time.
+
+        Args:
+            dependencies: For each node, the indices of the nodes it depends on
+            worker: Coroutine function called with a node index
+            on_done: Called as ``on_done(index, result, error)`` when a node
+                finishes, fails or is skipped
+            deadline: Optional deadline for the whole graph
+        """
+        graph = _Graph(dependencies, on_done)
+        if graph.finished:
+            return
+
+        async def execute(node: int) -> Any:
+            self._track(node, True)
+            try:
+                return await worker(node)
+            finally:
+                self._track(node, False)
+
+        pending: Dict[asyncio.Task, int] = {}
+        while graph.ready or pending:
+            if deadline is not None and deadline.expired:
+                deadline.cancel()
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.wait(pending, timeout=CANCEL_GRACE)
+                graph.expire(deadline)
+                return
+            while graph.ready and len(pending) < self.max_workers:
+                node = graph.ready.pop(0)
+                pending[asyncio.ensure_future(execute(node))] = node
+
+            timeout = deadline.timeout() if deadline is not None else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for future in sorted(done, key=pending.__getitem__):
+                node = pending.pop(future)
+                error = future.exception()
+                graph.settle(node, None if error else future.result(), error)
+
+
+class _Graph:
+    """Dependency bookkeeping shared by the thread and asyncio runners"""
+
+    def __init__(
+        self,
+        dependencies: Sequence[Sequence[int]],
+        on_done: Callable[[int, Optional[Any], Optional[BaseException]], None],
+    ):
+        _validate_graph(dependencies)
+        count = len(dependencies)
+        self.dependencies = dependencies
+        self.on_done = on_done
+        self.remaining = [len(set(deps)) for deps in dependencies]
+        self.dependents: List[List[int]] = [[] for _ in range(count)]
+        for node, deps in enumerate(dependencies):
+            for dep in set(deps):
+                self.dependents[dep].append(node)
+        self.failed: Set[int] = set()
+        self.done: Set[int] = set()
+        self.settled = 0
+        # Lowest index first keeps submission order stable between runs
+        self.ready = sorted(node for node in range(count) if self.remaining[node] == 0)
+
+    @property
+    def finished(self) -> bool:
+        return self.settled == len(self.dependencies)
+
+    def settle(self, node: int, result: Optional[Any], error: Optional[BaseException]) -> None:
+        """Record a node's outcome and release (or skip) its dependents"""
+        self.done.add(node)
+        self.settled += 1
+        self.on_done(node, result, error)
+        if error is not None:
+            self.failed.add(node)
+        for child in self.dependents[node]:
+            self.remaining[child] -= 1
+            if self.remaining[child] == 0:
+                blocked = [dep for dep in self.dependencies[child] if dep in self.failed]
+                if blocked:
+                    self.settle(child, None, DependencyFailedError(
+                        f"Skipped because task(s) {sorted(set(blocked))} failed"
+                    ))
+                else:
+                    self.ready.append(child)
+        self.ready.sort()
+
+    def expire(self, deadline: Deadline) -> None:
+        """Settle every unfinished node (running, ready or waiting on dependencies) as timed out"""
+        self.ready = []
+        for node in range(len(self.dependencies)):
+            if node not in self.done:
+                self.done.add(node)
+                self.settled += 1
+                self.on_done(node, None, DeadlineExceededError(
+                    f"Not finished within the {deadline.seconds}s deadline"
+                ))
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.deadline import Deadline, DeadlineExceededError
+
+# Result handed to followers when the leader gave up without an answer
+_ABANDONED = object()
+
+
+def _abandons(error: BaseException) -> bool:
+    """Whether an error ends one caller's wait (cancellation, a deadline) rather than describing the work"""
+    return isinstance(error, DeadlineExceededError) or not isinstance(error, Exception)
+
+
+async def _within(awaitable: Awaitable[Any], deadline: Optional[Deadline], activity: str) -> Any:
+    """Await ``awaitable``, giving up (and cancelling it) when the deadline passes"""
+    timeout = deadline.timeout() if deadline is not None else None
+    if timeout is None:
+        return await awaitable
+    task = asyncio.ensure_future(awaitable)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except BaseException:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        raise DeadlineExceededError(f"Deadline of {deadline.seconds}s exceeded {activity}")
+    return task.result()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution
+
+    The first caller for a key (the leader) runs the work; everyone arriving
+    while it is in flight waits for the same result or exception instead of
+    repeating it. Nothing is remembered once the call finishes, so this only
+    absorbs bursts; caching is a separate concern.
+
+    Deadlines belong to callers, not to the shared work: each caller waits at
+    most until its own deadline, and a leader that is cancelled or runs out of
+    time does not pass that on. Its followers are released instead, and one
+    of them becomes the new leader and runs the work again.
+
+    In-flight calls are tracked as ``concurrent.futures.Future`` objects, so
+    threaded and asyncio callers (on any event loop) coalesce with each other.
+    Callers must treat a shared result as read-only.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.abandoned = 0
+
+    def _join(self, key: str, rejoin: bool = False) -> Tuple[Future, bool]:
+        """
+        The in-flight future for ``key`` and whether the caller must run the work
+
+        ``rejoin`` is set by a follower whose leader gave up; it was already
+        counted as a call (and as coalesced).
+        """
+        with self._lock:
+            if not rejoin:
+                self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                if not rejoin:
+                    self.coalesced += 1
+                return future, False
+            future = self._in_flight[key] = Future()
+            # Running futures cannot be cancelled, so a follower that stops waiting cannot cancel the flight
+            future.set_running_or_notify_cancel()
+            self.executions += 1
+            if rejoin:
+                self.coalesced -= 1
+            return future, True
+
+    def _settle(self, key: str, future: Future, result: Any = None, error: BaseException = None) -> None:
+        abandoned = error is not None and _abandons(error)
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            if abandoned:
+                self.abandoned += 1
+            elif error is not None:
+                self.errors += 1
+        # Followers are released only after the key is free, so a retry starts a new flight
+        if abandoned:
+            future.set_result(_ABANDONED)
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    def _wait(future: Future, deadline: Optional[Deadline]) -> Any:
+        if deadline is not None and not wait([future], timeout=deadline.timeout()).done:
+            raise DeadlineExceededError(f"Deadline of {deadline.seconds}s exceeded waiting for a shared call")
+        return future.result()
+
+    def do(self, key: str, func: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Run ``func`` unless a call with the same key is already in flight
+
+        Args:
+            key: Identity of the call (e.g. a normalized-argument hash)
+            func: Zero-argument callable doing the work; it must not depend on
+                the caller's deadline, since its result is shared
+            deadline: Bounds how long this caller waits for another caller's
+                execution (the leader runs ``func`` to completion)
+
+        Returns:
+            The result of the (possibly shared) execution
+
+        Raises:
+            DeadlineExceededError: If the deadline passes before a shared result arrives
+        """
+        if deadline is not None:
+            deadline.check("shared call")
+        future, leader = self._join(key)
+        while not leader:
+            result = self._wait(future, deadline)
+            if result is not _ABANDONED:
+                return result
+            future, leader = self._join(key, rejoin=True)
+        try:
+            result = func()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[Any]], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Asyncio variant of ``do``: ``func`` returns an awaitable
+
+        Waiting followers do not block their event loop. A leader whose
+        deadline passes cancels its execution and hands the key over.
+        """
+        if deadline is not None:
+            deadline.check("shared call")
+        future, leader = self._join(key)
+        while not leader:
+            result = await _within(asyncio.wrap_future(future), deadline, "waiting for a shared call")
+            if result is not _ABANDONED:
+                return result
+            future, leader = self._join(key, rejoin=True)
+        try:
+            result = await _within(func(), deadline, "during a shared call")
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'abandoned': self.abandoned,
+                'in_flight': len(self._in_flight)
+            }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name: str) -> SingleFlight:
+    """
+    Return the process-wide single-flight group for a tool, creating it on first use
+
+    Groups are shared so that calls from every agent in the process coalesce.
+    """
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+
+class LatencyHistogram:
+    """
+    Latency samples for one operation
+
+    Keeps exact count/total/max plus a bounded window of recent samples from
+    which percentiles are computed on demand.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._samples: Deque[int] = deque(maxlen=window)
+
+    def record(self, duration_ns: int) -> None:
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self._samples.append(duration_ns)
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, nearest-rank p50/p95/p99 and max, in milliseconds"""
+        if not self.count:
+            return {'count': 0}
+        ordered = sorted(self._samples)
+
+        def pick(q: float) -> float:
+            rank = min(len(ordered) - 1, max(0, -(-len(ordered) * q // 100) - 1))
+            return round(ordered[int(rank)] / 1e6, 3)
+
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ns / self.count / 1e6, 3),
+            'p50_ms': pick(50),
+            'p95_ms': pick(95),
+            'p99_ms': pick(99),
+            'max_ms': round(self.max_ns / 1e6, 3)
+        }
+
+
+class _NullSpan:
+    """Span returned while tracing is disabled; every operation is a no-op"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed operation; use as a context manager via ``Tracer.span``"""
+
+    __slots__ = ('tracer', 'name', 'category', 'attrs', 'start_ns', 'tid')
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start_ns = 0
+        self.tid = 0
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes discovered while the span is open"""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        if self.tracer.keep_spans:
+            self.tid = _current_tid()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._finish(self, end_ns)
+
+
+def _current_tid() -> int:
+    """Thread id, or the asyncio task id when inside one, so concurrent coroutines get separate trace lanes"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+class Tracer:
+    """
+    Lightweight span and metrics recorder
+
+    With ``enabled=False`` every span is a shared no-op object, so
+    instrumentation left in hot paths costs one attribute check. When enabled,
+    span durations feed per-name latency histograms; the spans themselves are
+    only retained (for trace export) when ``keep_spans`` is set.
+    """
+
+    def __init__(self, enabled: bool = True, keep_spans: bool = False, max_spans: int = 100_000):
+        self.enabled = enabled
+        self.keep_spans = keep_spans
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._spans: List[Dict[str, Any]] = []
+        self._origin_ns = time.perf_counter_ns()
+        self.dropped_spans = 0
+
+    def span(self, name: str, category: str = "agent", **attrs: Any):
+        """
+        Time a block of code
+
+        Args:
+            name: Operation name; also the histogram key
+            category: Trace category (agent, task, tool, ...)
+            **attrs: Attributes recorded with the span
+
+        Returns:
+            Context manager yielding the span
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, attrs)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment a named counter (e.g. retries per tool)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def _finish(self, span: Span, end_ns: int) -> None:
+        duration = end_ns - span.start_ns
+        with self._lock:
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = LatencyHistogram()
+            histogram.record(duration)
+            if self.keep_spans:
+                if len(self._spans) >= self.max_spans:
+                    self.dropped_spans += 1
+                    return
+                self._spans.append({
+                    'name': span.name,
+                    'cat': span.category,
+                    'ph': 'X',
+                    'ts': (span.start_ns - self._origin_ns) / 1000,
+                    'dur': duration / 1000,
+                    'pid': os.getpid(),
+                    'tid': span.tid,
+                    'args': span.attrs
+                })
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Latency percentiles per span name, and counters"""
+        with self._lock:
+            return {
+                'latency': {name: h.summary() for name, h in sorted(self._histograms.items())},
+                'counters': dict(sorted(self._counters.items()))
+            }
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        Write retained spans as a Chrome trace (chrome://tracing, Perfetto)
+
+        Args:
+            path: Output JSON file
+
+        Returns:
+            Number of spans written
+        """
+        with self._lock:
+            events = list(self._spans)
+            metadata = {'counters': dict(self._counters), 'dropped_spans': self.dropped_spans}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': events,
+                'displayTimeUnit': 'ms',
+                'otherData': metadata
+            }, f, default=str)
+        return len(events)